@@ -1,10 +1,11 @@
 import logging
-from datetime import datetime
 
 from sqlalchemy.orm import Session
 
 from backend.database.setup_db import get_db
-from backend.database.models import User, Job, UserJobMatch
+from backend.database.match_writer import match_row, write_matches
+from backend.database.models import User, Job
+from backend.matching_engine.embeddings import JobEmbeddingStore, ResumeEmbeddingCache, job_embedding_text
 from backend.matching_engine.semanticMatcher import LLMMatcher
 from backend.schemas.user import UserProfile, Resume
 from backend.schemas.job import JobPosting
@@ -41,46 +42,29 @@ def match_jobs_for_user(user_id: str, max_years_exp: int = 3):
         logger.error(f"Failed to parse user profile: {e}")
         return
     # 2. Get jobs with filter
-    jobs_to_match = db.query(Job).filter(Job.min_exp_required <= max_years_exp).all()
+    jobs_to_match = (
+        db.query(Job)
+        .filter(Job.min_exp_required <= max_years_exp, Job.canonical_job_id.is_(None))
+        .all()
+    )
     if not jobs_to_match:
         logger.info(f"No jobs found with min_exp_required <= {max_years_exp}.")
         return
 
     logger.info(f"Found {len(jobs_to_match)} jobs to match against.")
 
-    matcher = LLMMatcher()
-    match_count = 0
-
-    for job_record in jobs_to_match:
-        try:
-            match_result = matcher.match(job=job_record, user=user_profile)
-            existing_match = (
-                db.query(UserJobMatch)
-                .filter(
-                    UserJobMatch.user_id == user_id,
-                    UserJobMatch.job_id == job_record.job_id
-                )
-                .first()
-            )
-            if existing_match:
-                existing_match.fit = match_result["fit"]
-                existing_match.reasons = " ".join(match_result["reasons"])
-                existing_match.score = match_result["score"]
-                existing_match.created_at = datetime.utcnow()
-            else:
-                new_match = UserJobMatch(
-                    user_id=user_id,
-                    job_id=job_record.job_id,
-                    fit=match_result["fit"],
-                    reasons=" ".join(match_result["reasons"]),
-                    score=match_result["score"],
-                    status="READY_FOR_EMAIL",
-                )
-                db.add(new_match)
-            match_count += 1
-        except Exception as e:
-            logger.error(f"Failed to match job {job_record.job_id} for user {user_id}: {e}")
-            continue
+    matcher = LLMMatcher(resume_cache=ResumeEmbeddingCache(db))
+    job_vectors = JobEmbeddingStore(db, encoder=matcher.encoder).get_or_embed(
+        [(job.job_id, job_embedding_text(job)) for job in jobs_to_match]
+    )
+    # One batched encode of the resume and one matrix multiply for every job.
+    match_results = matcher.match_batch(
+        jobs_to_match, user_profile, job_embeddings=[job_vectors.get(job.job_id) for job in jobs_to_match]
+    )
+    match_count = write_matches(db, [
+        match_row(user_id, job_record.job_id, match_result)
+        for job_record, match_result in zip(jobs_to_match, match_results)
+    ])
     if match_count > 0:
         db.commit()
         logger.info(f"Processed {match_count} matches for user {user_id}.")
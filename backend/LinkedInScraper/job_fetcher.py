@@ -2,6 +2,7 @@ from typing import List, Optional, Dict, Any
 import pandas as pd
 from jobspy import scrape_jobs
 
+from data_engine.scrapers.scrape_cache import get_scrape_cache
 from helper.util import safe_str
 from schemas.job import JobPosting
 from helper.constants import ID, SITE, JOB_URL, JOB_URL_DIRECT, TITLE, COMPANY, LOCATION, DATE_POSTED, JOB_LEVEL, DESCRIPTION, COMPANY_INDUSTRY, COMPANY_URL, SITE_NAME
@@ -55,7 +56,7 @@ class JobFetcher:
         if country_indeed:
             params["country_indeed"]=country_indeed
         try:
-            jobs = scrape_jobs(**params)
+            jobs = get_scrape_cache().fetch(params, scrape_jobs)
             return jobs
         except Exception as e:
             # Log error, raise custom exception, or return empty DataFrame
@@ -0,0 +1,35 @@
+"""Add match_watermarks table
+
+Revision ID: 3b9d7e2a6c51
+Revises: f85c2a7d4e16
+Create Date: 2026-10-18 18:04:27.311958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d7e2a6c51'
+down_revision: Union[str, Sequence[str], None] = 'f85c2a7d4e16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('match_watermarks',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('profile_hash', sa.String(length=64), nullable=False),
+    sa.Column('matched_until', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('match_watermarks')
@@ -0,0 +1,37 @@
+"""Add scrape_watermarks table for incremental scraping
+
+Revision ID: 5e8a0f3c6b21
+Revises: c41e7b2d9f08
+Create Date: 2026-10-18 12:26:51.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a0f3c6b21'
+down_revision: Union[str, Sequence[str], None] = 'c41e7b2d9f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scrape_watermarks',
+    sa.Column('site', sa.String(length=50), nullable=False),
+    sa.Column('search_term', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('last_success_at', sa.DateTime(), nullable=True),
+    sa.Column('newest_date_posted', sa.Date(), nullable=True),
+    sa.Column('edge_ids', sa.JSON(), nullable=True),
+    sa.Column('jobs_per_hour', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('site', 'search_term', 'location')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scrape_watermarks')
@@ -0,0 +1,38 @@
+"""Add resume_section_embeddings table
+
+Revision ID: 6e1f0b9d4a27
+Revises: 9c4f1a8e2b73
+Create Date: 2026-10-18 21:12:53.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1f0b9d4a27'
+down_revision: Union[str, Sequence[str], None] = '9c4f1a8e2b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resume_section_embeddings',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('dim', sa.Integer(), nullable=False),
+    sa.Column('sections', sa.Integer(), nullable=False),
+    sa.Column('vectors', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'model')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resume_section_embeddings')
@@ -0,0 +1,28 @@
+"""Add index on jobs.job_url for set-based dedupe in the loader
+
+Revision ID: 9b1f3c2d7a10
+Revises: 4c45137a8d55
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b1f3c2d7a10'
+down_revision: Union[str, Sequence[str], None] = '4c45137a8d55'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_jobs_job_url'), 'jobs', ['job_url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_job_url'), table_name='jobs')
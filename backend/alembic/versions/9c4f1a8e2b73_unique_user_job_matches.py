@@ -0,0 +1,43 @@
+"""Add unique constraint on user_job_matches (user_id, job_id)
+
+Revision ID: 9c4f1a8e2b73
+Revises: 3b9d7e2a6c51
+Create Date: 2026-10-18 19:22:06.845130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f1a8e2b73'
+down_revision: Union[str, Sequence[str], None] = '3b9d7e2a6c51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing duplicates are collapsed onto the newest row, which keeps EMAIL_SENT if any copy was emailed.
+    op.execute("""
+        UPDATE user_job_matches AS keep
+        SET status = 'EMAIL_SENT'
+        WHERE EXISTS (
+            SELECT 1 FROM user_job_matches AS dup
+            WHERE dup.user_id = keep.user_id AND dup.job_id = keep.job_id
+              AND dup.id <> keep.id AND dup.status = 'EMAIL_SENT'
+        )
+    """)
+    op.execute("""
+        DELETE FROM user_job_matches AS old
+        USING user_job_matches AS newer
+        WHERE old.user_id = newer.user_id AND old.job_id = newer.job_id AND old.id < newer.id
+    """)
+    op.create_unique_constraint('uq_user_job_matches_user_job', 'user_job_matches', ['user_id', 'job_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_user_job_matches_user_job', 'user_job_matches', type_='unique')
@@ -0,0 +1,50 @@
+"""Add canonical_job_id to jobs and the near-duplicate LSH index tables
+
+Revision ID: c41e7b2d9f08
+Revises: 9b1f3c2d7a10
+Create Date: 2026-10-18 11:02:17.530961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7b2d9f08'
+down_revision: Union[str, Sequence[str], None] = '9b1f3c2d7a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('canonical_job_id', sa.String(), nullable=True))
+    op.create_index(op.f('ix_jobs_canonical_job_id'), 'jobs', ['canonical_job_id'], unique=False)
+    op.create_foreign_key('jobs_canonical_job_id_fkey', 'jobs', 'jobs', ['canonical_job_id'], ['job_id'],
+                          ondelete='SET NULL')
+    op.create_table('job_signatures',
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('minhash', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+    op.create_table('job_lsh_buckets',
+    sa.Column('band', sa.SmallInteger(), nullable=False),
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.job_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('band', 'bucket', 'job_id')
+    )
+    op.create_index(op.f('ix_job_lsh_buckets_job_id'), 'job_lsh_buckets', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_job_lsh_buckets_job_id'), table_name='job_lsh_buckets')
+    op.drop_table('job_lsh_buckets')
+    op.drop_table('job_signatures')
+    op.drop_constraint('jobs_canonical_job_id_fkey', 'jobs', type_='foreignkey')
+    op.drop_index(op.f('ix_jobs_canonical_job_id'), table_name='jobs')
+    op.drop_column('jobs', 'canonical_job_id')
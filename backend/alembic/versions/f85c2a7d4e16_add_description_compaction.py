@@ -0,0 +1,35 @@
+"""Add compact_description to jobs and the paragraph_frequencies table
+
+Revision ID: f85c2a7d4e16
+Revises: d2b6c8e4a913
+Create Date: 2026-10-18 16:31:42.507726
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f85c2a7d4e16'
+down_revision: Union[str, Sequence[str], None] = 'd2b6c8e4a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('compact_description', sa.Text(), nullable=True))
+    op.create_table('paragraph_frequencies',
+    sa.Column('paragraph_hash', sa.BigInteger(), nullable=False),
+    sa.Column('doc_count', sa.Integer(), nullable=False),
+    sa.Column('last_seen', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('paragraph_hash')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('paragraph_frequencies')
+    op.drop_column('jobs', 'compact_description')
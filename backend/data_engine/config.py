@@ -9,3 +9,56 @@ LOCATIONS_CONFIG_PATH = os.path.join(BASE_DIR, 'config', 'locations.json')
 # --- Scraping Parameters ---
 DEFAULT_JOBS_TO_SCRAPE = 100
 DEFAULT_HOURS_OLD = 24 # Corresponds to jobs posted in the last day
+
+# --- Incremental Scraping ---
+INCREMENTAL_SCRAPING = True  # shrink hours_old/results_wanted to the gap since each query's last fetch
+INCREMENTAL_OVERLAP_HOURS = 1  # extra hours fetched before the mark so nothing at the edge is missed
+INCREMENTAL_HEADROOM = 1.5  # results_wanted = observed jobs per hour x gap x headroom
+INCREMENTAL_MIN_RESULTS = 10
+INCREMENTAL_EDGE_IDS = 200  # ids kept from the newest posting date to detect overlap
+
+# --- Scrape Cache ---
+# "on" serves repeated queries from disk within the TTL, "off" always scrapes,
+# "replay" never touches the network and runs the pipeline from whatever is cached.
+SCRAPE_CACHE_MODE = os.getenv('SCRAPE_CACHE_MODE', 'on')
+SCRAPE_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'scrapes')
+SCRAPE_CACHE_TTL = 30 * 60  # seconds a cached result is served outside replay mode
+SCRAPE_CACHE_MAX_BYTES = 512 * 2**20  # least recently used entries are evicted beyond this
+
+# --- Concurrent Scraping ---
+SCRAPE_MAX_WORKERS = 8
+# Max simultaneous requests per site (lower-cased site name); protects against rate limiting
+SCRAPE_SITE_CONCURRENCY = {"indeed": 3, "linkedin": 2}
+SCRAPE_DEFAULT_SITE_CONCURRENCY = 2
+SCRAPE_TASK_TIMEOUT = 180  # seconds a single scrape may run before it is abandoned
+
+# --- Loading ---
+LOAD_BATCH_SIZE = 1000  # rows per multi-row INSERT; keeps bind parameters under PostgreSQL's limit
+
+# --- Enrichment ---
+ENRICH_MAX_WORKERS = None  # None uses every core
+ENRICH_CHUNK_SIZE = 250  # postings per task sent to a worker process
+ENRICH_PARALLEL_THRESHOLD = 500  # smaller batches are enriched in-process
+
+# --- Seen Job Index ---
+SEEN_INDEX_PATH = os.path.join(BASE_DIR, 'cache', 'seen_jobs.bloom')
+SEEN_INDEX_CAPACITY = 1_000_000  # ids before the filter is rebuilt at double the size
+SEEN_INDEX_ERROR_RATE = 0.001  # false positives are confirmed against the database
+SEEN_INDEX_BATCH_SIZE = 5000  # rows per catch-up read and ids per confirmation query
+
+# --- Streaming Pipeline ---
+STREAMING_PIPELINE = False  # run fetch/transform/enrich/load as concurrent stages
+STREAM_QUEUE_SIZE = 4  # batches buffered between stages before the producer blocks
+STREAM_ENRICH_IN_PROCESS_POOL = True  # enrich in a worker process so it does not contend for the GIL
+
+# --- Near-Duplicate Detection ---
+DEDUP_ENABLED = True  # link reposts and cross-site copies to a canonical job at load time
+DEDUP_NUM_PERM = 128  # MinHash permutations per signature
+DEDUP_LSH_BANDS = 16  # bands of DEDUP_NUM_PERM / DEDUP_LSH_BANDS rows; more bands find more candidates
+DEDUP_SHINGLE_SIZE = 3  # words per shingle
+DEDUP_SIMILARITY_THRESHOLD = 0.8  # estimated Jaccard similarity at which a candidate is a duplicate
+
+# --- Description Compaction ---
+COMPACT_DESCRIPTIONS = True  # strip boilerplate paragraphs before embedding; the full text is kept too
+BOILERPLATE_MIN_COUNT = 20  # postings a paragraph must appear in to count as boilerplate
+BOILERPLATE_MIN_CHARS = 80  # shorter paragraphs (headings, single bullets) are never stripped
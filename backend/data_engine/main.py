@@ -5,13 +5,17 @@ from typing import Dict, List
 
 import pandas as pd
 
-from backend.database.setup_db import get_db
+from backend.database.setup_db import SessionLocal, get_db
 from backend.schemas.job import JobPosting
-from scrapers.indeed_scraper import IndeedScraper
-from pipeline.fetcher import fetch_jobs
-from pipeline.transformer import transform_jobs
-from pipeline.loader import load_jobs_to_db, get_seen_job_ids, add_seen_jobs
-import config
+from backend.data_engine import config
+from backend.data_engine.scrapers.indeed_scraper import IndeedScraper
+from backend.data_engine.pipeline.enricher import enrich_jobs
+from backend.data_engine.pipeline.executor import build_scrape_tasks, run_scrape_tasks
+from backend.data_engine.pipeline.seen_index import SeenJobIndex
+from backend.data_engine.pipeline.streaming import run_streaming_pipeline
+from backend.data_engine.pipeline.transformer import transform_jobs
+from backend.data_engine.pipeline.watermarks import ScrapeWatermarks, watermarks_enabled
+from backend.data_engine.pipeline.loader import load_jobs_to_db, add_seen_jobs
 
 
 def setup_logging():
@@ -46,6 +50,7 @@ def main():
     LOCATIONS = ["Hyderabad", "Bengaluru","Mumbai"]
     JOBS_TO_SCRAPE = config.DEFAULT_JOBS_TO_SCRAPE
     HOURS_OLD = config.DEFAULT_HOURS_OLD
+    STREAMING = config.STREAMING_PIPELINE  # overlap fetch/transform/enrich/load
     # -----------------------------
 
     locations = load_locations(config.LOCATIONS_CONFIG_PATH)
@@ -72,43 +77,54 @@ def main():
     # Initialize scrapers
     scrapers = [IndeedScraper()]
 
-    # Get DB session and seen jobs
+    # Get DB session and the seen-job index
     db = next(get_db())
-    seen_job_ids = get_seen_job_ids(db)
-
-    # Loop over each search term
-    for search_term in SEARCH_TERMS:
-        logging.info(f"=== Processing search term: '{search_term}' ===")
-        for common_name, location_map in locations_to_process.items():
-            logging.info(f"--- Processing location: {common_name} ---")
-
-            # 1. Fetch new jobs
-            raw_jobs_df = fetch_jobs(
-                scrapers=scrapers,
-                search_term=search_term,
-                location_map=location_map,
-                jobs=JOBS_TO_SCRAPE,
-                hours_old=HOURS_OLD,
-                seen_job_ids=seen_job_ids
-            )
-            if raw_jobs_df.empty:
-                logging.warning(f"No new jobs found for '{search_term}' in '{common_name}'.")
-                continue
-
-            # 2. Add new jobs to seen_jobs table
-            add_seen_jobs(db, raw_jobs_df)
-
-            # 3. Transform
-            logging.info(f"Transforming {len(raw_jobs_df)} raw job listings for {common_name}...")
-            job_postings = transform_jobs(raw_jobs_df)
-
-            # 4. Load / Save
-            if not job_postings:
-                logging.info("No job postings were found after transformation.")
-                continue
-
-            logging.info(f"Loading {len(job_postings)} job postings to the database for {common_name}...")
-            load_jobs_to_db(job_postings, db)
+    seen_index = SeenJobIndex.open(db)
+
+    # 1. Fetch new jobs for every search term x location concurrently
+    tasks = build_scrape_tasks(scrapers, SEARCH_TERMS, locations_to_process, JOBS_TO_SCRAPE, HOURS_OLD)
+    watermarks = None
+    if watermarks_enabled():
+        # Only ask for what was posted since each query's last successful fetch
+        watermarks = ScrapeWatermarks.load(db, tasks)
+        tasks = watermarks.plan(tasks)
+    if STREAMING:
+        run_streaming_pipeline(db, tasks, seen_index, SessionLocal, watermarks=watermarks)
+        logging.info("--- Pipeline finished successfully. ---")
+        return
+    scraped = run_scrape_tasks(tasks, seen_job_ids=seen_index,
+                               on_result=watermarks.record if watermarks else None)
+
+    job_postings, fetched = [], []
+    for (search_term, common_name), raw_jobs_df in scraped.items():
+        logging.info(f"--- Processing '{search_term}' in {common_name} ---")
+        if raw_jobs_df.empty:
+            logging.warning(f"No new jobs found for '{search_term}' in '{common_name}'.")
+            continue
+
+        fetched.append(raw_jobs_df)
+
+        # 2. Transform
+        logging.info(f"Transforming {len(raw_jobs_df)} raw job listings for {common_name}...")
+        job_postings.extend(transform_jobs(raw_jobs_df, common_name))
+
+    # 3. Enrich the whole run at once: extract experience and drop jobs outside the saved range
+    job_postings = enrich_jobs(job_postings)
+
+    # 4. Load / Save
+    if not job_postings:
+        logging.info("No job postings left after transformation and enrichment.")
+    else:
+        logging.info(f"Loading {len(job_postings)} job postings to the database...")
+        load_jobs_to_db(job_postings, db)
+
+    # 5. Add the fetched jobs to seen_jobs, only now that they are stored
+    for raw_jobs_df in fetched:
+        add_seen_jobs(db, raw_jobs_df, seen_index)
+
+    # 6. Advance the per-query watermarks now that the run's jobs are stored
+    if watermarks is not None:
+        watermarks.save()
 
     logging.info("--- Pipeline finished successfully. ---")
 
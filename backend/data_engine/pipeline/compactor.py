@@ -0,0 +1,152 @@
+# pipeline/compactor.py
+import hashlib
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.data_engine import config
+from backend.database.models import ParagraphFrequency
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def split_paragraphs(text: Optional[str]) -> List[str]:
+    """Splits a description on blank lines, dropping empty paragraphs."""
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(text or "") if p.strip()]
+
+
+def paragraph_hash(paragraph: str) -> int:
+    """Signed 64-bit hash of a paragraph, insensitive to case, punctuation and whitespace."""
+    normalized = _NON_WORD.sub(" ", paragraph.lower()).strip()
+    return int.from_bytes(hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def word_count(text: Optional[str]) -> int:
+    return len((text or "").split())
+
+
+class CompactionReport:
+    """Word counts before and after compaction; words stand in for model tokens."""
+
+    def __init__(self):
+        self.documents = 0
+        self.compacted = 0
+        self.paragraphs_removed = 0
+        self.words_before = 0
+        self.words_after = 0
+
+    @property
+    def reduction(self) -> float:
+        return 1 - self.words_after / self.words_before if self.words_before else 0.0
+
+    def estimated_seconds_saved(self, encode_seconds: float) -> float:
+        """Encode time saved, assuming encoding cost grows linearly with input length."""
+        return encode_seconds * (self.words_before / self.words_after - 1) if self.words_after else 0.0
+
+    def summary(self) -> str:
+        return (f"compacted {self.compacted}/{self.documents} descriptions, removed {self.paragraphs_removed} "
+                f"boilerplate paragraphs, {self.words_before} -> {self.words_after} words "
+                f"(-{self.reduction * 100:.1f}%)")
+
+
+class DescriptionCompactor:
+    """
+    Strips company boilerplate (EEO statements, benefits blurbs, "About us" sections) from
+    job descriptions before they are embedded.
+
+    Paragraph document frequencies are learned across the corpus in the paragraph_frequencies
+    table: every new canonical posting increments the count of each distinct paragraph it
+    contains. A paragraph of at least BOILERPLATE_MIN_CHARS characters seen in at least
+    BOILERPLATE_MIN_COUNT postings is treated as boilerplate and removed. A description is
+    never compacted to nothing; if every paragraph is boilerplate it is kept as is.
+    """
+
+    def __init__(self, db, min_count: Optional[int] = None, min_chars: Optional[int] = None):
+        self.db = db
+        self.min_count = min_count or config.BOILERPLATE_MIN_COUNT
+        self.min_chars = min_chars or config.BOILERPLATE_MIN_CHARS
+
+    def _batch_counts(self, descriptions: Iterable[str]) -> Counter:
+        """Per paragraph hash, how many of the descriptions contain it."""
+        batch_counts = Counter()
+        for description in descriptions:
+            batch_counts.update({
+                paragraph_hash(p) for p in split_paragraphs(description) if len(p) >= self.min_chars
+            })
+        return batch_counts
+
+    def learn(self, descriptions: Iterable[str]) -> Dict[int, int]:
+        """Adds the descriptions to the frequency table and returns the updated counts of their paragraphs."""
+        batch_counts = self._batch_counts(descriptions)
+        if not batch_counts:
+            return {}
+
+        now = datetime.utcnow()
+        counts = {}
+        items = sorted(batch_counts.items())  # stable lock order across concurrent loaders
+        for start in range(0, len(items), config.LOAD_BATCH_SIZE):
+            stmt = insert(ParagraphFrequency).values([
+                {"paragraph_hash": h, "doc_count": n, "last_seen": now}
+                for h, n in items[start:start + config.LOAD_BATCH_SIZE]
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["paragraph_hash"],
+                set_={"doc_count": ParagraphFrequency.doc_count + stmt.excluded.doc_count,
+                      "last_seen": stmt.excluded.last_seen},
+            ).returning(ParagraphFrequency.paragraph_hash, ParagraphFrequency.doc_count)
+            counts.update(self.db.execute(stmt).fetchall())
+        return counts
+
+    def counts_for(self, descriptions: Iterable[str]) -> Dict[int, int]:
+        """Current counts of the descriptions' paragraphs, without learning from them."""
+        hashes = list({
+            paragraph_hash(p) for d in descriptions for p in split_paragraphs(d) if len(p) >= self.min_chars
+        })
+        counts = {}
+        for start in range(0, len(hashes), config.LOAD_BATCH_SIZE):
+            counts.update(
+                self.db.query(ParagraphFrequency.paragraph_hash, ParagraphFrequency.doc_count)
+                .filter(ParagraphFrequency.paragraph_hash.in_(hashes[start:start + config.LOAD_BATCH_SIZE]))
+                .all()
+            )
+        return counts
+
+    def counts_with(self, descriptions: List[str]) -> Dict[int, int]:
+        """
+        The counts `learn` would return for the descriptions, without writing them; for
+        compacting a batch before knowing which of its descriptions will be stored.
+        """
+        counts = Counter(self.counts_for(descriptions))
+        counts.update(self._batch_counts(descriptions))
+        return dict(counts)
+
+    def compact(self, description: str, counts: Dict[int, int], report: Optional[CompactionReport] = None) -> str:
+        paragraphs = split_paragraphs(description)
+        kept = [
+            p for p in paragraphs
+            if len(p) < self.min_chars or counts.get(paragraph_hash(p), 0) < self.min_count
+        ]
+        if not kept:
+            kept = paragraphs
+        compacted = "\n\n".join(kept)
+        if report is not None:
+            report.documents += 1
+            report.compacted += len(kept) < len(paragraphs)
+            report.paragraphs_removed += len(paragraphs) - len(kept)
+            report.words_before += word_count(description)
+            report.words_after += word_count(compacted)
+        return compacted
+
+    def compact_batch(self, descriptions: List[str], learn: bool = True,
+                      report: Optional[CompactionReport] = None) -> Tuple[List[str], CompactionReport]:
+        """Learns from (optionally) and compacts a batch of descriptions, accumulating into `report`."""
+        counts = self.learn(descriptions) if learn else self.counts_for(descriptions)
+        report = report if report is not None else CompactionReport()
+        return [self.compact(description, counts, report) for description in descriptions], report
@@ -0,0 +1,176 @@
+# pipeline/deduplicator.py
+import hashlib
+import logging
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.data_engine import config
+from backend.database.models import Job, JobLshBucket, JobSignature
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Mersenne prime 2^31 - 1: a * x + b stays below 2^64 for 32-bit shingle hashes.
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def normalize_posting_text(title: Optional[str], company: Optional[str], description: Optional[str]) -> List[str]:
+    """Lower-cases title, company and description and splits them into alphanumeric tokens."""
+    text = " ".join(part for part in (title, company, description) if part)
+    return _TOKEN.findall(text.lower())
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, using one universal hash family per permutation."""
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+    def shingle_hashes(self, tokens: List[str]) -> np.ndarray:
+        k = self.shingle_size
+        if len(tokens) <= k:
+            shingles = {" ".join(tokens)} if tokens else set()
+        else:
+            shingles = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+        return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signature(self, tokens: List[str]) -> Optional[np.ndarray]:
+        """Returns the uint32 MinHash signature of `tokens`, or None when there is nothing to hash."""
+        hashes = self.shingle_hashes(tokens)
+        if not hashes.size:
+            return None
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the share of permutations on which the minima agree."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """
+    Links near-duplicate job postings to a canonical job at ingest.
+
+    Every stored job has a MinHash signature over its normalized title, company and
+    description (job_signatures), split into LSH bands whose hashes are stored in
+    job_lsh_buckets. Postings sharing a bucket with a stored or earlier posting are
+    candidates; a candidate whose estimated similarity reaches the threshold is a duplicate,
+    and the posting is linked to that candidate's canonical job. Reposts with a new external
+    id and the same posting on another site therefore collapse onto the first one seen.
+
+    Usage per batch: `link(rows)` before inserting the rows, then `save(inserted_ids)` once
+    the inserted job ids are known. Both run on the caller's session and transaction.
+    """
+
+    def __init__(self, db, num_perm: Optional[int] = None, bands: Optional[int] = None,
+                 shingle_size: Optional[int] = None, threshold: Optional[float] = None):
+        self.db = db
+        self.hasher = MinHasher(num_perm or config.DEDUP_NUM_PERM, shingle_size or config.DEDUP_SHINGLE_SIZE)
+        self.bands = bands or config.DEDUP_LSH_BANDS
+        if self.hasher.num_perm % self.bands:
+            raise ValueError(f"{self.hasher.num_perm} permutations cannot be split into {self.bands} bands.")
+        self.rows_per_band = self.hasher.num_perm // self.bands
+        self.threshold = config.DEDUP_SIMILARITY_THRESHOLD if threshold is None else threshold
+
+        # Postings linked but not saved yet, so duplicates inside one batch are caught too.
+        self._pending: Dict[str, Tuple[np.ndarray, List[Tuple[int, int]], Optional[str]]] = {}
+        self._pending_buckets: Dict[Tuple[int, int], List[str]] = {}
+
+    def band_keys(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        """(band, bucket) pairs for a signature; buckets are signed 64-bit hashes of each band."""
+        r = self.rows_per_band
+        keys = []
+        for band in range(self.bands):
+            digest = hashlib.blake2b(signature[band * r:(band + 1) * r].tobytes(), digest_size=8).digest()
+            keys.append((band, int.from_bytes(digest, "little", signed=True)))
+        return keys
+
+    def _stored_candidates(self, keys: Iterable[Tuple[int, int]]):
+        """Signatures and canonical ids of stored jobs sharing any of `keys`, plus the buckets they matched."""
+        signatures: Dict[str, Tuple[np.ndarray, Optional[str]]] = {}
+        buckets: Dict[Tuple[int, int], List[str]] = {}
+        keys = list(set(keys))
+        if not keys:
+            return signatures, buckets
+        rows = (
+            self.db.query(JobLshBucket.band, JobLshBucket.bucket, JobSignature.job_id,
+                          JobSignature.minhash, Job.canonical_job_id)
+            .join(JobSignature, JobSignature.job_id == JobLshBucket.job_id)
+            .join(Job, Job.job_id == JobLshBucket.job_id)
+            .filter(tuple_(JobLshBucket.band, JobLshBucket.bucket).in_(keys))
+            .all()
+        )
+        for band, bucket, job_id, minhash, canonical in rows:
+            buckets.setdefault((band, bucket), []).append(job_id)
+            if job_id not in signatures:
+                signatures[job_id] = (np.frombuffer(minhash, dtype="<u4"), canonical)
+        return signatures, buckets
+
+    def link(self, rows: List[Dict]) -> int:
+        """
+        Sets "canonical_job_id" on every row dict that duplicates a stored or earlier posting.
+        Rows need "job_id", "title", "company" and "description". Returns the number linked.
+        """
+        signed = []
+        for row in rows:
+            signature = self.hasher.signature(
+                normalize_posting_text(row.get("title"), row.get("company"), row.get("description"))
+            )
+            if signature is not None:
+                signed.append((row, signature, self.band_keys(signature)))
+
+        # One round trip for the whole batch.
+        stored, stored_buckets = self._stored_candidates(key for _, _, keys in signed for key in keys)
+        linked = 0
+        for row, signature, keys in signed:
+            candidates = set()
+            for key in keys:
+                candidates.update(self._pending_buckets.get(key, ()))
+                candidates.update(stored_buckets.get(key, ()))
+            candidates.discard(row["job_id"])
+
+            best_id, best_similarity = None, self.threshold
+            for job_id in candidates:
+                candidate_sig = self._pending[job_id][0] if job_id in self._pending else stored[job_id][0]
+                similarity = estimate_similarity(signature, candidate_sig)
+                if similarity >= best_similarity:
+                    best_id, best_similarity = job_id, similarity
+
+            canonical = None
+            if best_id is not None:
+                canonical = (self._pending[best_id][2] if best_id in self._pending else stored[best_id][1]) or best_id
+                linked += 1
+            row["canonical_job_id"] = canonical
+
+            self._pending[row["job_id"]] = (signature, keys, canonical)
+            for key in keys:
+                self._pending_buckets.setdefault(key, []).append(row["job_id"])
+        return linked
+
+    def save(self, job_ids: Iterable[str]):
+        """Stores signatures and LSH buckets of linked postings that were inserted, then forgets the batch."""
+        signatures, buckets = [], []
+        for job_id in job_ids:
+            if job_id not in self._pending:
+                continue
+            signature, keys, _ = self._pending[job_id]
+            signatures.append({"job_id": job_id, "minhash": signature.astype("<u4").tobytes()})
+            buckets.extend({"band": band, "bucket": bucket, "job_id": job_id} for band, bucket in keys)
+
+        if signatures:
+            self.db.execute(insert(JobSignature).values(signatures).on_conflict_do_nothing(index_elements=["job_id"]))
+            for start in range(0, len(buckets), config.LOAD_BATCH_SIZE):
+                self.db.execute(insert(JobLshBucket).values(buckets[start:start + config.LOAD_BATCH_SIZE])
+                                .on_conflict_do_nothing())
+        self._pending.clear()
+        self._pending_buckets.clear()
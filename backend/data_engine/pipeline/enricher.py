@@ -0,0 +1,104 @@
+# pipeline/enricher.py
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from backend.data_engine import config
+from backend.data_engine.pipeline.experience_extractor import extract_experience
+from backend.data_engine.pipeline.filter import should_save_job
+from backend.schemas.job import JobPosting
+
+logger = logging.getLogger(__name__)
+
+# An extractor inspects one posting and returns the fields to update on it ({} for none),
+# or None to drop the posting. Extractors run in worker processes, so they must be
+# module-level functions (picklable) without side effects on shared state.
+Extractor = Callable[[JobPosting], Optional[Dict[str, Any]]]
+
+
+def extract_min_experience(posting: JobPosting) -> Optional[Dict[str, Any]]:
+    """Fills min_exp_required from the description unless it is already set."""
+    if posting.min_exp_required is not None:
+        return {}
+    return {"min_exp_required": extract_experience(posting.description)}
+
+
+def filter_on_experience(posting: JobPosting) -> Optional[Dict[str, Any]]:
+    """Drops postings whose min_exp_required is outside the range we save."""
+    return {} if should_save_job(posting.min_exp_required) else None
+
+
+DEFAULT_EXTRACTORS: Sequence[Extractor] = (extract_min_experience, filter_on_experience)
+
+
+def _extract_updates(posting: JobPosting, extractors: Sequence[Extractor]) -> Optional[Dict[str, Any]]:
+    """Runs the extractor chain on one posting and returns the merged updates (None = dropped)."""
+    updates: Dict[str, Any] = {}
+    for extractor in extractors:
+        result = extractor(posting)
+        if result is None:
+            return None
+        if result:
+            posting = posting.model_copy(update=result)
+            updates.update(result)
+    return updates
+
+
+def _extract_chunk(postings: List[JobPosting], extractors: Sequence[Extractor]) -> List[Optional[Dict[str, Any]]]:
+    # Only the updates travel back to the parent, not the (large) descriptions.
+    return [_extract_updates(posting, extractors) for posting in postings]
+
+
+def _map_chunks(pool: ProcessPoolExecutor, chunks: List[List[JobPosting]],
+                extractors: Sequence[Extractor]) -> List[Optional[Dict[str, Any]]]:
+    return [
+        updates
+        for chunk_results in pool.map(partial(_extract_chunk, extractors=extractors), chunks)
+        for updates in chunk_results
+    ]
+
+
+def enrich_jobs(
+    job_postings: List[JobPosting],
+    extractors: Sequence[Extractor] = DEFAULT_EXTRACTORS,
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> List[JobPosting]:
+    """
+    Runs per-posting extractors over a batch, sharding it across a process pool.
+
+    Postings are split into chunks of `chunk_size` and results are collected in input order.
+    Batches smaller than ENRICH_PARALLEL_THRESHOLD (or max_workers=1) run in-process, since
+    starting workers would cost more than the work itself. A caller that enriches many
+    batches can pass a long-lived `pool`, which is then always used.
+
+    Returns:
+        The enriched postings, in input order, without the ones an extractor dropped.
+    """
+    if not job_postings:
+        return []
+
+    max_workers = max_workers or config.ENRICH_MAX_WORKERS or os.cpu_count() or 1
+    chunk_size = chunk_size or config.ENRICH_CHUNK_SIZE
+    chunks = [job_postings[i:i + chunk_size] for i in range(0, len(job_postings), chunk_size)]
+
+    if pool is not None:
+        results = _map_chunks(pool, chunks, extractors)
+    elif max_workers == 1 or len(chunks) == 1 or len(job_postings) < config.ENRICH_PARALLEL_THRESHOLD:
+        results = _extract_chunk(job_postings, extractors)
+    else:
+        workers = min(max_workers, len(chunks))
+        logger.info(f"Enriching {len(job_postings)} postings in {len(chunks)} chunks on {workers} processes.")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = _map_chunks(pool, chunks, extractors)
+
+    enriched = [
+        posting.model_copy(update=updates) if updates else posting
+        for posting, updates in zip(job_postings, results)
+        if updates is not None
+    ]
+    logger.info(f"Enriched {len(job_postings)} postings; kept {len(enriched)}, dropped {len(job_postings) - len(enriched)}.")
+    return enriched
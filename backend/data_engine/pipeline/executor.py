@@ -0,0 +1,212 @@
+# pipeline/executor.py
+import logging
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+import pandas as pd
+
+from backend.data_engine import config
+from backend.data_engine.pipeline.seen_index import SeenJobIndex
+from backend.data_engine.scrapers.base_scraper import BaseScraper
+
+logger = logging.getLogger(__name__)
+
+SeenJobs = Union[Set[str], SeenJobIndex]
+
+# How often the collector wakes up to check for timed-out scrapes.
+_POLL_INTERVAL = 0.5
+
+
+class ScrapeTask(NamedTuple):
+    """A single scraper x search term x location combination."""
+    scraper: BaseScraper
+    search_term: str
+    common_location: str
+    site_location: str
+    jobs: int
+    hours_old: int
+
+    @property
+    def site(self) -> str:
+        return self.scraper.site_name.lower()
+
+
+class ScrapeResult(NamedTuple):
+    """Outcome of one ScrapeTask. `ok` is False when the scrape raised or timed out."""
+    task: ScrapeTask
+    jobs_df: pd.DataFrame
+    ok: bool
+    elapsed: float
+
+
+def build_scrape_tasks(
+    scrapers: List[BaseScraper],
+    search_terms: List[str],
+    locations_to_process: Dict[str, dict],
+    jobs: int,
+    hours_old: int,
+) -> List[ScrapeTask]:
+    """Expands scrapers x search terms x locations into a flat list of tasks."""
+    tasks = []
+    for search_term in search_terms:
+        for common_name, location_map in locations_to_process.items():
+            for scraper in scrapers:
+                site_location = location_map.get(scraper.site_name.lower())
+                if not site_location:
+                    logger.warning(f"No location mapping found for {scraper.site_name} in '{common_name}'. Skipping.")
+                    continue
+                tasks.append(ScrapeTask(scraper, search_term, common_name, site_location, jobs, hours_old))
+    return tasks
+
+
+def _run_task(task: ScrapeTask, clock: list) -> pd.DataFrame:
+    # The timeout is measured from the moment a worker picks the task up, not from submission.
+    clock[0] = time.monotonic()
+    logger.info(f"Fetching jobs from {task.scraper.site_name} for '{task.search_term}' in '{task.site_location}'...")
+    df = task.scraper.scrape(task.search_term, task.site_location, task.jobs, task.hours_old)
+    return df if df is not None else pd.DataFrame()
+
+
+def iter_scrape_results(
+    tasks: List[ScrapeTask],
+    max_workers: Optional[int] = None,
+    site_limits: Optional[Dict[str, int]] = None,
+    task_timeout: Optional[float] = None,
+) -> Iterator[ScrapeResult]:
+    """
+    Runs scrape tasks on a bounded thread pool and yields results as they complete.
+
+    Tasks are submitted lazily: at most `max_workers` are in flight and no site exceeds its
+    entry in `site_limits`, so a consumer that stops pulling also stops new requests from
+    being issued. A task that runs longer than `task_timeout` seconds is reported as failed;
+    its thread cannot be interrupted, so it is abandoned rather than cancelled.
+    """
+    max_workers = max_workers or config.SCRAPE_MAX_WORKERS
+    site_limits = config.SCRAPE_SITE_CONCURRENCY if site_limits is None else site_limits
+    task_timeout = config.SCRAPE_TASK_TIMEOUT if task_timeout is None else task_timeout
+
+    pending = deque(tasks)
+    running = {}  # future -> (task, clock)
+    per_site = defaultdict(int)
+
+    def site_limit(site: str) -> int:
+        return max(1, site_limits.get(site, config.SCRAPE_DEFAULT_SITE_CONCURRENCY))
+
+    def release(future):
+        task, clock = running.pop(future)
+        per_site[task.site] -= 1
+        return task, (time.monotonic() - clock[0]) if clock[0] else 0.0
+
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape")
+    try:
+        while pending or running:
+            # Submit every waiting task whose site still has capacity, preserving order.
+            for _ in range(len(pending)):
+                if len(running) >= max_workers:
+                    break
+                task = pending.popleft()
+                if per_site[task.site] >= site_limit(task.site):
+                    pending.append(task)
+                    continue
+                clock = [None]
+                running[pool.submit(_run_task, task, clock)] = (task, clock)
+                per_site[task.site] += 1
+
+            done, _ = wait(list(running), timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, elapsed = release(future)
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching from {task.scraper.site_name} for '{task.search_term}' "
+                                 f"in '{task.site_location}': {e}", exc_info=True)
+                    yield ScrapeResult(task, pd.DataFrame(), False, elapsed)
+                    continue
+                logger.info(f"Fetched {len(df)} jobs from {task.scraper.site_name} for '{task.search_term}' "
+                            f"in '{task.site_location}' in {elapsed:.1f}s.")
+                yield ScrapeResult(task, df, True, elapsed)
+
+            if not task_timeout:
+                continue
+            now = time.monotonic()
+            for future, (task, clock) in list(running.items()):
+                if clock[0] is not None and now - clock[0] > task_timeout:
+                    release(future)
+                    logger.error(f"Timed out after {task_timeout}s fetching from {task.scraper.site_name} "
+                                 f"for '{task.search_term}' in '{task.site_location}'.")
+                    yield ScrapeResult(task, pd.DataFrame(), False, now - clock[0])
+    finally:
+        # Do not block on abandoned (timed-out) scrapes or on tasks the consumer no longer wants.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def drop_seen_jobs(df: pd.DataFrame, seen_job_ids: Optional[SeenJobs]) -> pd.DataFrame:
+    """Removes rows whose external job id is in `seen_job_ids` (a set or a SeenJobIndex)."""
+    if df.empty or not seen_job_ids or 'id' not in df:
+        return df
+    if isinstance(seen_job_ids, SeenJobIndex):
+        seen_job_ids = seen_job_ids.seen_among(df['id'])
+    original_count = len(df)
+    df = df[~df['id'].isin(seen_job_ids)]
+    if original_count > len(df):
+        logger.info(f"Filtered out {original_count - len(df)} already seen jobs.")
+    return df
+
+
+def merge_scraped_jobs(frames: List[pd.DataFrame], seen_job_ids: Optional[SeenJobs] = None,
+                       claimed_ids: Optional[Set[str]] = None) -> pd.DataFrame:
+    """
+    Concatenates scraped frames, dropping seen jobs and ids already present in `claimed_ids`.
+    `claimed_ids` is updated in place so the same posting is only kept once per run.
+    """
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame()
+
+    merged_df = pd.concat(frames, ignore_index=True)
+    if 'id' in merged_df:
+        merged_df = merged_df.drop_duplicates(subset='id', keep='first')
+        if claimed_ids is not None:
+            merged_df = merged_df[~merged_df['id'].isin(claimed_ids)]
+            claimed_ids.update(merged_df['id'])
+    return drop_seen_jobs(merged_df, seen_job_ids).reset_index(drop=True)
+
+
+def run_scrape_tasks(
+    tasks: List[ScrapeTask],
+    seen_job_ids: Optional[SeenJobs] = None,
+    max_workers: Optional[int] = None,
+    site_limits: Optional[Dict[str, int]] = None,
+    task_timeout: Optional[float] = None,
+    on_result: Optional[Callable[[ScrapeResult], None]] = None,
+) -> Dict[Tuple[str, str], pd.DataFrame]:
+    """
+    Runs all tasks concurrently and merges their results per (search term, location).
+
+    The returned dict is ordered like `tasks`, independent of completion order. A posting
+    returned for several search terms or locations is kept only under the first of them.
+    `on_result`, if given, sees every raw result as it arrives (e.g. ScrapeWatermarks.record).
+    """
+    started = time.monotonic()
+    results: Dict[int, pd.DataFrame] = {}
+    index_of = {id(task): i for i, task in enumerate(tasks)}
+    failures = 0
+    for result in iter_scrape_results(tasks, max_workers, site_limits, task_timeout):
+        results[index_of[id(result.task)]] = result.jobs_df
+        failures += not result.ok
+        if on_result is not None:
+            on_result(result)
+
+    grouped: Dict[Tuple[str, str], List[pd.DataFrame]] = {}
+    for i, task in enumerate(tasks):
+        grouped.setdefault((task.search_term, task.common_location), []).append(results.get(i))
+
+    claimed_ids: Set[str] = set()
+    merged = {key: merge_scraped_jobs(frames, seen_job_ids, claimed_ids) for key, frames in grouped.items()}
+
+    total = sum(len(df) for df in merged.values())
+    logger.info(f"Ran {len(tasks)} scrape tasks ({failures} failed) in {time.monotonic() - started:.1f}s; "
+                f"{total} new jobs after merging.")
+    return merged
@@ -26,105 +26,127 @@ BLACKLIST_KEYWORDS = [
 ]
 
 
-def extract_experience(description: str) -> int:
+class ExperienceExtractor:
     """
-    Extracts minimum years of experience required from job description.
-    Returns:
-        int: Minimum years (0 for fresher, -1 for error/uncertain).
+    Precompiled, single-pass experience extractor.
+
+    All patterns and lookup tables are built once. Each document is split into lines once;
+    lines that are screened out (optional/blacklisted, or holding no digit and no year/exp
+    token, so no pattern could match) are dropped, and the survivors are cleaned and searched
+    together, joined by a separator no pattern can cross. The result is identical to
+    evaluating every pattern line by line. Keyword screens use plain substring tests, which
+    measure several times faster than a regex alternation on real descriptions.
     """
-    try:
-        if not description:
-            return 0
 
-        desc = description.lower()
+    # Never produced by cleaning and not matched by any pattern, so matches cannot span lines.
+    LINE_SEPARATOR = "|"
+
+    def __init__(self):
+        number_words = '|'.join(NUMBER_WORDS.keys())
+        self._fresher_terms = tuple(FRESHER_TERMS)
+        self._skip_keywords = tuple(OPTIONAL_KEYWORDS + BLACKLIST_KEYWORDS)
+        # Every pattern below needs a digit or a "year"/"yr"/"exp" token on the line.
+        self._may_match = re.compile(r'[0-9]|y(?:ea)?r|exp')
+        self._upper_bound = re.compile(r'\b(up to|max)\s+\d+\s+years?')
+
+        # Cleaning: anything but [a-z0-9.-] and line breaks becomes a space.
+        allowed = set('abcdefghijklmnopqrstuvwxyz0123456789.-\n')
+        self._ascii_cleanup = str.maketrans({i: ' ' for i in range(128) if chr(i) not in allowed})
+        self._non_ascii = re.compile(r'[^\x00-\x7f]+')
+        self._line_break = re.compile(r' *\n[ \n]*')
+        self._spaces = re.compile(r' {2,}')
+
+        # Ranges like "2-4 years" / "2 to 4 years"
+        self._range = re.compile(r'(\d+(?:\.\d+)?)\s*(?:-|to)\s*(\d+(?:\.\d+)?)\s*(?:years?|yrs?|y|exp)')
+        # Word ranges: "between three and five years"
+        self._word_range = re.compile(
+            r'between\s+(' + number_words + r')\s+(?:and|to)\s+(' + number_words + r')\s+years?'
+        )
+        # Numeric years: "5+ years", "3 years exp"
+        self._numeric_years = re.compile(r'(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?|y|exp)')
+        # Word-based years: "five years", "dozen years"
+        self._word_years = re.compile(r'\b(' + number_words + r')\b\s+(?:years?|yrs?|exp)')
+        # Months: "18 months", "6+ months"
+        self._months = re.compile(r'(\d+(?:\.\d+)?)\s*\+?\s*months?')
+
+    def _keep_line(self, line: str) -> bool:
+        if not self._may_match.search(line):
+            return False
+        return not any(k in line for k in self._skip_keywords)
+
+    def _clean(self, lines: List[str]) -> str:
+        text = "\n".join(lines)
+        if not text.isascii():
+            text = self._non_ascii.sub(' ', text)
+        text = text.translate(self._ascii_cleanup)
+        # Collapse spaces within a line and turn each line break into the separator.
+        return self._spaces.sub(' ', self._line_break.sub(self.LINE_SEPARATOR, text))
+
+    def _candidates(self, text: str) -> List[float]:
+        candidates: List[float] = []
+        candidates.extend(float(low) for low, _ in self._range.findall(text))
+        candidates.extend(float(NUMBER_WORDS[low]) for low, _ in self._word_range.findall(text))
+        candidates.extend(float(years) for years in self._numeric_years.findall(text))
+        candidates.extend(float(NUMBER_WORDS[word]) for word in self._word_years.findall(text))
+        candidates.extend(round(float(months) / 12, 1) for months in self._months.findall(text))
+        return candidates
+
+    def extract(self, description: str) -> int:
+        """
+        Extracts minimum years of experience required from job description.
+        Returns:
+            int: Minimum years (0 for fresher, -1 for error/uncertain).
+        """
+        try:
+            if not description:
+                return 0
 
-        # --- 1. Check for fresher roles ---
-        for term in FRESHER_TERMS:
-            if term in desc:
+            desc = description.lower()
+
+            # --- 1. Check for fresher roles ---
+            if any(term in desc for term in self._fresher_terms):
                 return 0
 
-        lines = desc.split("\n")
-        candidates: List[float] = []
+            # --- 2. Screen lines, then parse the survivors in one pass ---
+            lines = [line for line in desc.split("\n") if self._keep_line(line)]
+            candidates = self._candidates(self._clean(lines))
+
+            # --- 3. Post-processing ---
+            if not candidates:
+                return 0
+
+            if 0 in candidates:
+                return 0
+
+            # Special handling: "max X years" or "up to X years" → treat as fresher
+            if self._upper_bound.search(desc):
+                return 0
+
+            # Normally take the highest *minimum requirement*
+            result = max(candidates)
 
-        # --- 2. Parse each line ---
-        for line in lines:
-            if any(k in line for k in OPTIONAL_KEYWORDS):
-                continue
-            if any(k in line for k in BLACKLIST_KEYWORDS):
-                continue
-
-            clean_line = re.sub(r'[^a-z0-9\s.\-]', ' ', line)
-            clean_line = re.sub(r'\s+', ' ', clean_line).strip()
-
-            # --- 2a. Ranges like "2-4 years" / "2 to 4 years" ---
-            range_pattern = r'(\d+(?:\.\d+)?)\s*(?:-|to)\s*(\d+(?:\.\d+)?)\s*(?:years?|yrs?|y|exp)'
-            for match in re.findall(range_pattern, clean_line):
-                low, high = match
-                try:
-                    low, high = float(low), float(high)
-                    candidates.append(low)  # take minimum
-                except ValueError:
-                    continue
-
-            # --- 2b. Word ranges: "between three and five years" ---
-            word_range_pattern = (
-                r'between\s+(' + '|'.join(NUMBER_WORDS.keys()) + r')\s+(?:and|to)\s+('
-                + '|'.join(NUMBER_WORDS.keys()) + r')\s+years?'
-            )
-            for match in re.findall(word_range_pattern, clean_line):
-                low, high = match
-                if low in NUMBER_WORDS:
-                    candidates.append(float(NUMBER_WORDS[low]))
-
-            # --- 2c. Numeric years: "5+ years", "3 years exp" ---
-            numeric_year_pattern = r'(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?|y|exp)'
-            for match in re.findall(numeric_year_pattern, clean_line):
-                try:
-                    candidates.append(float(match))
-                except ValueError:
-                    continue
-
-            # --- 2d. Word-based years: "five years", "dozen years" ---
-            word_year_pattern = r'\b(' + '|'.join(NUMBER_WORDS.keys()) + r')\b\s+(?:years?|yrs?|exp)'
-            for match in re.findall(word_year_pattern, clean_line):
-                if match in NUMBER_WORDS:
-                    candidates.append(float(NUMBER_WORDS[match]))
-
-            # --- 2e. Months: "18 months", "6+ months" ---
-            month_pattern = r'(\d+(?:\.\d+)?)\s*\+?\s*months?'
-            for match in re.findall(month_pattern, clean_line):
-                try:
-                    years = float(match) / 12
-                    candidates.append(round(years, 1))
-                except ValueError:
-                    continue
-
-        # --- 3. Post-processing ---
-        if not candidates:
-            return 0
-
-        if 0 in candidates:
-            return 0
-
-        # Special handling: "max X years" or "up to X years" → treat as fresher
-        if re.search(r'\b(up to|max)\s+\d+\s+years?', desc):
-            return 0
-
-        # Normally take the highest *minimum requirement*
-        result = max(candidates)
-
-        return int(result + 0.5)  # round to nearest int
-
-    except Exception:
-        return -1
+            return int(result + 0.5)  # round to nearest int
 
+        except Exception:
+            return -1
+
+
+_default_extractor = ExperienceExtractor()
+
+
+def extract_experience(description: str) -> int:
+    """
+    Extracts minimum years of experience required from job description.
+    Returns:
+        int: Minimum years (0 for fresher, -1 for error/uncertain).
+    """
+    return _default_extractor.extract(description)
 
 
 # -----------------------------
 # Example usage
 # -----------------------------
-if __name__ == "__main__":
-    jd = """
+SAMPLE_JOB_DESCRIPTION = """
 **DESCRIPTION**
 ---------------
 
@@ -219,6 +241,8 @@ Our inclusive culture empowers Amazonians to deliver the best results for our cu
   
 
 Our compensation reflects the cost of labor across several US geographic markets. The base pay for this position ranges from $138,200/year in our lowest geographic market up to $239,000/year in our highest geographic market. Pay is based on a number of factors including market location and may vary depending on job\-related knowledge, skills, and experience. Amazon is a total compensation company. Dependent on the position offered, equity, sign\-on payments, and other forms of compensation may be provided as part of a total compensation package, in addition to a full range of medical, financial, and/or other benefits. For more information, please visit https://www.aboutamazon.com/workplace/employee\-benefits. This position will remain posted until filled. Applicants should apply via our internal or external career site.
-    """
-    experience = extract_experience(jd)
+"""
+
+if __name__ == "__main__":
+    experience = extract_experience(SAMPLE_JOB_DESCRIPTION)
     print("Minimum experience required:", experience)  # Output: 5
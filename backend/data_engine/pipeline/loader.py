@@ -1,19 +1,28 @@
 # pipeline/loader.py
 import logging
-from typing import List, Set
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
 
 import pandas as pd
 from sqlalchemy.dialects.postgresql import insert
 
-from backend.data_engine.pipeline.experience_extractor import extract_experience
-from backend.data_engine.pipeline.filter import should_save_job
+from backend.data_engine import config
+from backend.data_engine.pipeline.compactor import CompactionReport, DescriptionCompactor
+from backend.data_engine.pipeline.deduplicator import NearDuplicateIndex
+from backend.data_engine.pipeline.enricher import enrich_jobs
+from backend.data_engine.pipeline.seen_index import SeenJobIndex
 from backend.database.models import Job, SeenJob
-from backend.database.setup_db import get_db
+from backend.matching_engine import config as matching_config
+from backend.matching_engine.embeddings import JobEmbeddingStore
 from backend.schemas.job import JobPosting
 
 
 def get_seen_job_ids(db) -> Set[str]:
-    """Fetches all existing job IDs from the seen_jobs table."""
+    """
+    Fetches all existing job IDs from the seen_jobs table.
+    Prefer `SeenJobIndex.open(db)`, which does not re-read the whole table on every run.
+    """
     logging.info("Fetching seen job IDs from the database...")
     seen_job_ids = db.query(SeenJob.job_id).all()
     ids = {id[0] for id in seen_job_ids}
@@ -21,8 +30,8 @@ def get_seen_job_ids(db) -> Set[str]:
     return ids
 
 
-def add_seen_jobs(db, new_jobs_df: pd.DataFrame):
-    """Adds new job IDs to the seen_jobs table."""
+def add_seen_jobs(db, new_jobs_df: pd.DataFrame, seen_index: Optional[SeenJobIndex] = None):
+    """Adds new job IDs to the seen_jobs table and, if given, to the seen-job index."""
     if new_jobs_df.empty:
         return
 
@@ -41,44 +50,144 @@ def add_seen_jobs(db, new_jobs_df: pd.DataFrame):
     stmt = stmt.on_conflict_do_nothing(index_elements=['job_id'])
     db.execute(stmt)
     db.commit()
+    if seen_index is not None:
+        seen_index.refresh()
+
+
+def _job_row(posting: JobPosting, created_at: datetime) -> Dict:
+    return {
+        "job_id": posting.id,
+        "site": posting.site,
+        "job_url": posting.job_url,
+        "job_url_direct": posting.job_url_direct,
+        "title": posting.title,
+        "company": posting.company,
+        "location": posting.location,
+        "date_posted": posting.date_posted,
+        "job_level": posting.job_level,
+        "description": posting.description,
+        "company_industry": posting.company_industry,
+        "company_url": posting.company_url,
+        "created_at": created_at,
+        "min_exp_required": posting.min_exp_required,
+        "canonical_job_id": None,
+        "compact_description": None,
+    }
+
+
+def _embed_new_jobs(store: JobEmbeddingStore, rows: List[Dict], inserted_ids: Set[str]) -> Optional[JobEmbeddingStore]:
+    """Embeds inserted canonical jobs; returns None, disabling ingest embedding, if encoding fails."""
+    jobs = [(row["job_id"], row["compact_description"] or row["description"]) for row in rows
+            if row["job_id"] in inserted_ids and not row["canonical_job_id"]]
+    try:
+        vectors = store.encode_jobs(jobs)
+    except Exception as e:
+        logging.error(f"Could not embed new jobs at ingest; they will be embedded at match time: {e}")
+        return None
+    store.put(vectors)
+    return store
+
+
+def load_jobs_to_db(job_postings: List[JobPosting], db, deduplicate: Optional[bool] = None) -> Dict[str, int]:
+    """
+    Bulk-loads job postings into the database. Postings are expected to come from
+    `enrich_jobs`; any that have not been enriched yet are enriched and filtered here.
 
+    Existing jobs are detected set-wise: one job_url lookup per batch and a multi-row
+    INSERT ... ON CONFLICT DO NOTHING on job_id, so a batch costs two round trips
+    regardless of how many postings it holds.
 
-def load_jobs_to_db(job_postings: List[JobPosting], db):
-    """
-    Processes a list of job postings, filters them based on experience,
-    and loads them into the database.
+    With `deduplicate` (default: config.DEDUP_ENABLED), new postings that are near-duplicates
+    of a stored or earlier posting are still stored, but with canonical_job_id pointing at
+    the first copy seen; see NearDuplicateIndex.
+
+    With COMPACT_DESCRIPTIONS, new canonical jobs also get a compact_description with
+    company boilerplate stripped (see DescriptionCompactor); that is the text that gets embedded.
+
+    With EMBED_JOBS_AT_INGEST, new canonical jobs are also embedded and stored in the same
+    transaction. If the model cannot be loaded the jobs are still saved and get embedded at
+    match time or by the backfill script instead.
+
+    Returns:
+        Counts of "inserted", "skipped" (already stored or repeated in the input),
+        "filtered" (rejected on experience) and "duplicates" (inserted, but linked to a
+        canonical job) postings.
     """
+    stats = {"inserted": 0, "skipped": 0, "filtered": 0, "duplicates": 0}
     if not job_postings:
         logging.info("No job postings to load.")
-        return
-
-    db = next(get_db())
-    saved_count = 0
-    for posting in job_postings:
-        experience = extract_experience(posting.description)
-
-        if should_save_job(experience):
-            existing_job = db.query(Job).filter(Job.job_url == posting.job_url).first()
-            if existing_job:
+        return stats
+
+    # Postings that did not go through the enrichment stage are enriched here.
+    if any(posting.min_exp_required is None for posting in job_postings):
+        enriched = enrich_jobs(job_postings)
+        stats["filtered"] = len(job_postings) - len(enriched)
+        job_postings = enriched
+
+    # One timestamp for the whole load, so matching watermarks see the load as a unit.
+    created_at = datetime.utcnow()
+    rows = [_job_row(posting, created_at) for posting in job_postings]
+
+    deduplicate = config.DEDUP_ENABLED if deduplicate is None else deduplicate
+    dedup_index = NearDuplicateIndex(db) if deduplicate else None
+    compactor = DescriptionCompactor(db) if config.COMPACT_DESCRIPTIONS else None
+    compaction = CompactionReport()
+    embedding_store = JobEmbeddingStore(db) if matching_config.EMBED_JOBS_AT_INGEST else None
+    encode_seconds = 0.0
+
+    batch_size = config.LOAD_BATCH_SIZE
+    loaded_urls: Set[str] = set()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        urls = {row["job_url"] for row in batch}
+        loaded_urls.update(url for (url,) in db.query(Job.job_url).filter(Job.job_url.in_(urls)))
+
+        new_rows = []
+        for row in batch:
+            if row["job_url"] in loaded_urls:
                 continue
-
-            job = Job(
-                job_id=posting.id,
-                site=posting.site,
-                job_url=posting.job_url,
-                job_url_direct=posting.job_url_direct,
-                title=posting.title,
-                company=posting.company,
-                location=posting.location,
-                date_posted=posting.date_posted,
-                job_level=posting.job_level,
-                description=posting.description,
-                company_industry=posting.company_industry,
-                company_url=posting.company_url,
-                min_exp_required=experience
+            loaded_urls.add(row["job_url"])
+            new_rows.append(row)
+
+        if new_rows:
+            if dedup_index is not None:
+                dedup_index.link(new_rows)
+            if compactor is not None:
+                canonical_rows = [row for row in new_rows if not row["canonical_job_id"]]
+                # Compacted as if the whole batch were stored; only rows actually inserted are learned from below.
+                counts = compactor.counts_with([row["description"] for row in canonical_rows])
+                for row in canonical_rows:
+                    row["compact_description"] = compactor.compact(row["description"], counts, compaction)
+            stmt = (
+                insert(Job)
+                .values(new_rows)
+                .on_conflict_do_nothing(index_elements=["job_id"])
+                .returning(Job.job_id)
             )
-            db.add(job)
-            saved_count += 1
-
+            inserted_ids = {job_id for (job_id,) in db.execute(stmt)}
+            stats["inserted"] += len(inserted_ids)
+            stats["duplicates"] += sum(1 for row in new_rows
+                                       if row["canonical_job_id"] and row["job_id"] in inserted_ids)
+            if dedup_index is not None:
+                dedup_index.save(inserted_ids)
+            if compactor is not None:
+                compactor.learn(row["description"] for row in canonical_rows if row["job_id"] in inserted_ids)
+            if embedding_store is not None:
+                started = time.perf_counter()
+                embedding_store = _embed_new_jobs(embedding_store, new_rows, inserted_ids)
+                encode_seconds += time.perf_counter() - started
+        stats["skipped"] += len(batch)
+
+    stats["skipped"] -= stats["inserted"]
     db.commit()
-    logging.info(f"Successfully saved {saved_count} job postings to the database.")
+    logging.info(
+        f"Successfully saved {stats['inserted']} job postings to the database "
+        f"({stats['duplicates']} linked as near-duplicates, {stats['skipped']} already present, "
+        f"{stats['filtered']} filtered on experience)."
+    )
+    if compaction.documents:
+        logging.info(
+            f"Description compaction: {compaction.summary()}; ingest encoding took {encode_seconds:.1f}s, "
+            f"an estimated {compaction.estimated_seconds_saved(encode_seconds):.1f}s less than full descriptions."
+        )
+    return stats
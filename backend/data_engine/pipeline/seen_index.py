@@ -0,0 +1,153 @@
+# pipeline/seen_index.py
+import hashlib
+import logging
+import math
+import os
+import struct
+from typing import Iterable, Optional, Set
+
+from backend.data_engine import config
+from backend.database.models import SeenJob
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing on one blake2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float, num_bits: Optional[int] = None,
+                 num_hashes: Optional[int] = None, bits: Optional[bytearray] = None, count: int = 0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = num_bits or max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = num_hashes or max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class SeenJobIndex:
+    """
+    Membership service for the seen_jobs table.
+
+    Keeps a Bloom filter of every seen external job id on disk, together with the highest
+    seen_jobs.id it covers. Opening the index only reads rows added since that watermark,
+    and a Bloom hit is confirmed with a single IN query, so false positives never drop a
+    new job. The filter is rebuilt from the table, at double the capacity, once it fills up.
+    """
+
+    _MAGIC = b"SJBF"
+    _HEADER = struct.Struct("<4sIQQQdQ")  # magic, hashes, bits, count, capacity, error rate, watermark
+
+    def __init__(self, db, path: Optional[str] = None, capacity: Optional[int] = None,
+                 error_rate: Optional[float] = None):
+        self.db = db
+        self.path = path or config.SEEN_INDEX_PATH
+        self.bloom = BloomFilter(capacity or config.SEEN_INDEX_CAPACITY, error_rate or config.SEEN_INDEX_ERROR_RATE)
+        self.watermark = 0  # highest seen_jobs.id already in the filter
+
+    @classmethod
+    def open(cls, db, path: Optional[str] = None) -> "SeenJobIndex":
+        """Loads the persisted filter (or builds it) and catches up with rows added since."""
+        index = cls(db, path)
+        if not index._load():
+            logger.info("No usable seen-job index on disk; building it from the database.")
+        index.refresh()
+        return index
+
+    def __len__(self) -> int:
+        return self.bloom.count
+
+    def _load(self) -> bool:
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(self._HEADER.size)
+                magic, hashes, num_bits, count, capacity, error_rate, watermark = self._HEADER.unpack(header)
+                if magic != self._MAGIC:
+                    return False
+                bits = bytearray(f.read())
+        except (FileNotFoundError, struct.error):
+            return False
+        if len(bits) != (num_bits + 7) // 8:
+            logger.warning(f"Seen-job index at {self.path} is truncated; rebuilding.")
+            return False
+        self.bloom = BloomFilter(capacity, error_rate, num_bits, hashes, bits, count)
+        self.watermark = watermark
+        logger.info(f"Loaded seen-job index with {count} ids (watermark {watermark}).")
+        return True
+
+    def save(self):
+        """Writes the filter atomically so a crashed run never leaves a torn file behind."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._HEADER.pack(self._MAGIC, self.bloom.num_hashes, self.bloom.num_bits, self.bloom.count,
+                                      self.bloom.capacity, self.bloom.error_rate, self.watermark))
+            f.write(self.bloom.bits)
+        os.replace(tmp_path, self.path)
+
+    def _stream_new_rows(self, after_id: int):
+        batch_size = config.SEEN_INDEX_BATCH_SIZE
+        while True:
+            rows = (
+                self.db.query(SeenJob.id, SeenJob.job_id)
+                .filter(SeenJob.id > after_id)
+                .order_by(SeenJob.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return
+            yield from rows
+            after_id = rows[-1][0]
+
+    def refresh(self) -> int:
+        """Adds seen_jobs rows inserted since the watermark. Returns how many were added."""
+        # A row whose id is below the watermark but commits later is missed; the loader's
+        # job_url dedupe still catches the job, it is only re-downloaded once.
+        added = 0
+        for row_id, job_id in self._stream_new_rows(self.watermark):
+            if self.bloom.count >= self.bloom.capacity:
+                self._rebuild(self.bloom.capacity * 2)
+                return added
+            self.bloom.add(job_id)
+            self.watermark = row_id
+            added += 1
+        if added:
+            logger.info(f"Added {added} new ids to the seen-job index ({self.bloom.count} total).")
+            self.save()
+        return added
+
+    def _rebuild(self, capacity: int):
+        logger.info(f"Rebuilding seen-job index with capacity {capacity}.")
+        self.bloom = BloomFilter(capacity, self.bloom.error_rate)
+        self.watermark = 0
+        self.refresh()
+
+    def seen_among(self, job_ids: Iterable[str]) -> Set[str]:
+        """Returns the subset of `job_ids` that are in seen_jobs."""
+        candidates = [job_id for job_id in set(job_ids) if job_id in self.bloom]
+        seen: Set[str] = set()
+        batch_size = config.SEEN_INDEX_BATCH_SIZE
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            seen.update(job_id for (job_id,) in self.db.query(SeenJob.job_id).filter(SeenJob.job_id.in_(batch)))
+        if len(candidates) > len(seen):
+            logger.debug(f"Seen-job index: {len(candidates) - len(seen)} false positives confirmed unseen.")
+        return seen
+
+    def __contains__(self, job_id: str) -> bool:
+        return bool(self.seen_among([job_id]))
@@ -0,0 +1,181 @@
+# pipeline/streaming.py
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from backend.data_engine import config
+from backend.data_engine.pipeline.enricher import enrich_jobs
+from backend.data_engine.pipeline.executor import ScrapeTask, iter_scrape_results, merge_scraped_jobs
+from backend.data_engine.pipeline.loader import add_seen_jobs, load_jobs_to_db
+from backend.data_engine.pipeline.seen_index import SeenJobIndex
+from backend.data_engine.pipeline.transformer import transform_jobs
+from backend.data_engine.pipeline.watermarks import ScrapeWatermarks
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream; every stage forwards it downstream and stops.
+_DONE = object()
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.batches = 0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0  # time spent working, excluding waits on the queues
+
+    def record(self, rows_in: int, rows_out: int, seconds: float):
+        self.batches += 1
+        self.rows_in += rows_in
+        self.rows_out += rows_out
+        self.busy_seconds += seconds
+
+    def summary(self, wall_seconds: float) -> str:
+        rate = self.rows_in / self.busy_seconds if self.busy_seconds else 0.0
+        utilisation = self.busy_seconds / wall_seconds * 100 if wall_seconds else 0.0
+        return (f"{self.name:>9}: {self.batches} batches, {self.rows_in} rows in, {self.rows_out} rows out, "
+                f"{rate:,.0f} rows/s while busy, {utilisation:.0f}% busy, {self.errors} errors")
+
+
+def _run_stage(stats: StageStats, work: Callable, inbox: queue.Queue, outbox: Optional[queue.Queue]):
+    """Pulls batches from `inbox`, applies `work` and pushes its results (None: nothing) to `outbox`."""
+    while True:
+        item = inbox.get()
+        if item is _DONE:
+            break
+        started = time.perf_counter()
+        try:
+            rows_in, result, rows_out = work(item)
+        except Exception as e:
+            stats.errors += 1
+            logger.error(f"Streaming stage '{stats.name}' failed on a batch: {e}", exc_info=True)
+            continue
+        stats.record(rows_in, rows_out, time.perf_counter() - started)
+        if outbox is not None and result is not None:
+            outbox.put(result)  # blocks while the next stage is behind: backpressure
+    if outbox is not None:
+        outbox.put(_DONE)
+
+
+def run_streaming_pipeline(
+    db: Session,
+    tasks: List[ScrapeTask],
+    seen_index: SeenJobIndex,
+    session_factory: Callable[[], Session],
+    queue_size: Optional[int] = None,
+    watermarks: Optional[ScrapeWatermarks] = None,
+) -> Dict[str, StageStats]:
+    """
+    Runs fetch -> transform -> enrich -> load as concurrent stages joined by bounded queues.
+
+    Each scrape result flows through the stages as soon as it arrives, so the loader works
+    while scrapers wait on the network. A full queue blocks its producer, and the fetch
+    stage only issues new scrapes as fast as it is drained, so memory stays bounded by
+    roughly `queue_size` batches per stage however many jobs the run scrapes.
+
+    The fetch stage runs in the calling thread and owns `db` (seen-job filtering). The load
+    stage runs in its own thread and therefore opens its own session from `session_factory`;
+    SQLAlchemy sessions must not be shared across threads. A batch's job ids are added to
+    seen_jobs by the load stage once the batch is stored, so jobs of a batch that failed
+    anywhere downstream of the fetch are not marked seen. A failed load is rolled back so
+    later batches still load.
+
+    Scrape `watermarks`, if given, are recorded as results arrive and saved once every
+    stage has drained, unless a transform, enrich or load batch failed: those jobs were
+    fetched but never stored, so the marks stay put and the next run fetches them again.
+
+    Returns:
+        Per-stage StageStats, keyed by stage name.
+    """
+    queue_size = queue_size or config.STREAM_QUEUE_SIZE
+    to_transform: queue.Queue = queue.Queue(maxsize=queue_size)
+    to_enrich: queue.Queue = queue.Queue(maxsize=queue_size)
+    to_load: queue.Queue = queue.Queue(maxsize=queue_size)
+    stats = {name: StageStats(name) for name in ("fetch", "transform", "enrich", "load")}
+    totals = {"inserted": 0, "skipped": 0, "filtered": 0, "duplicates": 0}
+
+    load_db = session_factory()
+    enrich_pool = ProcessPoolExecutor(max_workers=1) if config.STREAM_ENRICH_IN_PROCESS_POOL else None
+
+    # Batches carry their scraped ids and sites to the load stage, which marks them seen,
+    # even when transformation or enrichment leaves no posting to store.
+    def transform(batch):
+        common_location, raw_jobs_df = batch
+        postings = transform_jobs(raw_jobs_df, common_location)
+        return len(raw_jobs_df), (raw_jobs_df[['id', 'site']], postings), len(postings)
+
+    def enrich(batch):
+        seen_df, postings = batch
+        enriched = enrich_jobs(postings, pool=enrich_pool) if postings else []
+        return len(postings), (seen_df, enriched), len(enriched)
+
+    def load(batch):
+        seen_df, postings = batch
+        result = {}
+        try:
+            if postings:
+                result = load_jobs_to_db(postings, load_db)
+            add_seen_jobs(load_db, seen_df)
+        except Exception:
+            # Leave the session usable for the next batches; the stage still counts the error.
+            load_db.rollback()
+            raise
+        for key, value in result.items():
+            totals[key] += value
+        return len(postings), None, result.get("inserted", 0)
+
+    workers = [
+        threading.Thread(target=_run_stage, args=(stats["transform"], transform, to_transform, to_enrich),
+                         name="stream-transform", daemon=True),
+        threading.Thread(target=_run_stage, args=(stats["enrich"], enrich, to_enrich, to_load),
+                         name="stream-enrich", daemon=True),
+        threading.Thread(target=_run_stage, args=(stats["load"], load, to_load, None),
+                         name="stream-load", daemon=True),
+    ]
+
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    claimed_ids: Set[str] = set()
+    try:
+        for result in iter_scrape_results(tasks):
+            stage_started = time.perf_counter()
+            if not result.ok:
+                stats["fetch"].errors += 1
+            if watermarks is not None:
+                watermarks.record(result)
+            raw_jobs_df = merge_scraped_jobs([result.jobs_df], seen_index, claimed_ids)
+            stats["fetch"].record(len(result.jobs_df), len(raw_jobs_df), time.perf_counter() - stage_started)
+            if not raw_jobs_df.empty:
+                to_transform.put((result.task.common_location, raw_jobs_df))
+    finally:
+        to_transform.put(_DONE)
+        for worker in workers:
+            worker.join()
+        load_db.close()
+        # Ids claimed in this run kept repeats out; the index picks up the stored ones now.
+        seen_index.refresh()
+        if enrich_pool is not None:
+            enrich_pool.shutdown()
+
+    failed_batches = sum(stats[name].errors for name in ("transform", "enrich", "load"))
+    if watermarks is not None and failed_batches:
+        logger.warning(f"{failed_batches} batches failed after fetching; not advancing the scrape watermarks.")
+    elif watermarks is not None:
+        watermarks.save()
+    wall = time.perf_counter() - started
+    logger.info(f"Streaming pipeline finished in {wall:.1f}s: {totals['inserted']} jobs saved "
+                f"({totals['duplicates']} near-duplicates), {totals['skipped']} already present, "
+                f"{totals['filtered']} filtered on experience.")
+    for stage in stats.values():
+        logger.info(stage.summary(wall))
+    return stats
@@ -1,40 +1,84 @@
 # pipeline/transformer.py
 import logging
+import numpy as np
 import pandas as pd
+from pandas.api.types import infer_dtype
 from typing import List
 
 from backend.data_engine.helper.constants import JobFields
-from backend.data_engine.helper.util import generate_id, safe_str
+from backend.data_engine.helper.util import safe_str
 from backend.schemas.job import JobPosting
 
 logger = logging.getLogger(__name__)
 
+UNAVAILABLE = "Unavailable"
+
+# JobPosting field -> source column in the scraped DataFrame.
+POSTING_COLUMNS = {
+    "id": JobFields.ID,
+    "site": JobFields.SITE,
+    "job_url": JobFields.JOB_URL,
+    "job_url_direct": JobFields.JOB_URL_DIRECT,
+    "title": JobFields.TITLE,
+    "company": JobFields.COMPANY,
+    "date_posted": JobFields.DATE_POSTED,
+    "job_level": JobFields.JOB_LEVEL,
+    "description": JobFields.DESCRIPTION,
+    "company_industry": JobFields.COMPANY_INDUSTRY,
+    "company_url": JobFields.COMPANY_URL,
+}
+
+
+def coerce_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """
+    Column-wise equivalent of applying `safe_str` to every cell of `df[column]`.
+
+    Nulls are located with one vectorized isna pass, string columns are copied as-is and
+    date columns are ISO-formatted in a single pass; only null and mixed-type cells fall back to
+    `safe_str`, so the output matches the per-cell conversion exactly.
+    """
+    if column not in df:
+        return np.full(len(df), UNAVAILABLE, dtype=object)
+
+    series = df[column]
+    out = series.to_numpy(dtype=object, copy=True)
+    null = series.isna().to_numpy()
+    present = ~null
+    kind = infer_dtype(series, skipna=True)
+
+    if kind == "date":
+        # Dates (and datetimes, which infer_dtype also reports as "date") in one pass.
+        out[present] = [value.isoformat() for value in out[present]]
+    elif kind != "string":
+        out[present] = [safe_str(value) for value in out[present]]
+    if null.any():
+        # None/NaN become "Unavailable"; safe_str keeps its own rendering of NaT and pd.NA.
+        out[null] = [safe_str(value) for value in out[null]]
+    return out
+
+
 def transform_jobs(df: pd.DataFrame, common_location: str) -> List[JobPosting]:
     """Transforms a DataFrame of raw job data into a list of JobPosting objects."""
     logger.info(f"Transforming {len(df)} raw job listings for location: {common_location}.")
-    job_postings = []
-    for _, row in df.iterrows():
-        try:
-            job_id = generate_id(safe_str(row.get(JobFields.JOB_URL)) + safe_str(row.get(JobFields.TITLE)))
-            
-            job_posting = JobPosting(
-                id=safe_str(row.get(JobFields.ID)),
-                site=safe_str(row.get(JobFields.SITE)),
-                job_url=safe_str(row.get(JobFields.JOB_URL)),
-                job_url_direct=safe_str(row.get(JobFields.JOB_URL_DIRECT)),
-                title=safe_str(row.get(JobFields.TITLE)),
-                company=safe_str(row.get(JobFields.COMPANY)),
-                location=common_location,  # Overwrite with common location
-                date_posted=safe_str(row.get(JobFields.DATE_POSTED)),
-                job_level=safe_str(row.get("job_level")),
-                description=safe_str(row.get(JobFields.DESCRIPTION)),
-                company_industry=safe_str(row.get(JobFields.COMPANY_INDUSTRY)),
-                company_url=safe_str(row.get(JobFields.COMPANY_URL)),
-                min_exp_required=None # To be filled later
-            )
-            job_postings.append(job_posting)
-        except Exception as e:
-            logger.error(f"Error transforming a job listing: {e}", exc_info=True)
-    
+    if df.empty:
+        return []
+
+    try:
+        columns = {field: coerce_column(df, column) for field, column in POSTING_COLUMNS.items()}
+    except Exception as e:
+        logger.error(f"Error transforming job listings: {e}", exc_info=True)
+        return []
+
+    # Every field is already a str, which is all JobPosting validation would check, so the
+    # postings are constructed without re-validating each row.
+    job_postings = [
+        JobPosting.model_construct(
+            location=common_location,  # Overwrite with common location
+            min_exp_required=None,  # To be filled later
+            **dict(zip(POSTING_COLUMNS, values)),
+        )
+        for values in zip(*columns.values())
+    ]
+
     logger.info(f"Successfully transformed {len(job_postings)} job listings.")
-    return job_postings
\ No newline at end of file
+    return job_postings
@@ -0,0 +1,151 @@
+# pipeline/watermarks.py
+import logging
+import math
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.data_engine import config
+from backend.data_engine.pipeline.executor import ScrapeResult, ScrapeTask
+from backend.data_engine.scrapers.scrape_cache import MODE_REPLAY, get_scrape_cache
+from backend.database.models import ScrapeWatermark
+
+logger = logging.getLogger(__name__)
+
+WatermarkKey = Tuple[str, str, str]
+
+
+def watermark_key(task: ScrapeTask) -> WatermarkKey:
+    """(site, search term, site location), compared case- and whitespace-insensitively."""
+    return task.site, " ".join(task.search_term.lower().split()), " ".join(task.site_location.lower().split())
+
+
+def watermarks_enabled() -> bool:
+    """
+    Whether this run plans and records scrape watermarks: INCREMENTAL_SCRAPING, outside the
+    scrape cache's replay mode. Replayed results say nothing about what the job boards hold
+    now (a cache miss is an empty frame), and shrunk queries would miss the recorded entries.
+    """
+    return config.INCREMENTAL_SCRAPING and get_scrape_cache().mode != MODE_REPLAY
+
+
+class ScrapeWatermarks:
+    """
+    Per-query high-water marks for incremental scraping.
+
+    For every (site, search term, location) the last successful fetch time is kept, together
+    with the newest date_posted seen, the external ids posted on that date and the observed
+    rate of postings per hour. `plan` shrinks a task's hours_old to the gap since the last
+    successful fetch (plus an overlap) and its results_wanted to what that gap is expected to
+    hold, so scheduled runs only download what is new.
+
+    A mark is only advanced when the fetch provably reached it: the result was not cut off at
+    results_wanted, or it overlaps the previous edge (a known id or an older posting). A
+    truncated result leaves the mark in place, so the next run covers the gap again with a
+    larger, re-estimated budget. Neither does an empty result: it cannot be told apart from
+    a fetch that silently returned nothing, so the gap is simply asked for again next run.
+    Marks are read once per run and written back by `save`.
+    """
+
+    def __init__(self, db, marks: Dict[WatermarkKey, ScrapeWatermark]):
+        self.db = db
+        self.marks = marks
+        self.updates: Dict[WatermarkKey, Dict] = {}
+
+    @classmethod
+    def load(cls, db, tasks: List[ScrapeTask]) -> "ScrapeWatermarks":
+        keys = list({watermark_key(task) for task in tasks})
+        marks = {}
+        if keys:
+            rows = db.query(ScrapeWatermark).filter(
+                tuple_(ScrapeWatermark.site, ScrapeWatermark.search_term, ScrapeWatermark.location).in_(keys)
+            )
+            marks = {(mark.site, mark.search_term, mark.location): mark for mark in rows}
+        return cls(db, marks)
+
+    def plan(self, tasks: List[ScrapeTask], now: Optional[datetime] = None) -> List[ScrapeTask]:
+        """Returns the tasks with hours_old and jobs shrunk to the gap since each query's mark."""
+        now = now or datetime.utcnow()
+        planned = []
+        for task in tasks:
+            mark = self.marks.get(watermark_key(task))
+            if mark is None or mark.last_success_at is None:
+                planned.append(task)
+                continue
+
+            gap_hours = (now - mark.last_success_at).total_seconds() / 3600 + config.INCREMENTAL_OVERLAP_HOURS
+            hours_old = max(1, min(task.hours_old, math.ceil(gap_hours)))
+            expected = (mark.jobs_per_hour or 0.0) * hours_old * config.INCREMENTAL_HEADROOM
+            jobs = min(task.jobs, max(config.INCREMENTAL_MIN_RESULTS, math.ceil(expected)))
+            if (hours_old, jobs) != (task.hours_old, task.jobs):
+                logger.info(f"Incremental scrape for {task.scraper.site_name} '{task.search_term}' in "
+                            f"'{task.site_location}': {hours_old}h/{jobs} jobs instead of "
+                            f"{task.hours_old}h/{task.jobs}.")
+            planned.append(task._replace(hours_old=hours_old, jobs=jobs))
+        return planned
+
+    def record(self, result: ScrapeResult, fetched_at: Optional[datetime] = None):
+        """Advances the query's mark from a scrape result (before any seen-job filtering)."""
+        if not result.ok:
+            return
+        task, df = result.task, result.jobs_df
+        if df is None or df.empty:
+            logger.info(f"No jobs from {task.scraper.site_name} for '{task.search_term}' in "
+                        f"'{task.site_location}'; keeping its mark.")
+            return
+        key = watermark_key(task)
+        mark = self.marks.get(key)
+        previous_newest = mark.newest_date_posted if mark else None
+        previous_ids = set(mark.edge_ids or ()) if mark else set()
+
+        ids = df["id"].astype(str) if "id" in df else pd.Series(dtype=str)
+        posted = pd.to_datetime(df["date_posted"], errors="coerce").dt.date if "date_posted" in df \
+            else pd.Series(dtype=object)
+
+        truncated = len(df) >= task.jobs
+        overlaps = bool(previous_ids.intersection(ids)) or (
+            previous_newest is not None and bool((posted.dropna() < previous_newest).any())
+        )
+        if truncated and mark is not None and not overlaps:
+            logger.warning(f"Scrape for {task.scraper.site_name} '{task.search_term}' in '{task.site_location}' "
+                           f"hit its {task.jobs} job limit without reaching the previous mark; keeping the mark.")
+            self._stage(key, mark.last_success_at, previous_newest, previous_ids, len(df) / task.hours_old)
+            return
+
+        newest: Optional[date] = posted.max() if posted.notna().any() else None
+        if previous_newest is not None and (newest is None or previous_newest > newest):
+            newest = previous_newest
+        edge_ids = set(ids[(posted == newest).to_numpy()]) if newest is not None else set()
+        if newest == previous_newest:
+            edge_ids |= previous_ids
+        self._stage(key, fetched_at or datetime.utcnow(), newest, edge_ids, len(df) / task.hours_old)
+
+    def _stage(self, key: WatermarkKey, last_success_at, newest, edge_ids, jobs_per_hour: float):
+        site, search_term, location = key
+        self.updates[key] = {
+            "site": site,
+            "search_term": search_term,
+            "location": location,
+            "last_success_at": last_success_at,
+            "newest_date_posted": newest,
+            "edge_ids": sorted(edge_ids)[:config.INCREMENTAL_EDGE_IDS],
+            "jobs_per_hour": jobs_per_hour,
+        }
+
+    def save(self):
+        """Upserts every mark recorded in this run in one statement."""
+        if not self.updates:
+            return
+        stmt = insert(ScrapeWatermark).values(list(self.updates.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["site", "search_term", "location"],
+            set_={column: stmt.excluded[column]
+                  for column in ("last_success_at", "newest_date_posted", "edge_ids", "jobs_per_hour")},
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+        logger.info(f"Saved {len(self.updates)} scrape watermarks.")
+        self.updates.clear()
@@ -1,6 +1,7 @@
 # scrapers/indeed_scraper.py
 import logging
 from .base_scraper import BaseScraper
+from .scrape_cache import get_scrape_cache
 from jobspy import scrape_jobs
 import pandas as pd
 
@@ -13,7 +14,7 @@ class IndeedScraper(BaseScraper):
     def scrape(self, search_term: str, location: str, jobs: int = 1,hours_old:int=6) -> pd.DataFrame:
         logger.info(f"Scraping Indeed for '{search_term}' in '{location}'.")
         try:
-            df = scrape_jobs(
+            params = dict(
                 site_name=["indeed"],
                 search_term=search_term,
                 location=location,
@@ -21,11 +22,14 @@ class IndeedScraper(BaseScraper):
                 hours_old = hours_old,
                 #country_indeed="india"
             )
+            df = get_scrape_cache().fetch(params, scrape_jobs)
             if df is not None and not df.empty:
                 logger.info(f"Successfully scraped {len(df)} jobs from Indeed.")
             else:
                 logger.info("No jobs found from Indeed.")
             return df if df is not None else pd.DataFrame()
         except Exception as e:
-            logger.error(f"Error scraping Indeed: {e}", exc_info=True)
-            return pd.DataFrame()
\ No newline at end of file
+            # Raised, not swallowed into an empty frame: the executor reports the task as failed,
+            # so an error is never mistaken for a query with no new postings.
+            logger.error(f"Error scraping Indeed: {e}")
+            raise
\ No newline at end of file
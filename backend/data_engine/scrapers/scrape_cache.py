@@ -0,0 +1,157 @@
+# scrapers/scrape_cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from backend.data_engine import config
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"        # always go to the network, never read or write the cache
+MODE_ON = "on"          # serve fresh entries from disk, scrape and store on a miss
+MODE_REPLAY = "replay"  # never touch the network: serve any cached entry, ignore the TTL, misses are empty
+MODES = (MODE_OFF, MODE_ON, MODE_REPLAY)
+
+# Query parameters compared case- and whitespace-insensitively when building the key.
+_TEXT_PARAMS = ("search_term", "location", "google_search_term")
+
+
+class ScrapeCache:
+    """
+    Content-addressed on-disk cache of scrape results.
+
+    Entries are keyed by a hash of the normalized scrape_jobs parameters, so the same
+    (site, search term, location, hours_old, ...) query asked for by several users within
+    the TTL is only sent to the job board once. Each entry is one pickled DataFrame;
+    its modification time is the last time it was written or served, and once the
+    directory grows past `max_bytes` the least recently used entries are removed.
+    """
+
+    def __init__(self, directory: Optional[str] = None, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None, mode: Optional[str] = None):
+        self.directory = directory or config.SCRAPE_CACHE_DIR
+        self.ttl_seconds = config.SCRAPE_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self.max_bytes = config.SCRAPE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.mode = (mode or config.SCRAPE_CACHE_MODE).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown scrape cache mode '{self.mode}'; expected one of {MODES}.")
+        self.hits = 0
+        self.misses = 0
+        self._evict_lock = threading.Lock()
+
+    @staticmethod
+    def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+        normalized = {}
+        for name, value in params.items():
+            if value is None:
+                continue
+            if name in _TEXT_PARAMS and isinstance(value, str):
+                value = " ".join(value.lower().split())
+            elif name == "site_name":
+                value = sorted(site.lower() for site in ([value] if isinstance(value, str) else value))
+            normalized[name] = value
+        return normalized
+
+    def make_key(self, params: Dict[str, Any]) -> str:
+        canonical = json.dumps(self.normalize_params(params), sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, params: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """Returns the cached result for `params`, or None when missing or (outside replay) expired."""
+        path = self._path(self.make_key(params))
+        try:
+            age = time.time() - os.path.getmtime(path)
+            if self.mode != MODE_REPLAY and age > self.ttl_seconds:
+                return None
+            df = pd.read_pickle(path)
+            os.utime(path)  # mark as recently used for eviction
+            return df
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable scrape cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+    def put(self, params: Dict[str, Any], df: pd.DataFrame):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(self.make_key(params))
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def fetch(self, params: Dict[str, Any], scrape: Callable[..., pd.DataFrame]) -> pd.DataFrame:
+        """Serves `scrape(**params)` through the cache according to the cache mode."""
+        if self.mode == MODE_OFF:
+            return scrape(**params)
+
+        cached = self.get(params)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"Scrape cache hit for {self.normalize_params(params)} ({len(cached)} jobs).")
+            return cached
+
+        self.misses += 1
+        if self.mode == MODE_REPLAY:
+            logger.warning(f"Scrape cache miss in replay mode for {self.normalize_params(params)}; "
+                           f"returning no jobs.")
+            return pd.DataFrame()
+
+        df = scrape(**params)
+        if df is not None:
+            self.put(params, df)
+        return df
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in `max_bytes`."""
+        if not self.max_bytes:
+            return
+        with self._evict_lock:
+            entries = []
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".pkl"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+                removed += 1
+            logger.info(f"Evicted {removed} scrape cache entries; {total / 2**20:.1f} MiB left.")
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+_default_cache: Optional[ScrapeCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_scrape_cache() -> ScrapeCache:
+    """Process-wide cache built from the data engine config, shared by every scraper."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ScrapeCache()
+        return _default_cache
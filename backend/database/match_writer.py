@@ -0,0 +1,56 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.database.models import UserJobMatch
+
+logger = logging.getLogger(__name__)
+
+READY_FOR_EMAIL = "READY_FOR_EMAIL"
+
+# Pairs per INSERT ... ON CONFLICT statement.
+_WRITE_CHUNK = 2000
+
+
+def match_row(user_id: str, job_id: str, match_result: Dict) -> Dict:
+    """A user_job_matches row for a matcher result ({"fit", "reasons", "score"})."""
+    return {
+        "user_id": user_id,
+        "job_id": job_id,
+        "fit": match_result["fit"],
+        "reasons": " ".join(match_result["reasons"]),
+        "score": match_result["score"],
+    }
+
+
+def write_matches(db, rows: Iterable[Dict], chunk_size: int = _WRITE_CHUNK) -> int:
+    """
+    Upserts match rows in the caller's transaction, `chunk_size` pairs per statement.
+
+    New pairs are inserted as READY_FOR_EMAIL. For pairs that already have a row (the
+    (user_id, job_id) unique constraint), fit, reasons and score are updated while status and
+    created_at are left alone, so a job already emailed is not emailed again. When a pair
+    occurs more than once in `rows`, the last occurrence wins. Returns the number of pairs written.
+    """
+    # ON CONFLICT cannot touch the same row twice in one statement.
+    unique: Dict = {}
+    for row in rows:
+        unique[(row["user_id"], row["job_id"])] = row
+    pairs: List[Dict] = list(unique.values())
+    if not pairs:
+        return 0
+
+    now = datetime.utcnow()
+    for start in range(0, len(pairs), chunk_size):
+        stmt = insert(UserJobMatch).values([
+            dict(row, status=READY_FOR_EMAIL, created_at=now) for row in pairs[start:start + chunk_size]
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_user_job_matches_user_job",
+            set_={"fit": stmt.excluded.fit, "reasons": stmt.excluded.reasons, "score": stmt.excluded.score},
+        )
+        db.execute(stmt)
+    logger.debug(f"Upserted {len(pairs)} user-job matches.")
+    return len(pairs)
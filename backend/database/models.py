@@ -1,6 +1,7 @@
 # models.py
 from sqlalchemy import (
-    create_engine, Column, String, Integer, Text, DateTime, Enum, JSON, Boolean, ForeignKey, Float
+    create_engine, Column, String, Integer, Text, DateTime, Enum, JSON, Boolean, ForeignKey, Float,
+    BigInteger, LargeBinary, SmallInteger, Date, UniqueConstraint
 )
 from sqlalchemy.orm import declarative_base, relationship
 import enum
@@ -24,7 +25,7 @@ class Job(Base):
 
     job_id = Column(String, primary_key=True, index=True)  # id
     site = Column(String, nullable=False)                  # site
-    job_url = Column(Text, nullable=False)                 # job_url
+    job_url = Column(Text, nullable=False, index=True)     # job_url
     job_url_direct = Column(Text, nullable=True)           # job_url_direct
     title = Column(String, nullable=False)                 # title
     company = Column(String, nullable=False)               # company
@@ -34,8 +35,48 @@ class Job(Base):
     description = Column(Text, nullable=False)             # description
     company_industry = Column(String, nullable=True)       # company_industry
     company_url = Column(Text, nullable=True)              # company_url
-    created_at = Column(DateTime, default=datetime.utcnow())
+    created_at = Column(DateTime, default=datetime.utcnow)
     min_exp_required = Column(Integer,nullable=True)
+    # Set when the posting is a near-duplicate (repost or cross-site copy) of another job
+    canonical_job_id = Column(String, ForeignKey("jobs.job_id", ondelete="SET NULL"), nullable=True, index=True)
+    # Description without company boilerplate; this is what gets embedded
+    compact_description = Column(Text, nullable=True)
+
+
+# --- Near-Duplicate Index Tables ---
+class JobSignature(Base):
+    __tablename__ = "job_signatures"
+
+    job_id = Column(String, ForeignKey("jobs.job_id", ondelete="CASCADE"), primary_key=True)
+    minhash = Column(LargeBinary, nullable=False)  # little-endian uint32 MinHash signature
+
+
+class JobLshBucket(Base):
+    __tablename__ = "job_lsh_buckets"
+
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)  # hash of the signature rows in this band
+    job_id = Column(String, ForeignKey("jobs.job_id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+# --- Paragraph Frequencies Table ---
+class ParagraphFrequency(Base):
+    __tablename__ = "paragraph_frequencies"
+
+    paragraph_hash = Column(BigInteger, primary_key=True)  # hash of the normalized paragraph text
+    doc_count = Column(Integer, nullable=False)            # canonical postings containing the paragraph
+    last_seen = Column(DateTime, nullable=True)
+
+
+# --- Job Embeddings Table ---
+class JobEmbedding(Base):
+    __tablename__ = "job_embeddings"
+
+    job_id = Column(String, ForeignKey("jobs.job_id", ondelete="CASCADE"), primary_key=True)
+    model = Column(String, primary_key=True)       # "<model name>@<version>" that produced the vector
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)   # little-endian float32, L2-normalized
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 
 # --- Seen Jobs Table ---
@@ -48,6 +89,19 @@ class SeenJob(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+# --- Scrape Watermarks Table ---
+class ScrapeWatermark(Base):
+    __tablename__ = "scrape_watermarks"
+
+    site = Column(String(50), primary_key=True)
+    search_term = Column(String, primary_key=True)
+    location = Column(String, primary_key=True)
+    last_success_at = Column(DateTime, nullable=True)   # last fetch known to reach the previous mark
+    newest_date_posted = Column(Date, nullable=True)
+    edge_ids = Column(JSON, nullable=True)              # external ids posted on newest_date_posted
+    jobs_per_hour = Column(Float, nullable=True)        # observed rate, sizes the next results_wanted
+
+
 # --- Users Table ---
 class User(Base):
     __tablename__ = "users"
@@ -58,9 +112,34 @@ class User(Base):
     linkedin = Column(JSON, nullable=True)     # LinkedInCredentials
     user_automation_settings = Column(JSON, nullable=True)  # Automation Settings
 
+# --- Resume Embeddings Table ---
+class ResumeEmbedding(Base):
+    __tablename__ = "resume_embeddings"
+
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    model = Column(String, primary_key=True)              # "<model name>@<version>" that produced the vector
+    text_hash = Column(String(64), nullable=False)        # sha256 of the resume text that was encoded
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)          # little-endian float32, L2-normalized
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# --- ResumeSectionEmbedding Table ---
+class ResumeSectionEmbedding(Base):
+    __tablename__ = "resume_section_embeddings"
+
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    model = Column(String, primary_key=True)              # "<model name>@<version>" that produced the vectors
+    text_hash = Column(String(64), nullable=False)        # sha256 of the section texts that were encoded
+    dim = Column(Integer, nullable=False)
+    sections = Column(Integer, nullable=False)            # rows in `vectors`
+    vectors = Column(LargeBinary, nullable=False)         # sections x dim little-endian float32, L2-normalized rows
+    created_at = Column(DateTime, default=datetime.utcnow)
+
 # --- UserJobMatch Table ---
 class UserJobMatch(Base):
     __tablename__ = "user_job_matches"
+    # One row per pair, so matches can be upserted (see database/match_writer.py)
+    __table_args__ = (UniqueConstraint("user_id", "job_id", name="uq_user_job_matches_user_job"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(String, ForeignKey("users.user_id"), nullable=False)
@@ -69,7 +148,16 @@ class UserJobMatch(Base):
     reasons = Column(Text, nullable=True)
     score = Column(Float, nullable=True)
     status = Column(Text, default="READY_FOR_EMAIL")
-    created_at = Column(DateTime, default=datetime.utcnow())
+    created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User")
     job = relationship("Job")
+
+# --- Match Watermarks Table ---
+class MatchWatermark(Base):
+    __tablename__ = "match_watermarks"
+
+    user_id = Column(String, ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    profile_hash = Column(String(64), nullable=False)   # sha256 of resume text, match preferences and model tag
+    matched_until = Column(DateTime, nullable=True)     # newest jobs.created_at already matched
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -1,21 +1,39 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Query
 from typing import List, Optional
 import uvicorn
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.exception_handlers import request_validation_exception_handler
 
-from database.models import User, Job
-from schemas.user import UserProfile
-from schemas.job import JobPosting
-from database.setup_db import get_db
+from backend.database.models import User, Job
+from backend.matching_engine import config as matching_config
+from backend.matching_engine.embeddings import invalidate_resume_embeddings
+from backend.schemas.user import UserProfile
+from backend.schemas.job import JobPosting
+from backend.schemas.match import UserMatches
+from backend.database.setup_db import SessionLocal, get_db
+from backend.workflows.match_service import get_match_service
 from sqlalchemy.orm import Session
 import logging
 
-app = FastAPI()
-
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model and the vector index once, before the first match request
+    if matching_config.MATCH_API_WARM_UP:
+        db = SessionLocal()
+        try:
+            get_match_service().warm_up(db)
+        except Exception as e:
+            logger.error(f"Match service warm-up failed; it will load on the first request: {e}", exc_info=True)
+        finally:
+            db.close()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     # Log the validation errors in detail
@@ -34,6 +52,8 @@ def create_user(user: UserProfile, db: Session = Depends(get_db)):
         user_automation_settings=user.user_automation_settings.model_dump() if user.user_automation_settings else None
     )
     db.add(db_user)
+    # Drop any cached resume embeddings so matching re-encodes the new resume
+    invalidate_resume_embeddings(db, user.user_id)
     db.commit()
     db.refresh(db_user)
     return user
@@ -51,6 +71,22 @@ def read_user(user_id: str, db: Session = Depends(get_db)):
         user_automation_settings=db_user.user_automation_settings
     )
 
+@app.get("/users/{user_id}/matches", response_model=UserMatches)
+def read_user_matches(
+    user_id: str,
+    top_k: int = Query(matching_config.MATCH_API_TOP_K, ge=1, le=matching_config.ANN_TOP_K),
+    max_experience: Optional[int] = Query(None, ge=0, description="Defaults to the user's max_experience"),
+    locations: Optional[List[str]] = Query(None, description="Defaults to the user's preferred_locations"),
+    max_age_days: Optional[float] = Query(None, gt=0, description="Only jobs added in this many days"),
+    db: Session = Depends(get_db),
+):
+    db_user = db.query(User).filter(User.user_id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return get_match_service().top_matches(
+        db, db_user, top_k=top_k, max_experience=max_experience, locations=locations, max_age_days=max_age_days
+    )
+
 @app.get("/jobs/", response_model=List[JobPosting])
 def read_jobs(q: Optional[str] = None, db: Session = Depends(get_db)):
     query = db.query(Job)
@@ -0,0 +1,85 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- Embedding Model ---
+# Path can be overridden per machine; the name and version tag every stored embedding,
+# so vectors from a different model are never compared with each other.
+MODEL_PATH = os.getenv('JOBGENIE_MODEL_PATH', '/home/karthik/dev/models/JobBERT-v2')
+MODEL_NAME = 'JobBERT-v2'
+MODEL_VERSION = '1'
+MODEL_DEVICE = os.getenv('JOBGENIE_MODEL_DEVICE')  # e.g. "cpu", "cuda:0"; None lets torch pick
+
+# --- Inference Backend ---
+# 'torch' (reference), 'onnx' (ONNX Runtime, CPU) or 'onnx-int8' (dynamically quantized, CPU).
+# onnx-int8 vectors get their own model tag; compare backends with scripts/benchmark_inference_backends.py.
+MODEL_BACKEND = os.getenv('JOBGENIE_MODEL_BACKEND', 'torch')
+MODEL_THREADS = int(os.getenv('JOBGENIE_MODEL_THREADS', '0')) or None  # intra-op threads; None keeps the default
+ONNX_EXPORT_DIR = os.path.join(BASE_DIR, 'cache', 'onnx')
+ONNX_QUANTIZATION_TARGET = 'avx2'  # 'arm64', 'avx2', 'avx512' or 'avx512_vnni'; match the CPUs matching runs on
+
+# --- Model Registry ---
+# Every model the process may load, by registry key. Each is loaded at most once per process.
+MODELS = {
+    'jobbert': {'path': MODEL_PATH, 'name': MODEL_NAME, 'version': MODEL_VERSION, 'device': MODEL_DEVICE,
+                'backend': MODEL_BACKEND, 'threads': MODEL_THREADS},
+}
+DEFAULT_MODEL = 'jobbert'
+MODEL_WARMUP = True  # run a dummy batch right after loading so the first real batch is not slow
+MODEL_WARMUP_BATCH_SIZE = 8
+
+# --- Job Embeddings ---
+EMBEDDING_BATCH_SIZE = 64  # texts per forward pass
+EMBED_JOBS_AT_INGEST = True  # encode new jobs in load_jobs_to_db instead of at match time
+
+# --- Resume Sections ---
+# 'whole' encodes the resume as one text, which the model truncates at its max sequence length.
+# 'sections' encodes the summary, each experience entry, each project and the skills block on
+# their own and pools the section-to-job similarities into one score per job.
+RESUME_EMBEDDING_MODE = 'whole'
+RESUME_SECTION_POOLING = 'max-mean'  # 'max', 'mean' or 'max-mean'
+RESUME_SECTION_MAX_WEIGHT = 0.7  # weight of the max in 'max-mean'; the mean gets the rest
+
+# --- Encoding Pool ---
+# Large backfills (scripts/backfill_job_embeddings.py) shard texts over worker processes,
+# each with its own model copy and cpu_count // workers threads. 0 encodes in-process.
+ENCODING_POOL_WORKERS = int(os.getenv('JOBGENIE_ENCODING_WORKERS', '0'))
+ENCODING_POOL_SHARD_SIZE = 1000  # texts per shard handed to a worker; also the commit and checkpoint unit
+ENCODING_POOL_MAX_PENDING = 2  # shards in flight per worker, so a worker never waits for its next shard
+EMBEDDING_BACKFILL_CHECKPOINT_DIR = os.path.join(BASE_DIR, 'cache', 'backfill')
+
+# --- Vector Index ---
+USE_ANN_INDEX = True  # retrieve the top ANN_TOP_K jobs per user from the index instead of scoring every job
+ANN_TOP_K = 200
+ANN_INDEX_PATH = os.path.join(BASE_DIR, 'cache', 'job_vectors.npz')
+ANN_MIN_TRAIN_SIZE = 10_000  # below this every job is scanned; above, inverted lists are built
+ANN_NPROBE = 32  # lists scanned per query, doubled while filters leave fewer than k jobs
+ANN_RETRAIN_GROWTH = 2.0  # retrain the lists once the index has grown this much since the last training
+ANN_MAX_DELETED_FRACTION = 0.2  # compact tombstoned rows beyond this share
+ANN_TRAIN_POINTS_PER_LIST = 64  # k-means sample size per list
+ANN_KMEANS_ITERATIONS = 10
+# Storage of the indexed vectors: 'float32', 'float16' or 'int8' (one scale per vector, 4x smaller
+# than float32). Check the recall cost with scripts/benchmark_quantized_matrix.py.
+ANN_VECTOR_DTYPE = 'int8'
+EMBEDDING_MATRIX_CHUNK_ROWS = 16_384  # rows widened to float32 at a time while scoring
+
+# --- Batch Matching ---
+BATCH_MATCHING = True  # main_pipeline matches all users in one pass instead of one user at a time
+BATCH_MATCH_TOP_K = ANN_TOP_K  # matches kept per user
+BATCH_MATCH_JOB_BLOCK = 8192  # jobs scored against all users per matrix multiply
+
+# --- Incremental Matching ---
+INCREMENTAL_MATCHING = True  # score only jobs newer than each user's watermark until their profile changes
+MATCH_WATERMARK_OVERLAP_MINUTES = 10  # re-scan this much before the mark, for loads committed late
+
+# --- Preference Prefilter ---
+USE_PREFILTER = True  # apply avoid/preferred companies, keywords and remote_only before scoring
+PREFILTER_PREFERRED_COMPANY_BOOST = 0.05  # added to the semantic score of jobs at preferred companies
+PREFILTER_REMOTE_TERMS = ('remote', 'work from home', 'wfh', 'telecommute')
+
+# --- Match API ---
+# GET /users/{user_id}/matches scores in-process from stored vectors with the shared model.
+MATCH_API_TOP_K = 20  # matches returned when the request does not ask for a number
+MATCH_API_CANDIDATE_FACTOR = 3  # candidates retrieved per returned match, before the preference prefilter
+MATCH_API_INDEX_REFRESH_SECONDS = 60  # the in-memory vector index is synced with the database at most this often
+MATCH_API_WARM_UP = True  # load the model and the vector index at startup instead of on the first request
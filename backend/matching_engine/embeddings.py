@@ -0,0 +1,239 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.database.models import JobEmbedding, ResumeEmbedding, ResumeSectionEmbedding
+from backend.matching_engine import config
+
+logger = logging.getLogger(__name__)
+
+# Rows per IN query when reading stored vectors.
+_READ_CHUNK = 5000
+
+
+def model_tag(name: Optional[str] = None, version: Optional[str] = None, backend: Optional[str] = None) -> str:
+    """Identifies the model that produced a vector, e.g. 'JobBERT-v2@1' or 'JobBERT-v2@1+int8'."""
+    # Imported here: inference_backends is only needed for its tag suffixes.
+    from backend.matching_engine.inference_backends import TAG_SUFFIXES
+
+    suffix = TAG_SUFFIXES.get(backend or config.MODEL_BACKEND, "")
+    return f"{name or config.MODEL_NAME}@{version or config.MODEL_VERSION}{suffix}"
+
+
+def job_embedding_text(job) -> str:
+    """The text a job is embedded from: its compact description where one was computed."""
+    return getattr(job, "compact_description", None) or job.description or ""
+
+
+def to_blob(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype="<f4").tobytes()
+
+
+def from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<f4")
+
+
+class TextEncoder:
+    """
+    Sentence-transformers model that returns L2-normalized float32 embeddings, so cosine is a dot product.
+    `backend` selects the inference backend (see inference_backends; default MODEL_BACKEND).
+    """
+
+    def __init__(self, model_path: Optional[str] = None, batch_size: Optional[int] = None,
+                 tag: Optional[str] = None, device: Optional[str] = None,
+                 backend: Optional[str] = None, threads: Optional[int] = None):
+        # Imported here so modules that only read stored vectors do not pull in torch.
+        from backend.matching_engine.inference_backends import load_sentence_model
+
+        self.model_path = model_path or config.MODEL_PATH
+        self.batch_size = batch_size or config.EMBEDDING_BATCH_SIZE
+        self.backend = backend or config.MODEL_BACKEND
+        self.tag = tag or model_tag(backend=self.backend)
+        self.model = load_sentence_model(self.model_path, self.backend, device, threads)
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        vectors = self.model.encode(list(texts), batch_size=batch_size or self.batch_size,
+                                    convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False)
+        return vectors.astype(np.float32, copy=False)
+
+
+def get_text_encoder(name: Optional[str] = None) -> TextEncoder:
+    """Process-wide encoder for a configured model (default: DEFAULT_MODEL); loaded on first use."""
+    # Imported here: the registry builds TextEncoders, so it imports this module.
+    from backend.matching_engine.model_registry import get_model_registry
+
+    return get_model_registry().get(name)
+
+
+class JobEmbeddingStore:
+    """
+    Job description embeddings persisted in job_embeddings, one row per job and model tag.
+
+    Jobs are encoded once, when they are loaded (or by the backfill script), and matching
+    reads the stored vectors instead of re-encoding every description for every user.
+    Vectors from another model name or version are simply not found, so changing the
+    model never mixes incompatible embeddings.
+    """
+
+    def __init__(self, db, encoder: Optional[TextEncoder] = None, tag: Optional[str] = None):
+        self.db = db
+        self._encoder = encoder
+        self.tag = tag or (encoder.tag if encoder else model_tag())
+
+    @property
+    def encoder(self) -> TextEncoder:
+        if self._encoder is None:
+            self._encoder = get_text_encoder()
+        return self._encoder
+
+    def get(self, job_ids: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Stored vectors for the given jobs; jobs without one are left out."""
+        job_ids = list(dict.fromkeys(job_ids))
+        vectors = {}
+        for start in range(0, len(job_ids), _READ_CHUNK):
+            rows = (
+                self.db.query(JobEmbedding.job_id, JobEmbedding.vector)
+                .filter(JobEmbedding.model == self.tag, JobEmbedding.job_id.in_(job_ids[start:start + _READ_CHUNK]))
+                .all()
+            )
+            vectors.update((job_id, from_blob(blob)) for job_id, blob in rows)
+        return vectors
+
+    def encode_jobs(self, jobs: Sequence[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+        """Encodes (job_id, description) pairs; empty descriptions are skipped."""
+        jobs = [(job_id, description) for job_id, description in jobs if description and description.strip()]
+        if not jobs:
+            return {}
+        matrix = self.encoder.encode([description for _, description in jobs])
+        return {job_id: matrix[i] for i, (job_id, _) in enumerate(jobs)}
+
+    def put(self, vectors: Dict[str, np.ndarray]):
+        """Stores vectors in the caller's transaction, replacing any for the same job and model."""
+        if not vectors:
+            return
+        rows: List[Dict] = [
+            {"job_id": job_id, "model": self.tag, "dim": int(vector.shape[0]), "vector": to_blob(vector)}
+            for job_id, vector in vectors.items()
+        ]
+        stmt = insert(JobEmbedding).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["job_id", "model"],
+            set_={"dim": stmt.excluded.dim, "vector": stmt.excluded.vector},
+        )
+        self.db.execute(stmt)
+
+    def get_or_embed(self, jobs: Sequence[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+        """Stored vectors for (job_id, description) pairs, encoding and committing any that are missing."""
+        vectors = self.get(job_id for job_id, _ in jobs)
+        missing = [(job_id, description) for job_id, description in jobs if job_id not in vectors]
+        if missing:
+            logger.info(f"Encoding {len(missing)} jobs without a stored {self.tag} embedding.")
+            new_vectors = self.encode_jobs(missing)
+            self.put(new_vectors)
+            self.db.commit()
+            vectors.update(new_vectors)
+        return vectors
+
+
+def resume_text_hash(resume_text: str) -> str:
+    return hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+
+
+class ResumeEmbeddingCache:
+    """
+    Resume embeddings persisted in resume_embeddings, one row per user and model tag.
+
+    An entry is valid only while the sha256 of the resume text it was computed from still
+    matches, so an edited resume is re-encoded even if nobody invalidated it; creating or
+    updating a user also drops the entry (see `invalidate_resume_embeddings`). Vectors
+    served in this process are also kept in memory by (model tag, text hash).
+
+    `get_or_encode_sections` does the same for the sections x dim matrix of a resume split
+    into sections (see resume_sections), stored in resume_section_embeddings.
+    """
+
+    def __init__(self, db, encoder: Optional[TextEncoder] = None, tag: Optional[str] = None):
+        self.db = db
+        self._encoder = encoder
+        self.tag = tag or (encoder.tag if encoder else model_tag())
+        self._memory: Dict[Tuple[str, str], np.ndarray] = {}
+
+    @property
+    def encoder(self) -> TextEncoder:
+        if self._encoder is None:
+            self._encoder = get_text_encoder()
+        return self._encoder
+
+    def get_or_encode(self, user_id: str, resume_text: str) -> np.ndarray:
+        """The user's resume vector, encoding and committing it only when the text or model changed."""
+        text_hash = resume_text_hash(resume_text)
+        cached = self._memory.get((self.tag, text_hash))
+        if cached is not None:
+            return cached
+
+        row = (
+            self.db.query(ResumeEmbedding.text_hash, ResumeEmbedding.vector)
+            .filter(ResumeEmbedding.user_id == user_id, ResumeEmbedding.model == self.tag)
+            .first()
+        )
+        if row is not None and row.text_hash == text_hash:
+            vector = from_blob(row.vector)
+        else:
+            logger.info(f"Encoding resume for user {user_id} with {self.tag}.")
+            vector = self.encoder.encode([resume_text])[0]
+            stmt = insert(ResumeEmbedding).values(
+                user_id=user_id, model=self.tag, text_hash=text_hash, dim=int(vector.shape[0]),
+                vector=to_blob(vector), created_at=datetime.utcnow(),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "model"],
+                set_={column: stmt.excluded[column] for column in ("text_hash", "dim", "vector", "created_at")},
+            )
+            self.db.execute(stmt)
+            self.db.commit()
+        self._memory[(self.tag, text_hash)] = vector
+        return vector
+
+    def get_or_encode_sections(self, user_id: str, sections: Sequence[str]) -> np.ndarray:
+        """`get_or_encode` for a resume split into sections: a sections x dim matrix, one row per section."""
+        text_hash = resume_text_hash(json.dumps(list(sections)))
+        cached = self._memory.get((self.tag, "sections", text_hash))
+        if cached is not None:
+            return cached
+
+        row = (
+            self.db.query(ResumeSectionEmbedding.text_hash, ResumeSectionEmbedding.dim, ResumeSectionEmbedding.vectors)
+            .filter(ResumeSectionEmbedding.user_id == user_id, ResumeSectionEmbedding.model == self.tag)
+            .first()
+        )
+        if row is not None and row.text_hash == text_hash:
+            matrix = from_blob(row.vectors).reshape(-1, row.dim)
+        else:
+            logger.info(f"Encoding {len(sections)} resume sections for user {user_id} with {self.tag}.")
+            matrix = self.encoder.encode(list(sections))
+            stmt = insert(ResumeSectionEmbedding).values(
+                user_id=user_id, model=self.tag, text_hash=text_hash, dim=int(matrix.shape[1]),
+                sections=int(matrix.shape[0]), vectors=to_blob(matrix), created_at=datetime.utcnow(),
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "model"],
+                set_={column: stmt.excluded[column]
+                      for column in ("text_hash", "dim", "sections", "vectors", "created_at")},
+            )
+            self.db.execute(stmt)
+            self.db.commit()
+        self._memory[(self.tag, "sections", text_hash)] = matrix
+        return matrix
+
+
+def invalidate_resume_embeddings(db, user_id: str):
+    """Drops every cached resume vector of a user, whole-resume and per-section, in the caller's transaction."""
+    db.query(ResumeEmbedding).filter(ResumeEmbedding.user_id == user_id).delete(synchronize_session=False)
+    db.query(ResumeSectionEmbedding).filter(ResumeSectionEmbedding.user_id == user_id).delete(synchronize_session=False)
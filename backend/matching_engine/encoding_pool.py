@@ -0,0 +1,131 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+from collections import deque
+from typing import Deque, Iterable, Iterator, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from backend.matching_engine import config
+from backend.matching_engine.embeddings import TextEncoder, get_text_encoder, model_tag
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# The encoder of a pool worker process, loaded once by _init_worker, or why loading failed.
+_worker_encoder = None
+_worker_error: Optional[BaseException] = None
+
+
+def _init_worker(model_path: str, backend: str, tag: str, device: Optional[str], threads: int, batch_size: int):
+    global _worker_encoder, _worker_error
+    # Each worker gets its own slice of the cores; tokenizer threads would oversubscribe them.
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    started = time.perf_counter()
+    try:
+        _worker_encoder = TextEncoder(model_path=model_path, batch_size=batch_size, tag=tag, device=device,
+                                      backend=backend, threads=threads)
+    except Exception as e:
+        # Raised from the first shard instead, so the caller sees why rather than a bare BrokenProcessPool.
+        _worker_error = e
+        return
+    logger.info(f"Encoding worker {os.getpid()} loaded {tag} with {threads} threads "
+                f"in {time.perf_counter() - started:.1f}s.")
+
+
+def _encode_shard(texts: Sequence[str]) -> np.ndarray:
+    if _worker_error is not None:
+        raise RuntimeError(f"Encoding worker {os.getpid()} could not load its model: {_worker_error}")
+    return _worker_encoder.encode(texts)
+
+
+class EncodingPool:
+    """
+    Encodes text in a pool of worker processes, each holding its own copy of the model.
+
+    Meant for backfills too large for one process (a model change, a historical import):
+    shards are handed to `workers` spawned processes, each limited to its share of the
+    cores (`threads_per_worker`, default cpu_count // workers) so the workers do not fight
+    over them and throughput grows with the number of workers. `encode_ordered` streams
+    results back in submission order with at most ENCODING_POOL_MAX_PENDING shards per
+    worker in flight, so the caller can store and checkpoint each shard as it arrives
+    without holding the whole backfill in memory. A worker that dies (killed, out of memory)
+    breaks the pool: the pending shards raise BrokenProcessPool instead of waiting forever.
+
+    With `workers` 0 the shards are encoded in the calling process by the shared encoder.
+    Use as a context manager; leaving the block shuts the workers down.
+    """
+
+    def __init__(self, workers: Optional[int] = None, model_path: Optional[str] = None,
+                 backend: Optional[str] = None, tag: Optional[str] = None, device: Optional[str] = None,
+                 batch_size: Optional[int] = None, threads_per_worker: Optional[int] = None):
+        self.workers = config.ENCODING_POOL_WORKERS if workers is None else workers
+        self.model_path = model_path or config.MODEL_PATH
+        self.backend = backend or config.MODEL_BACKEND
+        self.tag = tag or model_tag(backend=self.backend)
+        self.device = device or config.MODEL_DEVICE
+        self.batch_size = batch_size or config.EMBEDDING_BATCH_SIZE
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // max(1, self.workers))
+        self._pool = None
+        self._encoder = None
+
+    def __enter__(self) -> "EncodingPool":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(terminate=exc_type is not None)
+
+    def start(self):
+        if self.workers > 0 and self._pool is None:
+            logger.info(f"Starting {self.workers} encoding workers with {self.threads_per_worker} threads each.")
+            # spawn, not fork: a forked copy of an initialized torch or ONNX runtime can deadlock.
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker,
+                initargs=(self.model_path, self.backend, self.tag, self.device,
+                          self.threads_per_worker, self.batch_size),
+            )
+        elif self.workers <= 0 and self._encoder is None:
+            self._encoder = get_text_encoder()
+            if self._encoder.tag != self.tag:
+                raise ValueError(f"The shared encoder produces {self._encoder.tag} vectors, not {self.tag}.")
+
+    def close(self, terminate: bool = False):
+        if self._pool is not None:
+            if terminate:
+                # Queued shards are dropped; workers finish the shard they are on, then exit.
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            else:
+                self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def encode_ordered(self, shards: Iterable[Tuple[T, Sequence[str]]]) -> Iterator[Tuple[T, np.ndarray]]:
+        """
+        Encodes (key, texts) shards and yields (key, vectors) in the order the shards came in.
+        `shards` is consumed lazily, in the calling thread, only as fast as workers free up.
+        """
+        self.start()
+        if self._pool is None:
+            for key, texts in shards:
+                yield key, self._encoder.encode(texts)
+            return
+
+        max_pending = self.workers * config.ENCODING_POOL_MAX_PENDING
+        pending: Deque = deque()
+        shards = iter(shards)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                shard = next(shards, None)
+                if shard is None:
+                    exhausted = True
+                    break
+                key, texts = shard
+                pending.append((key, self._pool.submit(_encode_shard, list(texts))))
+            if not pending:
+                return
+            key, future = pending.popleft()
+            yield key, future.result()
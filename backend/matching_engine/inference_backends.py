@@ -0,0 +1,88 @@
+import logging
+import os
+from typing import Callable, Dict, Optional
+
+from backend.matching_engine import config
+
+logger = logging.getLogger(__name__)
+
+TORCH = "torch"
+ONNX = "onnx"
+ONNX_INT8 = "onnx-int8"
+
+# Backends whose vectors differ measurably from the reference model get their own model tag,
+# so their embeddings are never compared with vectors stored by another backend.
+TAG_SUFFIXES = {TORCH: "", ONNX: "", ONNX_INT8: "+int8"}
+
+
+def _onnx_export_dir(model_path: str) -> str:
+    return os.path.join(config.ONNX_EXPORT_DIR, os.path.basename(os.path.normpath(model_path)))
+
+
+def _session_options(threads: Optional[int]):
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if threads:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    return options
+
+
+def _load_torch(model_path: str, device: Optional[str], threads: Optional[int]):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        torch.set_num_threads(threads)
+    return SentenceTransformer(model_path, device=device)
+
+
+def _load_onnx(model_path: str, device: Optional[str], threads: Optional[int], quantize: bool = False):
+    """
+    ONNX Runtime model on CPU. The model is exported to ONNX_EXPORT_DIR on first use and,
+    with `quantize`, dynamically quantized to int8 for ONNX_QUANTIZATION_TARGET.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    except ImportError as e:
+        raise ImportError("The ONNX backends need sentence-transformers>=3.2 with its onnx extra: "
+                          "pip install 'sentence-transformers[onnx]'") from e
+
+    export_dir = _onnx_export_dir(model_path)
+    file_name = os.path.join("onnx", "model.onnx")
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        logger.info(f"Exporting {model_path} to ONNX in {export_dir}...")
+        SentenceTransformer(model_path, backend="onnx", device="cpu").save_pretrained(export_dir)
+    if quantize:
+        target = config.ONNX_QUANTIZATION_TARGET
+        file_name = os.path.join("onnx", f"model_qint8_{target}.onnx")
+        if not os.path.exists(os.path.join(export_dir, file_name)):
+            logger.info(f"Quantizing the ONNX export of {model_path} to int8 for {target}...")
+            export_dynamic_quantized_onnx_model(
+                SentenceTransformer(export_dir, backend="onnx", device="cpu"), target, export_dir
+            )
+
+    if device and device != "cpu":
+        logger.warning(f"ONNX backends run on CPU only; ignoring device '{device}'.")
+    return SentenceTransformer(
+        export_dir, backend="onnx", device="cpu",
+        model_kwargs={"file_name": file_name, "provider": "CPUExecutionProvider",
+                      "session_options": _session_options(threads)},
+    )
+
+
+BACKENDS: Dict[str, Callable] = {
+    TORCH: _load_torch,
+    ONNX: _load_onnx,
+    ONNX_INT8: lambda model_path, device, threads: _load_onnx(model_path, device, threads, quantize=True),
+}
+
+
+def load_sentence_model(model_path: str, backend: Optional[str] = None, device: Optional[str] = None,
+                        threads: Optional[int] = None):
+    """A SentenceTransformer for `model_path` running on the given backend (default: MODEL_BACKEND)."""
+    backend = backend or config.MODEL_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'; expected one of {sorted(BACKENDS)}.")
+    return BACKENDS[backend](model_path, device, threads)
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.database.models import MatchWatermark
+from backend.matching_engine import config
+from backend.matching_engine.resume_sections import scoring_signature
+
+logger = logging.getLogger(__name__)
+
+# Preferences that decide which jobs match and how they score.
+MATCH_PREFERENCES = ("max_experience", "preferred_locations", "avoid_companies", "preferred_companies",
+                     "keywords", "blacklist_keywords", "remote_only")
+
+
+def matching_profile_hash(resume_text: str, preferences: Optional[Dict], tag: str) -> str:
+    """sha256 of everything a user's match results depend on besides the jobs themselves."""
+    preferences = preferences or {}
+    profile = {
+        "resume": resume_text,
+        "preferences": {key: preferences.get(key) for key in MATCH_PREFERENCES},
+        "model": tag,
+    }
+    scoring = scoring_signature()
+    if scoring is not None:
+        # Only when set, so hashes of whole-resume scoring stay what they were.
+        profile["scoring"] = scoring
+    payload = json.dumps(profile, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MatchWatermarks:
+    """
+    Per-user high-water marks for incremental matching.
+
+    For every user the newest jobs.created_at already matched is kept, together with a hash
+    of the resume text, match preferences and model tag it was matched with (see
+    `matching_profile_hash`). While the hash is unchanged only jobs created after the mark
+    (minus MATCH_WATERMARK_OVERLAP_MINUTES, for loads committed after the mark was read)
+    need scoring; a changed resume, preferences or model version yields no mark, which
+    means a full rescore. Marks are staged by `advance` and written by `save` in the
+    caller's transaction, so they commit together with the matches.
+    """
+
+    def __init__(self, db, marks: Dict[str, MatchWatermark]):
+        self.db = db
+        self.marks = marks
+        self.updates: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, db, user_ids: Iterable[str]) -> "MatchWatermarks":
+        user_ids = list(set(user_ids))
+        marks = {}
+        if user_ids:
+            marks = {mark.user_id: mark
+                     for mark in db.query(MatchWatermark).filter(MatchWatermark.user_id.in_(user_ids))}
+        return cls(db, marks)
+
+    def since(self, user_id: str, profile_hash: str) -> Optional[datetime]:
+        """Jobs created after this still need matching; None when the user needs a full rescore."""
+        if not config.INCREMENTAL_MATCHING:
+            return None
+        mark = self.marks.get(user_id)
+        if mark is None or mark.profile_hash != profile_hash or mark.matched_until is None:
+            return None
+        return mark.matched_until - timedelta(minutes=config.MATCH_WATERMARK_OVERLAP_MINUTES)
+
+    def advance(self, user_id: str, profile_hash: str, matched_until: Optional[datetime]):
+        """
+        Records that the user has been matched, with this profile, against every job up to
+        `matched_until`. A mark for the same profile never moves back: a run that read no job
+        newer than it (say, one scanning from another user's older mark) leaves it in place.
+        """
+        mark = self.marks.get(user_id)
+        if mark is not None and mark.profile_hash == profile_hash and mark.matched_until is not None:
+            if matched_until is None or matched_until < mark.matched_until:
+                matched_until = mark.matched_until
+        self.updates[user_id] = {
+            "user_id": user_id, "profile_hash": profile_hash,
+            "matched_until": matched_until, "updated_at": datetime.utcnow(),
+        }
+
+    def save(self):
+        """Writes the staged marks in the caller's transaction."""
+        if not self.updates:
+            return
+        stmt = insert(MatchWatermark).values(list(self.updates.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={column: stmt.excluded[column] for column in ("profile_hash", "matched_until", "updated_at")},
+        )
+        self.db.execute(stmt)
+        logger.info(f"Advanced match watermarks of {len(self.updates)} users.")
+        self.updates = {}
@@ -0,0 +1,132 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from backend.matching_engine import config
+from backend.matching_engine.embeddings import TextEncoder, model_tag
+
+logger = logging.getLogger(__name__)
+
+_WARMUP_TEXT = "Software engineer with experience in Python, SQL and distributed systems."
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class LoadedModel:
+    """A loaded encoder together with what it cost to load."""
+
+    def __init__(self, key: str, encoder: TextEncoder, load_seconds: float, warmup_seconds: Optional[float],
+                 parameter_bytes: Optional[int], rss_delta_bytes: Optional[int]):
+        self.key = key
+        self.encoder = encoder
+        self.load_seconds = load_seconds
+        self.warmup_seconds = warmup_seconds
+        self.parameter_bytes = parameter_bytes
+        self.rss_delta_bytes = rss_delta_bytes
+
+    def stats(self) -> Dict:
+        return {
+            "tag": self.encoder.tag,
+            "backend": self.encoder.backend,
+            "path": self.encoder.model_path,
+            "device": str(getattr(self.encoder.model, "device", "unknown")),
+            "load_seconds": round(self.load_seconds, 3),
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "parameter_bytes": self.parameter_bytes,
+            "rss_delta_bytes": self.rss_delta_bytes,
+        }
+
+
+class ModelRegistry:
+    """
+    Loads each configured model at most once per process and hands out the shared encoder.
+
+    Models are described in config.MODELS (path, name, version, device) and loaded lazily
+    on first `get`. Loading is serialized per model, so concurrent callers wait for the
+    same load instead of loading twice. After loading, a dummy batch is encoded (MODEL_WARMUP)
+    so the first real batch does not pay for lazy initialization. Load time, warm-up time
+    and memory footprint are logged and available from `stats()`.
+    """
+
+    def __init__(self, specs: Optional[Dict[str, Dict]] = None):
+        self.specs = specs if specs is not None else config.MODELS
+        self._models: Dict[str, LoadedModel] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._registry_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key: Optional[str] = None) -> TextEncoder:
+        key = key or config.DEFAULT_MODEL
+        loaded = self._models.get(key)
+        if loaded is None:
+            with self._lock_for(key):
+                loaded = self._models.get(key)
+                if loaded is None:
+                    loaded = self._load(key)
+                    self._models[key] = loaded
+        return loaded.encoder
+
+    def _load(self, key: str) -> LoadedModel:
+        if key not in self.specs:
+            raise KeyError(f"Model '{key}' is not configured; known models: {sorted(self.specs)}.")
+        spec = self.specs[key]
+        tag = model_tag(spec.get("name"), spec.get("version"), spec.get("backend"))
+        logger.info(f"Loading model '{key}' ({tag}) from {spec['path']} with the {spec.get('backend') or 'default'} "
+                    f"backend on {spec.get('device') or 'default device'}...")
+
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        encoder = TextEncoder(model_path=spec["path"], tag=tag, device=spec.get("device"),
+                              backend=spec.get("backend"), threads=spec.get("threads"))
+        load_seconds = time.perf_counter() - started
+
+        warmup_seconds = None
+        if config.MODEL_WARMUP:
+            started = time.perf_counter()
+            encoder.encode([_WARMUP_TEXT] * config.MODEL_WARMUP_BATCH_SIZE)
+            warmup_seconds = time.perf_counter() - started
+
+        try:
+            parameter_bytes = sum(p.numel() * p.element_size() for p in encoder.model.parameters())
+        except Exception:
+            parameter_bytes = None
+        rss_after = _rss_bytes()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        loaded = LoadedModel(key, encoder, load_seconds, warmup_seconds, parameter_bytes, rss_delta)
+        logger.info(f"Model '{key}' ready: {loaded.stats()}")
+        return loaded
+
+    def warm_up(self, *keys: str):
+        """Loads (and warms up) the given models now, e.g. before serving the first request."""
+        for key in keys or (config.DEFAULT_MODEL,):
+            self.get(key)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Load time and memory footprint of every model loaded so far."""
+        return {key: loaded.stats() for key, loaded in self._models.items()}
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """The process-wide registry built from config.MODELS."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
@@ -0,0 +1,207 @@
+import logging
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from backend.matching_engine import config
+
+logger = logging.getLogger(__name__)
+
+# Words, keeping tokens like "c++", "c#" and "node.js" whole.
+_TOKEN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+_COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "pvt", "private", "corp", "corporation", "co", "plc", "gmbh"}
+
+# Cascade order: cheapest rule first. A job removed by a rule is not seen by later rules.
+RULES = ("avoid_companies", "blacklist_keywords", "keywords", "remote_only")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+def normalize_company(name: Optional[str]) -> str:
+    """Lower-cased company name without punctuation or legal suffixes ("Acme Pvt. Ltd." -> "acme")."""
+    tokens = tokenize(name)
+    while tokens and tokens[-1] in _COMPANY_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over word tokens: finds every added phrase occurring in a text in
+    one pass over its tokens, however many phrases there are. Phrases match on whole words,
+    case-insensitively.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[int]] = [set()]
+        self._built = True
+
+    def add(self, phrase: str, value: int):
+        node = 0
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][token] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(set())
+            node = child
+        self._out[node].add(value)
+        self._built = False
+
+    def build(self):
+        """Computes failure links breadth-first; called automatically before the first search."""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        for node in queue:
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._out[child] |= self._out[self._fail[child]]
+        self._built = True
+
+    def find(self, text: Optional[str]) -> Set[int]:
+        """Values of every phrase occurring in the text."""
+        if not self._built:
+            self.build()
+        found: Set[int] = set()
+        node = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for token in tokenize(text):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if out[node]:
+                found |= out[node]
+        return found
+
+
+class PrefilterReport:
+    """Jobs checked and, per rule, (job, user) candidates removed or boosted."""
+
+    def __init__(self):
+        self.checked = 0
+        self.removed = Counter()
+        self.boosted = 0
+
+    def summary(self) -> str:
+        removed = ", ".join(f"{rule}: {self.removed[rule]}" for rule in RULES)
+        return f"checked {self.checked} jobs; removed {sum(self.removed.values())} candidates ({removed}); boosted {self.boosted}"
+
+
+class _UserRules:
+    def __init__(self, avoid: Set[str], preferred: Set[str], blacklist: Set[int], keywords: Set[int], remote_only: bool):
+        self.avoid = avoid
+        self.preferred = preferred
+        self.blacklist = blacklist
+        self.keywords = keywords
+        self.remote_only = remote_only
+
+
+class PreferencePrefilter:
+    """
+    Cheap rules from UserPreferences, run before any embedding or scoring work.
+
+    For each user, in cascade order: a job is rejected when its company is in
+    avoid_companies, when it mentions any blacklist_keywords, when it mentions none of the
+    (must-have) keywords, or, with remote_only, when nothing marks it as remote
+    (PREFILTER_REMOTE_TERMS). Jobs at preferred_companies are kept with a score boost of
+    PREFILTER_PREFERRED_COMPANY_BOOST.
+
+    The keyword phrases of every user are compiled into one KeywordAutomaton, so each job's
+    text is scanned once however many users and phrases there are; the per-user checks are
+    then set operations. Rule hits are counted in `report`.
+    """
+
+    def __init__(self, preferences: Sequence[Optional[Dict]]):
+        self.automaton = KeywordAutomaton()
+        self._phrase_ids: Dict[Tuple[str, ...], int] = {}
+        self.remote_id = self._phrase_id_set(config.PREFILTER_REMOTE_TERMS)
+        self.users: List[_UserRules] = []
+        for prefs in preferences:
+            prefs = prefs or {}
+            self.users.append(_UserRules(
+                avoid={normalize_company(c) for c in prefs.get("avoid_companies") or []} - {""},
+                preferred={normalize_company(c) for c in prefs.get("preferred_companies") or []} - {""},
+                blacklist=self._phrase_id_set(prefs.get("blacklist_keywords")),
+                keywords=self._phrase_id_set(prefs.get("keywords")),
+                remote_only=bool(prefs.get("remote_only")),
+            ))
+        self.automaton.build()
+        self.report = PrefilterReport()
+
+    def _phrase_id_set(self, phrases: Optional[Iterable[str]]) -> Set[int]:
+        ids = set()
+        for phrase in phrases or []:
+            key = tuple(tokenize(phrase))
+            if not key:
+                continue
+            if key not in self._phrase_ids:
+                self._phrase_ids[key] = len(self._phrase_ids)
+                self.automaton.add(phrase, self._phrase_ids[key])
+            ids.add(self._phrase_ids[key])
+        return ids
+
+    @property
+    def active(self) -> bool:
+        """Whether any user has a rule, i.e. whether running the prefilter can change anything."""
+        return any(u.avoid or u.preferred or u.blacklist or u.keywords or u.remote_only for u in self.users)
+
+    def evaluate(self, job) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per user: whether the job passes, and its score boost. `job` needs title, company,
+        location and description attributes.
+        """
+        self.report.checked += 1
+        passes = np.ones(len(self.users), dtype=bool)
+        boosts = np.zeros(len(self.users), dtype=np.float32)
+        company = normalize_company(job.company)
+        matched: Optional[Set[int]] = None
+        for i, rules in enumerate(self.users):
+            if company and company in rules.avoid:
+                passes[i] = False
+                self.report.removed["avoid_companies"] += 1
+                continue
+            if rules.blacklist or rules.keywords or rules.remote_only:
+                if matched is None:
+                    matched = self.automaton.find(f"{job.title or ''}\n{job.location or ''}\n{job.description or ''}")
+                if rules.blacklist & matched:
+                    passes[i] = False
+                    self.report.removed["blacklist_keywords"] += 1
+                    continue
+                if rules.keywords and not rules.keywords & matched:
+                    passes[i] = False
+                    self.report.removed["keywords"] += 1
+                    continue
+                if rules.remote_only and not self.remote_id & matched:
+                    passes[i] = False
+                    self.report.removed["remote_only"] += 1
+                    continue
+            if company and company in rules.preferred:
+                boosts[i] = config.PREFILTER_PREFERRED_COMPANY_BOOST
+                self.report.boosted += 1
+        return passes, boosts
+
+    def filter_jobs(self, jobs: Sequence) -> Tuple[List, List[float]]:
+        """Single-user form: the jobs that pass for the first user, and their boosts."""
+        kept, boosts = [], []
+        for job in jobs:
+            passes, job_boosts = self.evaluate(job)
+            if passes[0]:
+                kept.append(job)
+                boosts.append(float(job_boosts[0]))
+        return kept, boosts
@@ -0,0 +1,197 @@
+import json
+import os
+import struct
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from backend.matching_engine import config
+
+_MAGIC = b"JGQM"
+_FORMAT_VERSION = 1
+_ALIGNMENT = 64
+DTYPES = ("float32", "float16", "int8")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class QuantizedMatrix:
+    """
+    Row-major matrix of normalized embeddings stored as float32, float16 or int8.
+
+    int8 rows carry one float32 scale each (max |x| / 127), so a row is dequantized as
+    data * scale. Dot products are computed in blocks of EMBEDDING_MATRIX_CHUNK_ROWS rows:
+    only one block at a time is widened to float32 for BLAS, so scoring never holds a
+    full-precision copy of the matrix. For 768-dim vectors that is 3 KiB per job as float32,
+    1.5 KiB as float16 and 772 bytes as int8.
+
+    `save` writes a single file (header, scales, data, each 64-byte aligned) that `load`
+    maps read-only, so processes reading the same file share its pages. An optional
+    `generation` string is kept in the header, so a file can be paired with the one it was
+    saved alongside.
+    """
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None):
+        if data.dtype.name not in DTYPES:
+            raise ValueError(f"Unsupported embedding dtype {data.dtype}; expected one of {DTYPES}.")
+        if data.dtype == np.int8 and (scales is None or len(scales) != len(data)):
+            raise ValueError("int8 embeddings need one scale per row.")
+        self.data = data
+        self.scales = scales if data.dtype == np.int8 else None
+        self.generation: Optional[str] = None  # from the header of the file this was loaded from
+
+    @classmethod
+    def quantize(cls, vectors: np.ndarray, dtype: Optional[str] = None) -> "QuantizedMatrix":
+        """Stores float vectors (n x dim) as `dtype` (default: ANN_VECTOR_DTYPE)."""
+        dtype = dtype or config.ANN_VECTOR_DTYPE
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, dtype=np.float32)
+            scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            data = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            return cls(data, scales)
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported embedding dtype '{dtype}'; expected one of {DTYPES}.")
+        return cls(vectors.astype(dtype))
+
+    @classmethod
+    def empty(cls, dim: int, dtype: Optional[str] = None) -> "QuantizedMatrix":
+        return cls.quantize(np.zeros((0, dim), dtype=np.float32), dtype)
+
+    # --- Shape and storage ---
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def dim(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def dtype(self) -> str:
+        return self.data.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def append(self, vectors: np.ndarray) -> "QuantizedMatrix":
+        """A new matrix with the float vectors quantized and added at the end."""
+        added = QuantizedMatrix.quantize(vectors, self.dtype)
+        scales = np.concatenate([self.scales, added.scales]) if self.scales is not None else None
+        return QuantizedMatrix(np.concatenate([self.data, added.data]), scales)
+
+    def take(self, rows: np.ndarray) -> "QuantizedMatrix":
+        """A new, in-memory matrix holding only the given rows."""
+        return QuantizedMatrix(self.data[rows], self.scales[rows] if self.scales is not None else None)
+
+    # --- Reading and scoring ---
+
+    def dequantize(self, rows=None) -> np.ndarray:
+        """float32 copy of the given rows (a slice, index array or single index), or of every row."""
+        rows = slice(None) if rows is None else rows
+        block = self.data[rows].astype(np.float32)
+        if self.scales is not None:
+            scales = self.scales[rows]
+            block *= scales[..., None] if np.ndim(scales) else scales
+        return block
+
+    def blocks(self, chunk_rows: Optional[int] = None) -> Iterator[np.ndarray]:
+        """The whole matrix as consecutive float32 blocks."""
+        chunk_rows = chunk_rows or config.EMBEDDING_MATRIX_CHUNK_ROWS
+        for start in range(0, len(self), chunk_rows):
+            yield self.dequantize(slice(start, start + chunk_rows))
+
+    def dot(self, query: np.ndarray, rows: Optional[np.ndarray] = None,
+            chunk_rows: Optional[int] = None) -> np.ndarray:
+        """
+        Scores of the given rows (default: all) against a query vector (dim,) or matrix (dim, m).
+        For int8 the scale is applied to the block's scores rather than to the block.
+        """
+        chunk_rows = chunk_rows or config.EMBEDDING_MATRIX_CHUNK_ROWS
+        query = np.asarray(query, dtype=np.float32)
+        count = len(self) if rows is None else len(rows)
+        scores = np.empty((count,) + query.shape[1:], dtype=np.float32)
+        for start in range(0, count, chunk_rows):
+            selection = slice(start, start + chunk_rows) if rows is None else rows[start:start + chunk_rows]
+            block_scores = self.data[selection].astype(np.float32, copy=False) @ query
+            if self.scales is not None:
+                scale = self.scales[selection]
+                block_scores *= scale[:, None] if query.ndim == 2 else scale
+            scores[start:start + chunk_rows] = block_scores
+        return scores
+
+    def recall_at_k(self, reference: np.ndarray, queries: np.ndarray, k: int = 100) -> float:
+        """
+        Share of the exact float32 top-k (scored on `reference`, the same rows at full precision)
+        that the quantized scores also rank in their top-k, averaged over the queries.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self))
+        if not k or not len(queries):
+            return 1.0
+        exact = np.asarray(reference, dtype=np.float32) @ queries.T
+        approximate = self.dot(queries.T)
+        hits = 0
+        for q in range(len(queries)):
+            expected = np.argpartition(-exact[:, q], k - 1)[:k]
+            found = np.argpartition(-approximate[:, q], k - 1)[:k]
+            hits += len(np.intersect1d(expected, found, assume_unique=True))
+        return hits / (k * len(queries))
+
+    # --- Persistence ---
+
+    def save(self, path: str, generation: Optional[str] = None):
+        """Writes the matrix atomically as one memory-mappable file, tagged with `generation` if given."""
+        fields = {"format_version": _FORMAT_VERSION, "dtype": self.dtype, "rows": len(self), "dim": self.dim}
+        if generation is not None:
+            fields["generation"] = generation
+        header = json.dumps(fields).encode("utf-8")
+        scales_offset = _aligned(len(_MAGIC) + 4 + len(header))
+        data_offset = _aligned(scales_offset + (self.scales.nbytes if self.scales is not None else 0))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC + struct.pack("<I", len(header)) + header)
+            if self.scales is not None:
+                f.seek(scales_offset)
+                f.write(np.ascontiguousarray(self.scales, dtype="<f4").tobytes())
+            f.seek(data_offset)
+            f.write(np.ascontiguousarray(self.data).tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "QuantizedMatrix":
+        """Reads a file written by `save`; with `mmap` the arrays are read-only views of the file."""
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not an embedding matrix file.")
+            (header_length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_length))
+        if header["format_version"] != _FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported format version {header['format_version']}.")
+
+        dtype, rows, dim = header["dtype"], header["rows"], header["dim"]
+        scales_offset = _aligned(len(_MAGIC) + 4 + header_length)
+        data_offset = _aligned(scales_offset + (rows * 4 if dtype == "int8" else 0))
+
+        def read(offset: int, array_dtype: str, shape: Sequence[int]) -> np.ndarray:
+            if not rows:
+                return np.zeros(shape, dtype=array_dtype)
+            if mmap:
+                return np.memmap(path, dtype=array_dtype, mode="r", offset=offset, shape=tuple(shape))
+            with open(path, "rb") as f:
+                f.seek(offset)
+                return np.fromfile(f, dtype=array_dtype, count=int(np.prod(shape))).reshape(shape)
+
+        scales = read(scales_offset, "<f4", (rows,)) if dtype == "int8" else None
+        matrix = cls(read(data_offset, dtype, (rows, dim)), scales)
+        matrix.generation = header.get("generation")
+        return matrix
@@ -0,0 +1,77 @@
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+from backend.matching_engine import config
+
+logger = logging.getLogger(__name__)
+
+POOLINGS = ("max", "mean", "max-mean")
+
+
+def section_mode() -> bool:
+    return config.RESUME_EMBEDDING_MODE == "sections"
+
+
+def scoring_signature() -> Optional[str]:
+    """How resume scores are computed, when it differs from one whole-resume vector; None otherwise."""
+    if not section_mode():
+        return None
+    return f"sections:{config.RESUME_SECTION_POOLING}:{config.RESUME_SECTION_MAX_WEIGHT}"
+
+
+def resume_sections(resume) -> List[str]:
+    """
+    The resume split into separately encoded texts: the summary, one text per experience
+    entry and per project, and the skills block. Built from the same fields as
+    LLMMatcher._get_relevant_resume_text, so a change to any section changes that text too.
+    """
+    sections = []
+    if resume.summary:
+        sections.append(resume.summary)
+
+    for exp in getattr(resume, "experience", None) or []:
+        sections.append("\n".join(str(p) for p in [exp.role, exp.company, *(exp.bullets or [])] if p))
+
+    for proj in getattr(resume, "projects", None) or []:
+        sections.append("\n".join(str(p) for p in [proj.title, *(proj.description_bullets or [])] if p))
+
+    skills = getattr(resume, "skills", None)
+    if skills:
+        all_skills = skills.programming_languages + skills.frameworks_tools + skills.other
+        if all_skills:
+            sections.append("Skills: " + ", ".join(all_skills))
+
+    sections = [section for section in sections if section.strip()]
+    logger.debug(f"Split resume into {len(sections)} sections.")
+    return sections
+
+
+def pool_section_scores(scores: np.ndarray, offsets: Optional[np.ndarray] = None,
+                        pooling: Optional[str] = None, max_weight: Optional[float] = None) -> np.ndarray:
+    """
+    Pools a jobs x sections similarity matrix into jobs x resumes scores.
+
+    The sections of resume i are columns offsets[i] up to offsets[i + 1] (the last resume runs
+    to the end; one resume when `offsets` is None). 'max' scores a job by its best-matching
+    section, 'mean' by the average over sections, and 'max-mean' blends the two with
+    `max_weight` (default RESUME_SECTION_MAX_WEIGHT) on the max. Every resume is pooled at
+    once with ufunc.reduceat, without a Python loop over users.
+    """
+    pooling = pooling or config.RESUME_SECTION_POOLING
+    if pooling not in POOLINGS:
+        raise ValueError(f"Unknown section pooling '{pooling}'; expected one of {POOLINGS}.")
+    offsets = np.zeros(1, dtype=np.int64) if offsets is None else np.asarray(offsets)
+    counts = np.diff(np.append(offsets, scores.shape[1]))
+    if (counts <= 0).any():
+        # reduceat would give an empty resume another resume's column (max) or a 0/0 score (mean).
+        raise ValueError("Every resume needs at least one section to pool.")
+    if pooling == "max":
+        return np.maximum.reduceat(scores, offsets, axis=1)
+
+    mean = np.add.reduceat(scores, offsets, axis=1) / counts.astype(scores.dtype)
+    if pooling == "mean":
+        return mean
+    max_weight = config.RESUME_SECTION_MAX_WEIGHT if max_weight is None else max_weight
+    return max_weight * np.maximum.reduceat(scores, offsets, axis=1) + (1.0 - max_weight) * mean
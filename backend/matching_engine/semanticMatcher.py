@@ -1,8 +1,11 @@
-from sentence_transformers import SentenceTransformer, util
 import logging
-from typing import Dict
+from typing import Dict, List, Optional, Sequence
 
+import numpy as np
+
+from backend.matching_engine.embeddings import ResumeEmbeddingCache, get_text_encoder, job_embedding_text
 from backend.matching_engine.interfaces import MatchingEngine
+from backend.matching_engine.resume_sections import pool_section_scores, resume_sections, section_mode
 from backend.schemas.job import JobPosting
 from backend.schemas.user import UserProfile
 
@@ -15,8 +18,62 @@ logger = logging.getLogger(__name__)
 
 
 class LLMMatcher():
-    def __init__(self):
-        self.model = SentenceTransformer("/home/karthik/dev/models/JobBERT-v2")
+    # Decision threshold on the normalized semantic score
+    threshold = 0.6
+
+    def __init__(self, resume_cache: Optional[ResumeEmbeddingCache] = None, model_key: Optional[str] = None):
+        # Shared with JobEmbeddingStore, so stored job vectors come from the same model.
+        # `model_key` picks another config.MODELS entry, e.g. one on a different inference backend.
+        self.encoder = get_text_encoder(model_key)
+        self.model = self.encoder.model
+        self.resume_cache = resume_cache
+
+    def embed_resume(self, user: UserProfile) -> Optional[np.ndarray]:
+        """The user's normalized resume vector, or None when the resume has no relevant text."""
+        resume_text = self._get_relevant_resume_text(user.resume)
+        if not resume_text.strip():
+            return None
+        return self._resume_embedding(user, resume_text)
+
+    def embed_resume_matrix(self, user: UserProfile) -> Optional[np.ndarray]:
+        """
+        The vectors a job is scored against, one row each: the resume sections with
+        RESUME_EMBEDDING_MODE 'sections', else the single resume vector. None when the resume
+        has no relevant text or, in section mode, no non-empty section.
+        """
+        resume_text = self._get_relevant_resume_text(user.resume)
+        if not resume_text.strip():
+            return None
+        return self._resume_matrix(user, resume_text)
+
+    def _resume_embedding(self, user: UserProfile, resume_text: str) -> np.ndarray:
+        """Encodes the resume text, or serves it from `resume_cache` when the text is unchanged."""
+        if self.resume_cache is not None:
+            return self.resume_cache.get_or_encode(user.user_id, resume_text)
+        logger.debug("Encoding resume text.")
+        return self.encoder.encode([resume_text])[0]
+
+    def _resume_matrix(self, user: UserProfile, resume_text: str) -> Optional[np.ndarray]:
+        if not section_mode():
+            return self._resume_embedding(user, resume_text)[None, :]
+        sections = resume_sections(user.resume)
+        if not sections:
+            # The flattened text can be non-empty without any section (e.g. just "Skills: ").
+            return None
+        if self.resume_cache is not None:
+            return self.resume_cache.get_or_encode_sections(user.user_id, sections)
+        logger.debug(f"Encoding {len(sections)} resume sections.")
+        return self.encoder.encode(sections)
+
+    @staticmethod
+    def pool_scores(scores: np.ndarray, offsets: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Jobs x resumes scores from jobs x resume-matrix-rows similarities (see `embed_resume_matrix`);
+        the rows of resume i start at offsets[i]. Section scores are pooled, single vectors pass through.
+        """
+        if not section_mode():
+            return scores
+        return pool_section_scores(scores, offsets)
 
     def _get_relevant_resume_text(self, resume) -> str:
         """
@@ -57,17 +114,19 @@ class LLMMatcher():
         logger.debug(f"Constructed relevant resume text (length: {len(relevant_text)}).")
         return relevant_text
 
-    def match(self, job: JobPosting, user: UserProfile) -> Dict:
+    def match(self, job: JobPosting, user: UserProfile, job_embedding: Optional[np.ndarray] = None) -> Dict:
         """
         Match a job against a user profile using semantic similarity only.
         Removes brittle regex/skill matching logic.
+        Pass the job's stored `job_embedding` (see JobEmbeddingStore) to skip encoding its description.
         """
-        job_desc = job.description or ""
+        job_desc = job_embedding_text(job)
         resume_text = self._get_relevant_resume_text(user.resume)
 
         logger.debug(f"Job description length: {len(job_desc)}, Resume text length: {len(resume_text)}.")
 
-        if not job_desc.strip() or not resume_text.strip():
+        resume_matrix = self._resume_matrix(user, resume_text) if resume_text.strip() else None
+        if not job_desc.strip() or resume_matrix is None:
             logger.warning("Empty job description or resume text. Cannot perform semantic matching.")
             return {
                 "fit": "No",
@@ -76,23 +135,36 @@ class LLMMatcher():
             }
 
         # --- Semantic Similarity ---
-        logger.debug("Encoding job description and resume text.")
-        job_emb = self.model.encode(job_desc, convert_to_tensor=True)
-        resume_emb = self.model.encode(resume_text, convert_to_tensor=True)
-        semantic_score = float(util.pytorch_cos_sim(job_emb, resume_emb).item())
+        if job_embedding is None:
+            logger.debug("Encoding job description.")
+            job_embedding = self.encoder.encode([job_desc])[0]
+        # All vectors are L2-normalized, so the dot products are cosine similarities.
+        semantic_score = float(self.pool_scores((resume_matrix @ job_embedding)[None, :])[0, 0])
         logger.debug(f"Calculated raw semantic score: {semantic_score:.4f}.")
 
+        return self._build_result(semantic_score)
+
+    def _build_result(self, semantic_score: float, verbose: bool = True, boost: float = 0.0) -> Dict:
+        """
+        Turns a raw cosine similarity into the match result stored for a (user, job) pair.
+        `boost` (from the preference prefilter) is added to the score before the decision.
+        """
+        log = logger.info if verbose else logger.debug
+        score = semantic_score + boost
+
         # Normalize score to [0, 1]
-        final_score = max(0.0, min(semantic_score, 1.0))
-        logger.info(f"Normalized semantic score: {final_score:.4f}.")
+        final_score = max(0.0, min(score, 1.0))
+        log(f"Normalized semantic score: {final_score:.4f}.")
 
         # Decision threshold
-        threshold = 0.6
+        threshold = self.threshold
         fit = "Yes" if final_score >= threshold else "No"
-        logger.info(f"Match decision: {fit} (Score: {final_score:.4f} vs Threshold: {threshold}).")
+        log(f"Match decision: {fit} (Score: {final_score:.4f} vs Threshold: {threshold}).")
 
         # --- Reasons ---
         reasons = [f"Semantic similarity score: {semantic_score:.2f}."]
+        if boost:
+            reasons.append(f"Preferred company: score boosted by {boost:.2f}.")
         if fit == "No":
             reasons.append(f"Score is below the threshold ({threshold}).")
             logger.debug(f"Added reason: Score below threshold.")
@@ -101,9 +173,61 @@ class LLMMatcher():
         return {
             "fit": fit,
             "reasons": reasons,
-            "score": round(semantic_score, 2)
+            "score": round(score, 2)
         }
 
+    def score_batch(self, job_texts: Sequence[str], resume_texts: Sequence[str],
+                    job_embeddings: Optional[np.ndarray] = None, resume_embeddings: Optional[np.ndarray] = None,
+                    batch_size: Optional[int] = None) -> np.ndarray:
+        """
+        Cosine similarities of N jobs against M resumes as an N x M matrix.
+
+        Texts are encoded `batch_size` at a time (default EMBEDDING_BATCH_SIZE) and every
+        similarity comes out of one matrix multiply of the L2-normalized embeddings.
+        Pass `job_embeddings` (N x dim) or `resume_embeddings` (M x dim), normalized, to
+        skip encoding the corresponding texts.
+        """
+        if job_embeddings is None:
+            job_embeddings = self.encoder.encode(job_texts, batch_size=batch_size)
+        if resume_embeddings is None:
+            resume_embeddings = self.encoder.encode(resume_texts, batch_size=batch_size)
+        return job_embeddings @ resume_embeddings.T
+
+    def match_batch(self, jobs: Sequence[JobPosting], user: UserProfile,
+                    job_embeddings: Optional[Sequence[Optional[np.ndarray]]] = None,
+                    batch_size: Optional[int] = None, boosts: Optional[Sequence[float]] = None) -> List[Dict]:
+        """
+        Batch version of `match`: scores every job against the user's resume at once.
+
+        `job_embeddings` is aligned with `jobs`; entries that are None (or the whole
+        argument) are encoded here in batches. `boosts`, also aligned with `jobs`, are added
+        to the scores (see PreferencePrefilter). Returns one result per job, in order.
+        """
+        resume_text = self._get_relevant_resume_text(user.resume)
+        insufficient = {"fit": "No", "reasons": ["Insufficient data for matching."], "score": 0.0}
+        resume_matrix = self._resume_matrix(user, resume_text) if resume_text.strip() else None
+        if resume_matrix is None:
+            logger.warning("Empty resume text. Cannot perform semantic matching.")
+            return [dict(insufficient) for _ in jobs]
+
+        job_embeddings = list(job_embeddings) if job_embeddings is not None else [None] * len(jobs)
+        scorable = [i for i, job in enumerate(jobs) if job_embedding_text(job).strip()]
+        missing = [i for i in scorable if job_embeddings[i] is None]
+        if missing:
+            encoded = self.encoder.encode([job_embedding_text(jobs[i]) for i in missing], batch_size=batch_size)
+            for row, i in enumerate(missing):
+                job_embeddings[i] = encoded[row]
+
+        results = [dict(insufficient) for _ in jobs]
+        if scorable:
+            job_matrix = np.vstack([job_embeddings[i] for i in scorable])
+            scores = self.score_batch([], [], job_embeddings=job_matrix, resume_embeddings=resume_matrix)
+            scores = self.pool_scores(scores)[:, 0]
+            for i, score in zip(scorable, scores):
+                results[i] = self._build_result(float(score), verbose=False, boost=boosts[i] if boosts else 0.0)
+        logger.info(f"Scored {len(scorable)} jobs in one batch ({len(jobs) - len(scorable)} without a description).")
+        return results
+
     def is_recommended(self, job: JobPosting, user: UserProfile) -> bool:
         result = self.match(job, user)
-        return result["fit"] == "Yes" and result["score"] >= 0.6
+        return result["fit"] == "Yes" and result["score"] >= self.threshold
@@ -0,0 +1,361 @@
+import copy
+import logging
+import math
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+
+from backend.database.models import Job, JobEmbedding
+from backend.matching_engine import config
+from backend.matching_engine.embeddings import from_blob, model_tag
+from backend.matching_engine.quantized_matrix import QuantizedMatrix
+
+logger = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 3
+
+
+def _kmeans(vectors: np.ndarray, nlist: int, iterations: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on normalized vectors; returns normalized centroids."""
+    rng = np.random.RandomState(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=nlist)
+        empty = counts == 0
+        # Re-seed empty lists with random points so every list stays in use.
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+    return centroids.astype(np.float32)
+
+
+class JobVectorIndex:
+    """
+    Inverted-file (IVF) index over job embeddings for top-k retrieval per user.
+
+    Vectors are clustered with spherical k-means into about sqrt(n) lists; a query scores
+    the centroids, scans only the `nprobe` closest lists and ranks those jobs by exact
+    cosine similarity. Below ANN_MIN_TRAIN_SIZE jobs no lists are built and every job is
+    scanned, which is already fast at that size. Metadata pre-filters (min_exp_required,
+    location) are applied before scoring; when they leave fewer than k jobs in the probed
+    lists, more lists are probed.
+
+    Inserts are assigned to their nearest list; deletes are tombstoned and compacted away
+    once they pass ANN_MAX_DELETED_FRACTION. The lists are retrained when the index has grown
+    ANN_RETRAIN_GROWTH times since the last training.
+
+    Vectors are held as a QuantizedMatrix in ANN_VECTOR_DTYPE (int8 by default), in a .vectors
+    file next to the .npz holding ids, metadata and lists; it is memory-mapped on load. Each
+    save writes a fresh generation id into both files, and `load` rebuilds unless they agree,
+    so files from interleaved or interrupted saves are never paired. The
+    index is brought up to date from job_embeddings by `sync` (see `open`).
+    """
+
+    def __init__(self, tag: str, dim: int, path: Optional[str] = None):
+        self.tag = tag
+        self.dim = dim
+        self.path = path or config.ANN_INDEX_PATH
+        self.ids: List[str] = []
+        self.position: Dict[str, int] = {}
+        self.vectors = QuantizedMatrix.empty(dim)
+        self.min_exp = np.zeros(0, dtype=np.float32)        # NaN when unknown: never passes an experience filter
+        self.location_codes = np.zeros(0, dtype=np.int32)
+        self.location_values: List[str] = []               # lower-cased distinct locations
+        self._location_code: Dict[str, int] = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self.list_of = np.zeros(0, dtype=np.int32)
+        self.centroids = np.zeros((0, dim), dtype=np.float32)
+        self.trained_size = 0
+        self.synced_until: Optional[datetime] = None       # newest job_embeddings.created_at included
+        self.dirty = False
+
+    # --- Persistence ---
+
+    @staticmethod
+    def vectors_path_for(path: str) -> str:
+        return f"{os.path.splitext(path)[0]}.vectors"
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, tag: Optional[str] = None) -> Optional["JobVectorIndex"]:
+        """Reads the index from disk; returns None when it is missing, unreadable or for another model."""
+        path = path or config.ANN_INDEX_PATH
+        tag = tag or model_tag()
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["format_version"]) != _FORMAT_VERSION or str(data["tag"]) != tag:
+                    logger.info(f"Vector index at {path} is for another model or format; rebuilding.")
+                    return None
+                index = cls(tag, int(data["dim"]), path)
+                index.ids = data["ids"].tolist()
+                index.min_exp = data["min_exp"]
+                index.location_codes = data["location_codes"]
+                index.location_values = data["location_values"].tolist()
+                index.alive = data["alive"]
+                index.list_of = data["list_of"]
+                index.centroids = data["centroids"]
+                index.trained_size = int(data["trained_size"])
+                synced = str(data["synced_until"])
+                index.synced_until = datetime.fromisoformat(synced) if synced else None
+                generation = str(data["generation"])
+            index.vectors = QuantizedMatrix.load(cls.vectors_path_for(path))
+            if index.vectors.generation != generation:
+                logger.info(f"Vector index at {path} and its vectors come from different saves; rebuilding.")
+                return None
+            if len(index.vectors) != len(index.ids) or index.vectors.dtype != config.ANN_VECTOR_DTYPE:
+                logger.info(f"Vector index at {path} has stale or differently quantized vectors; rebuilding.")
+                return None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read vector index at {path}: {e}; rebuilding.")
+            return None
+        index.position = {job_id: i for i, job_id in enumerate(index.ids)}
+        index._location_code = {value: code for code, value in enumerate(index.location_values)}
+        return index
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Both files carry the generation; a crash between the two writes, or another process
+        # saving in between, leaves them disagreeing, which forces a rebuild on load.
+        generation = uuid.uuid4().hex
+        self.vectors.save(self.vectors_path_for(self.path), generation)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            tmp_path,
+            format_version=_FORMAT_VERSION,
+            generation=generation,
+            tag=self.tag,
+            dim=self.dim,
+            ids=np.array(self.ids, dtype=str),
+            min_exp=self.min_exp,
+            location_codes=self.location_codes,
+            location_values=np.array(self.location_values, dtype=str),
+            alive=self.alive,
+            list_of=self.list_of,
+            centroids=self.centroids,
+            trained_size=self.trained_size,
+            synced_until=self.synced_until.isoformat() if self.synced_until else "",
+        )
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    @classmethod
+    def open(cls, db, path: Optional[str] = None, tag: Optional[str] = None) -> "JobVectorIndex":
+        """Loads the persisted index (or starts an empty one), syncs it with the database and saves it."""
+        tag = tag or model_tag()
+        index = cls.load(path, tag)
+        if index is None:
+            row = db.query(JobEmbedding.dim).filter(JobEmbedding.model == tag).first()
+            index = cls(tag, row[0] if row else 0, path)
+        index.sync(db)
+        if index.dirty:
+            index.save()
+        return index
+
+    def copy(self) -> "JobVectorIndex":
+        """
+        A copy that can be synced or changed while readers keep searching this one. Arrays that
+        changes only ever replace (vectors, metadata, centroids) are shared, not copied.
+        """
+        index = copy.copy(self)
+        index.ids = list(self.ids)
+        index.position = dict(self.position)
+        index.location_values = list(self.location_values)
+        index._location_code = dict(self._location_code)
+        index.alive = self.alive.copy()
+        index.list_of = self.list_of.copy()
+        return index
+
+    # --- Maintenance ---
+
+    def __len__(self) -> int:
+        return int(self.alive.sum())
+
+    def _code_for(self, location: Optional[str]) -> int:
+        value = (location or "").lower()
+        code = self._location_code.get(value)
+        if code is None:
+            code = self._location_code[value] = len(self.location_values)
+            self.location_values.append(value)
+        return code
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if not len(self.centroids):
+            return np.zeros(len(vectors), dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def add(self, items: Sequence[Tuple[str, np.ndarray, Optional[int], Optional[str]]]):
+        """Inserts or replaces (job_id, vector, min_exp_required, location) entries."""
+        if not items:
+            return
+        self.remove(job_id for job_id, _, _, _ in items if job_id in self.position)
+        if not self.dim:
+            self.dim = len(items[0][1])
+            self.vectors = QuantizedMatrix.empty(self.dim)
+            self.centroids = np.zeros((0, self.dim), dtype=np.float32)
+
+        vectors = np.vstack([vector for _, vector, _, _ in items]).astype(np.float32)
+        start = len(self.ids)
+        for offset, (job_id, _, _, _) in enumerate(items):
+            self.ids.append(job_id)
+            self.position[job_id] = start + offset
+        self.vectors = self.vectors.append(vectors)
+        self.min_exp = np.concatenate([
+            self.min_exp, np.array([np.nan if exp is None else exp for _, _, exp, _ in items], dtype=np.float32)
+        ])
+        self.location_codes = np.concatenate([
+            self.location_codes, np.array([self._code_for(location) for _, _, _, location in items], dtype=np.int32)
+        ])
+        self.alive = np.concatenate([self.alive, np.ones(len(items), dtype=bool)])
+        self.list_of = np.concatenate([self.list_of, self._assign(vectors)])
+        self.dirty = True
+        self._maybe_retrain()
+
+    def remove(self, job_ids: Iterable[str]) -> int:
+        """Tombstones jobs; returns how many were in the index."""
+        positions = [self.position.pop(job_id) for job_id in job_ids if job_id in self.position]
+        if not positions:
+            return 0
+        self.alive[positions] = False
+        self.dirty = True
+        if len(self.ids) and 1 - len(self) / len(self.ids) > config.ANN_MAX_DELETED_FRACTION:
+            self._compact()
+        return len(positions)
+
+    def _compact(self):
+        keep = np.flatnonzero(self.alive)
+        self.ids = [self.ids[i] for i in keep]
+        self.position = {job_id: i for i, job_id in enumerate(self.ids)}
+        self.vectors = self.vectors.take(keep)
+        self.min_exp = self.min_exp[keep]
+        self.location_codes = self.location_codes[keep]
+        self.alive = self.alive[keep]
+        self.list_of = self.list_of[keep]
+        self.dirty = True
+
+    def _maybe_retrain(self):
+        size = len(self)
+        if size < config.ANN_MIN_TRAIN_SIZE:
+            if len(self.centroids):
+                self.centroids = np.zeros((0, self.dim), dtype=np.float32)
+                self.list_of[:] = 0
+                self.trained_size = 0
+            return
+        if self.trained_size and size < self.trained_size * config.ANN_RETRAIN_GROWTH:
+            return
+        self.train()
+
+    def train(self):
+        """(Re)builds the inverted lists from the current vectors."""
+        started = time.perf_counter()
+        self._compact()
+        nlist = max(1, int(math.sqrt(len(self.ids))))
+        rng = np.random.RandomState(0)
+        sample_size = min(len(self.ids), nlist * config.ANN_TRAIN_POINTS_PER_LIST)
+        sample = self.vectors.dequantize(np.sort(rng.choice(len(self.ids), sample_size, replace=False)))
+        self.centroids = _kmeans(sample, nlist, config.ANN_KMEANS_ITERATIONS)
+        self.list_of = np.concatenate([self._assign(block) for block in self.vectors.blocks()])
+        self.trained_size = len(self.ids)
+        self.dirty = True
+        logger.info(f"Trained vector index: {nlist} lists over {len(self.ids)} jobs "
+                    f"in {time.perf_counter() - started:.1f}s.")
+
+    def sync(self, db, batch_size: int = 5000):
+        """
+        Brings the index up to date with the canonical jobs' embeddings for this model.
+
+        New vectors are read incrementally by created_at. If the number of indexed jobs then
+        differs from the table (jobs removed by cleanup, or rows committed out of order), the
+        ids are diffed in full, which reads ids only.
+        """
+        base = (
+            db.query(JobEmbedding.job_id)
+            .join(Job, Job.job_id == JobEmbedding.job_id)
+            .filter(JobEmbedding.model == self.tag, Job.canonical_job_id.is_(None))
+        )
+        new_query = base
+        if self.synced_until is not None:
+            new_query = new_query.filter(JobEmbedding.created_at > self.synced_until)
+        self._add_from_db(db, [job_id for (job_id,) in new_query], batch_size)
+
+        expected = base.with_entities(func.count(JobEmbedding.job_id)).scalar() or 0
+        if expected != len(self):
+            stored = {job_id for (job_id,) in base}
+            removed = self.remove([job_id for job_id in list(self.position) if job_id not in stored])
+            missing = [job_id for job_id in stored if job_id not in self.position]
+            self._add_from_db(db, missing, batch_size)
+            logger.info(f"Vector index resynced: {removed} jobs removed, {len(missing)} added.")
+
+    def _add_from_db(self, db, job_ids: List[str], batch_size: int):
+        # Read in batches of ids, but add once: every add() copies the whole vector matrix.
+        items = []
+        newest = None
+        for start in range(0, len(job_ids), batch_size):
+            rows = (
+                db.query(JobEmbedding.job_id, JobEmbedding.vector, JobEmbedding.created_at,
+                         Job.min_exp_required, Job.location)
+                .join(Job, Job.job_id == JobEmbedding.job_id)
+                .filter(JobEmbedding.model == self.tag, JobEmbedding.job_id.in_(job_ids[start:start + batch_size]))
+                .all()
+            )
+            items.extend((job_id, from_blob(blob), min_exp, location) for job_id, blob, _, min_exp, location in rows)
+            for _, _, created_at, _, _ in rows:
+                if created_at and (newest is None or created_at > newest):
+                    newest = created_at
+        self.add(items)
+        if newest and (self.synced_until is None or newest > self.synced_until):
+            self.synced_until = newest
+            self.dirty = True
+
+    # --- Queries ---
+
+    def _filter_mask(self, max_experience: Optional[float], locations: Optional[Sequence[str]]) -> np.ndarray:
+        mask = self.alive.copy()
+        if max_experience is not None:
+            # Same semantics as SQL "min_exp_required <= max": unknown experience never passes.
+            with np.errstate(invalid="ignore"):
+                mask &= self.min_exp <= max_experience
+        if locations:
+            wanted = [loc.lower() for loc in locations]
+            # Substring match, like the ILIKE '%loc%' filter in run_job_matching.
+            matches = np.array([any(loc in value for loc in wanted) for value in self.location_values], dtype=bool)
+            mask &= matches[self.location_codes] if len(matches) else False
+        return mask
+
+    def search(self, query: np.ndarray, k: int, max_experience: Optional[float] = None,
+               locations: Optional[Sequence[str]] = None, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Top-k (job_id, cosine similarity) for a normalized query vector, best first."""
+        if not len(self.ids) or k <= 0:
+            return []
+        mask = self._filter_mask(max_experience, locations)
+        if len(self.centroids):
+            nprobe = nprobe or config.ANN_NPROBE
+            centroid_order = np.argsort(-(self.centroids @ query))
+            while True:
+                probed = np.zeros(len(self.centroids), dtype=bool)
+                probed[centroid_order[:nprobe]] = True
+                candidates = np.flatnonzero(mask & probed[self.list_of])
+                if len(candidates) >= k or nprobe >= len(self.centroids):
+                    break
+                nprobe *= 2
+        else:
+            candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+
+        scores = self.vectors.dot(query, candidates)
+        top = np.argpartition(-scores, k - 1)[:k] if len(candidates) > k else np.arange(len(candidates))
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[candidates[i]], float(scores[i])) for i in top]
+
+    def vector(self, job_id: str) -> Optional[np.ndarray]:
+        position = self.position.get(job_id)
+        return None if position is None else self.vectors.dequantize(position)
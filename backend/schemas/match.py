@@ -0,0 +1,23 @@
+# schemas/match.py
+from datetime import datetime
+from pydantic import BaseModel
+from typing import List, Optional
+
+class JobMatch(BaseModel):
+    """A job scored for a user, as returned by GET /users/{user_id}/matches."""
+    job_id: str
+    title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    job_url: Optional[str] = None
+    min_exp_required: Optional[int] = None
+    created_at: Optional[datetime] = None
+    fit: str
+    score: float
+    reasons: List[str]
+
+class UserMatches(BaseModel):
+    user_id: str
+    model: str              # tag of the model the scores come from
+    matches: List[JobMatch]  # best first
+    took_ms: float
@@ -0,0 +1,139 @@
+"""
+Embeds stored jobs that have no embedding for the configured model yet.
+
+Walks canonical jobs without a job_embeddings row for the current model tag in
+primary-key order, encodes each batch (compact description where there is one) with the shared encoder and stores the vectors.
+Re-running after a model change (new MODEL_NAME or MODEL_VERSION) embeds everything again
+under the new tag; vectors of the old model are left in place.
+
+With --workers N the batches are encoded by an EncodingPool of N processes, each with its
+own model copy, for backfills of millions of descriptions. Every stored batch is committed
+and the last job_id recorded in a checkpoint file per model tag
+(EMBEDDING_BACKFILL_CHECKPOINT_DIR), so an interrupted run resumes after that job instead
+of re-scanning from the start.
+
+Usage (from the repository root):
+    python -m backend.scripts.backfill_job_embeddings --batch-size 1000
+    python -m backend.scripts.backfill_job_embeddings --workers 8
+    python -m backend.scripts.backfill_job_embeddings --workers 8 --restart
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from backend.database.models import Job, JobEmbedding
+from backend.database.setup_db import SessionLocal
+from backend.matching_engine import config
+from backend.matching_engine.embeddings import JobEmbeddingStore
+from backend.matching_engine.encoding_pool import EncodingPool
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def checkpoint_path(tag: str) -> str:
+    return os.path.join(config.EMBEDDING_BACKFILL_CHECKPOINT_DIR, re.sub(r"[^A-Za-z0-9_.@+-]", "_", tag) + ".json")
+
+
+def read_checkpoint(tag: str) -> Optional[str]:
+    """The last job_id committed by an earlier run for this model tag, if any."""
+    try:
+        with open(checkpoint_path(tag)) as f:
+            return json.load(f)["last_job_id"]
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(tag: str, last_job_id: str, embedded: int):
+    path = checkpoint_path(tag)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"tag": tag, "last_job_id": last_job_id, "embedded": embedded,
+                   "updated_at": datetime.utcnow().isoformat()}, f)
+    os.replace(path + ".tmp", path)  # atomic, so a crash never leaves a torn checkpoint
+
+
+def _missing_batches(db: Session, tag: str, after_job_id: str,
+                     batch_size: int) -> Iterator[Tuple[Tuple[List[str], str], List[str]]]:
+    """
+    ((job_ids, last_job_id), texts) of canonical jobs without a vector for `tag`, in job_id
+    order, `batch_size` at a time. last_job_id is the last job read, including ones skipped
+    for an empty description, so the checkpoint moves past them too.
+    """
+    last_job_id = after_job_id
+    while True:
+        rows = (
+            db.query(Job.job_id, func.coalesce(Job.compact_description, Job.description))
+            .outerjoin(JobEmbedding, and_(JobEmbedding.job_id == Job.job_id, JobEmbedding.model == tag))
+            .filter(Job.job_id > last_job_id, Job.canonical_job_id.is_(None), JobEmbedding.job_id.is_(None))
+            .order_by(Job.job_id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return
+        last_job_id = rows[-1][0]
+        jobs = [(job_id, text) for job_id, text in rows if text and text.strip()]
+        yield ([job_id for job_id, _ in jobs], last_job_id), [text for _, text in jobs]
+
+
+def backfill_job_embeddings(db: Session, batch_size: Optional[int] = None, workers: Optional[int] = None,
+                            restart: bool = False) -> int:
+    """Embeds every canonical job missing a vector for the current model and returns how many were stored."""
+    started = time.monotonic()
+    batch_size = batch_size or config.ENCODING_POOL_SHARD_SIZE
+    embedded = 0
+    with EncodingPool(workers=workers) as pool:
+        store = JobEmbeddingStore(db, tag=pool.tag)
+        after_job_id = None if restart else read_checkpoint(store.tag)
+        if after_job_id:
+            logger.info(f"Resuming the {store.tag} backfill after job {after_job_id}.")
+
+        batches = _missing_batches(db, store.tag, after_job_id or "", batch_size)
+        for (job_ids, last_job_id), vectors in pool.encode_ordered(batches):
+            store.put(dict(zip(job_ids, vectors)))
+            db.commit()
+            embedded += len(job_ids)
+            write_checkpoint(store.tag, last_job_id, embedded)
+            logger.info(f"Embedded {embedded} jobs so far ({embedded / (time.monotonic() - started):.0f} jobs/sec).")
+
+    # Finished: the next run (e.g. after jobs with lower ids were loaded) scans from the start.
+    if os.path.exists(checkpoint_path(store.tag)):
+        os.remove(checkpoint_path(store.tag))
+    logger.info(f"Backfill finished: {embedded} jobs embedded with {store.tag} in {time.monotonic() - started:.1f}s.")
+    return embedded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed stored jobs for the configured model.")
+    parser.add_argument("--batch-size", type=int, default=config.ENCODING_POOL_SHARD_SIZE,
+                        help="Jobs read, encoded and stored per round trip.")
+    parser.add_argument("--workers", type=int, default=config.ENCODING_POOL_WORKERS,
+                        help="Encoding processes, each with its own model copy; 0 encodes in this process.")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan from the first job.")
+    args = parser.parse_args()
+
+    db_session = None
+    try:
+        db_session = SessionLocal()
+        backfill_job_embeddings(db_session, batch_size=args.batch_size, workers=args.workers, restart=args.restart)
+    except Exception as e:
+        logger.error(f"An error occurred during the backfill: {e}", exc_info=True)
+        if db_session:
+            db_session.rollback()
+    finally:
+        if db_session:
+            db_session.close()
@@ -0,0 +1,87 @@
+"""
+Recomputes enrichment fields (currently min_exp_required) for jobs already in the database.
+
+Walks the jobs table in primary-key order, runs the enrichment extractors on a process
+pool and writes each batch back with one bulk UPDATE. Stored jobs are never deleted here:
+the experience filter is not applied, only the extracted fields are refreshed.
+
+Usage (from the repository root):
+    python -m backend.scripts.backfill_job_enrichment --batch-size 20000 --workers 8
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.data_engine.pipeline.enricher import enrich_jobs, extract_min_experience
+from backend.database.models import Job
+from backend.database.setup_db import SessionLocal
+from backend.schemas.job import JobPosting
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+BACKFILL_EXTRACTORS = (extract_min_experience,)
+
+
+def backfill_job_enrichment(db: Session, batch_size: int = 20000, max_workers: Optional[int] = None) -> int:
+    """Re-enriches every stored job and returns the number of rows updated."""
+    started = time.monotonic()
+    updated = 0
+    last_job_id = ""
+    while True:
+        rows = (
+            db.query(Job.job_id, Job.description)
+            .filter(Job.job_id > last_job_id)
+            .order_by(Job.job_id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_job_id = rows[-1][0]
+
+        # Rows come from our own table, so validation is skipped; only the fields the
+        # extractors read are populated.
+        postings = [
+            JobPosting.model_construct(id=job_id, description=description or "", min_exp_required=None)
+            for job_id, description in rows
+        ]
+        enriched = enrich_jobs(postings, extractors=BACKFILL_EXTRACTORS, max_workers=max_workers)
+        db.execute(
+            update(Job),
+            [{"job_id": posting.id, "min_exp_required": posting.min_exp_required} for posting in enriched],
+        )
+        db.commit()
+        updated += len(enriched)
+        logger.info(f"Backfilled {updated} jobs so far ({updated / (time.monotonic() - started):.0f} jobs/sec).")
+
+    logger.info(f"Backfill finished: {updated} jobs updated in {time.monotonic() - started:.1f}s.")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute enrichment fields for stored jobs.")
+    parser.add_argument("--batch-size", type=int, default=20000, help="Jobs read and updated per round trip.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: every core).")
+    args = parser.parse_args()
+
+    db_session = None
+    try:
+        db_session = SessionLocal()
+        backfill_job_enrichment(db_session, batch_size=args.batch_size, max_workers=args.workers)
+    except Exception as e:
+        logger.error(f"An error occurred during the backfill: {e}", exc_info=True)
+        if db_session:
+            db_session.rollback()
+    finally:
+        if db_session:
+            db_session.close()
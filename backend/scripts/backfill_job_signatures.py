@@ -0,0 +1,82 @@
+"""
+Builds the near-duplicate index for jobs stored before it existed.
+
+Walks jobs without a MinHash signature in primary-key order, links each batch against the
+index built so far (so earlier jobs become canonical) and writes canonical_job_id back with
+one bulk UPDATE per batch. Jobs that already have a signature are left untouched.
+
+Usage (from the repository root):
+    python -m backend.scripts.backfill_job_signatures --batch-size 5000
+"""
+import argparse
+import logging
+import time
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.data_engine.pipeline.deduplicator import NearDuplicateIndex
+from backend.database.models import Job, JobSignature
+from backend.database.setup_db import SessionLocal
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def backfill_job_signatures(db: Session, batch_size: int = 5000) -> int:
+    """Indexes every job missing a signature and returns how many were linked as duplicates."""
+    started = time.monotonic()
+    dedup_index = NearDuplicateIndex(db)
+    indexed = linked = 0
+    last_job_id = ""
+    while True:
+        rows = (
+            db.query(Job.job_id, Job.title, Job.company, Job.description)
+            .outerjoin(JobSignature, JobSignature.job_id == Job.job_id)
+            .filter(Job.job_id > last_job_id, JobSignature.job_id.is_(None))
+            .order_by(Job.job_id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_job_id = rows[-1][0]
+
+        batch = [row._asdict() for row in rows]
+        linked += dedup_index.link(batch)
+        duplicates = [{"job_id": row["job_id"], "canonical_job_id": row["canonical_job_id"]}
+                      for row in batch if row.get("canonical_job_id")]
+        if duplicates:
+            db.execute(update(Job), duplicates)
+        dedup_index.save(row["job_id"] for row in batch)
+        db.commit()
+        indexed += len(batch)
+        logger.info(f"Indexed {indexed} jobs so far, {linked} near-duplicates "
+                    f"({indexed / (time.monotonic() - started):.0f} jobs/sec).")
+
+    logger.info(f"Backfill finished: {indexed} jobs indexed, {linked} linked as near-duplicates "
+                f"in {time.monotonic() - started:.1f}s.")
+    return linked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the near-duplicate index for stored jobs.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Jobs read and indexed per round trip.")
+    args = parser.parse_args()
+
+    db_session = None
+    try:
+        db_session = SessionLocal()
+        backfill_job_signatures(db_session, batch_size=args.batch_size)
+    except Exception as e:
+        logger.error(f"An error occurred during the backfill: {e}", exc_info=True)
+        if db_session:
+            db_session.rollback()
+    finally:
+        if db_session:
+            db_session.close()
@@ -0,0 +1,200 @@
+"""
+Throughput benchmark for the experience extractor.
+
+Builds a synthetic corpus from the sample job description shipped with the extractor,
+checks that the compiled extractor agrees with the original line-by-line implementation
+on every document, and reports documents/sec plus p50/p99 latency for both.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_experience_extractor --docs 20000
+"""
+import argparse
+import logging
+import random
+import re
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from backend.data_engine.pipeline.experience_extractor import (
+    BLACKLIST_KEYWORDS, FRESHER_TERMS, NUMBER_WORDS, OPTIONAL_KEYWORDS, SAMPLE_JOB_DESCRIPTION,
+    ExperienceExtractor,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+REQUIREMENT_LINES = [
+    "* {n}+ years of experience building distributed systems.",
+    "* {n}-{m} years of professional software development experience",
+    "* Minimum {n} to {m} yrs in backend engineering.",
+    "* Between {w} and {w2} years of hands-on experience with Java or Python.",
+    "* {w} years of experience with cloud platforms (AWS, GCP or Azure).",
+    "* {months}+ months of internship or industry experience",
+    "* Experience with Kubernetes is a plus.",
+    "* {n}+ years experience preferred, not required.",
+    "* Up to {n} years of experience in a similar role.",
+    "* Open to freshers and recent graduates.",
+    "* Company founded {n} years ago with a strong track record.",
+    "* Bachelor's degree in Computer Science or equivalent experience.",
+]
+WORDS = [w for w in NUMBER_WORDS if w not in ("a", "half", "quarter")]
+
+
+def legacy_extract_experience(description: str) -> int:
+    """
+    Line-by-line implementation the compiled extractor replaced, kept as the parity reference.
+    Returns:
+        int: Minimum years (0 for fresher, -1 for error/uncertain).
+    """
+    try:
+        if not description:
+            return 0
+
+        desc = description.lower()
+
+        # --- 1. Check for fresher roles ---
+        for term in FRESHER_TERMS:
+            if term in desc:
+                return 0
+
+        lines = desc.split("\n")
+        candidates: List[float] = []
+
+        # --- 2. Parse each line ---
+        for line in lines:
+            if any(k in line for k in OPTIONAL_KEYWORDS):
+                continue
+            if any(k in line for k in BLACKLIST_KEYWORDS):
+                continue
+
+            clean_line = re.sub(r'[^a-z0-9\s.\-]', ' ', line)
+            clean_line = re.sub(r'\s+', ' ', clean_line).strip()
+
+            # --- 2a. Ranges like "2-4 years" / "2 to 4 years" ---
+            range_pattern = r'(\d+(?:\.\d+)?)\s*(?:-|to)\s*(\d+(?:\.\d+)?)\s*(?:years?|yrs?|y|exp)'
+            for match in re.findall(range_pattern, clean_line):
+                low, high = match
+                try:
+                    low, high = float(low), float(high)
+                    candidates.append(low)  # take minimum
+                except ValueError:
+                    continue
+
+            # --- 2b. Word ranges: "between three and five years" ---
+            word_range_pattern = (
+                r'between\s+(' + '|'.join(NUMBER_WORDS.keys()) + r')\s+(?:and|to)\s+('
+                + '|'.join(NUMBER_WORDS.keys()) + r')\s+years?'
+            )
+            for match in re.findall(word_range_pattern, clean_line):
+                low, high = match
+                if low in NUMBER_WORDS:
+                    candidates.append(float(NUMBER_WORDS[low]))
+
+            # --- 2c. Numeric years: "5+ years", "3 years exp" ---
+            numeric_year_pattern = r'(\d+(?:\.\d+)?)\s*\+?\s*(?:years?|yrs?|y|exp)'
+            for match in re.findall(numeric_year_pattern, clean_line):
+                try:
+                    candidates.append(float(match))
+                except ValueError:
+                    continue
+
+            # --- 2d. Word-based years: "five years", "dozen years" ---
+            word_year_pattern = r'\b(' + '|'.join(NUMBER_WORDS.keys()) + r')\b\s+(?:years?|yrs?|exp)'
+            for match in re.findall(word_year_pattern, clean_line):
+                if match in NUMBER_WORDS:
+                    candidates.append(float(NUMBER_WORDS[match]))
+
+            # --- 2e. Months: "18 months", "6+ months" ---
+            month_pattern = r'(\d+(?:\.\d+)?)\s*\+?\s*months?'
+            for match in re.findall(month_pattern, clean_line):
+                try:
+                    years = float(match) / 12
+                    candidates.append(round(years, 1))
+                except ValueError:
+                    continue
+
+        # --- 3. Post-processing ---
+        if not candidates:
+            return 0
+
+        if 0 in candidates:
+            return 0
+
+        # Special handling: "max X years" or "up to X years" → treat as fresher
+        if re.search(r'\b(up to|max)\s+\d+\s+years?', desc):
+            return 0
+
+        # Normally take the highest *minimum requirement*
+        result = max(candidates)
+
+        return int(result + 0.5)  # round to nearest int
+
+    except Exception:
+        return -1
+
+
+def build_corpus(size: int, seed: int) -> List[str]:
+    """Generates `size` job descriptions by reshuffling the sample JD and varying its requirements."""
+    rng = random.Random(seed)
+    paragraphs = [p for p in re.split(r"\n\s*\n", SAMPLE_JOB_DESCRIPTION) if p.strip()]
+    corpus = []
+    for _ in range(size):
+        body = rng.sample(paragraphs, k=rng.randint(len(paragraphs) // 2, len(paragraphs)))
+        requirements = [
+            rng.choice(REQUIREMENT_LINES).format(
+                n=rng.randint(0, 12), m=rng.randint(2, 15), months=rng.choice([6, 12, 18, 24]),
+                w=rng.choice(WORDS), w2=rng.choice(WORDS),
+            )
+            for _ in range(rng.randint(0, 6))
+        ]
+        insert_at = rng.randint(0, len(body))
+        body[insert_at:insert_at] = ["\n".join(requirements)]
+        corpus.append("\n\n".join(body))
+    return corpus
+
+
+def run(name: str, extract: Callable[[str], int], corpus: List[str]) -> Dict:
+    latencies = []
+    results = []
+    started = time.perf_counter()
+    for doc in corpus:
+        t0 = time.perf_counter()
+        results.append(extract(doc))
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    stats = {
+        "name": name,
+        "docs_per_sec": len(corpus) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "results": results,
+    }
+    logger.info(f"{name:>8}: {stats['docs_per_sec']:,.0f} docs/sec, "
+                f"p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000, help="Number of synthetic job descriptions.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the corpus.")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.docs, args.seed)
+    avg_len = sum(len(doc) for doc in corpus) / len(corpus)
+    logger.info(f"Built corpus of {len(corpus)} documents (avg {avg_len:,.0f} chars).")
+
+    legacy = run("legacy", legacy_extract_experience, corpus)
+    compiled = run("compiled", ExperienceExtractor().extract, corpus)
+
+    mismatches = sum(a != b for a, b in zip(legacy["results"], compiled["results"]))
+    logger.info(f"Speedup: {compiled['docs_per_sec'] / legacy['docs_per_sec']:.2f}x, "
+                f"mismatches: {mismatches}/{len(corpus)}")
+    if mismatches:
+        raise SystemExit(1)
@@ -0,0 +1,108 @@
+"""
+Benchmark for the inference backends of the semantic matcher.
+
+Encodes a fixed corpus of job-description-like texts with the reference PyTorch backend
+and with each other backend, and reports load time, sentences/sec and the drift from the
+reference: cosine between each text's two embeddings, the largest change in any query x
+corpus similarity score, and how much of each query's top-10 survives.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_inference_backends --backends torch onnx onnx-int8 --threads 4
+    python -m backend.scripts.benchmark_inference_backends --from-db --texts 2000
+"""
+import argparse
+import logging
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from backend.data_engine.pipeline.compactor import split_paragraphs
+from backend.data_engine.pipeline.experience_extractor import SAMPLE_JOB_DESCRIPTION
+from backend.matching_engine import config
+from backend.matching_engine.embeddings import TextEncoder
+from backend.matching_engine.inference_backends import BACKENDS, TORCH
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+_TITLES = ["Software Engineer", "Backend Developer", "Data Engineer", "SDE II", "ML Engineer", "QA Analyst"]
+
+
+def build_corpus(texts: int, seed: int) -> List[str]:
+    """Deterministic texts assembled from the lines of the sample job description."""
+    rng = random.Random(seed)
+    lines = [line.strip(" -*") for p in split_paragraphs(SAMPLE_JOB_DESCRIPTION) for line in p.splitlines()]
+    lines = [line for line in lines if len(line.split()) >= 4]
+    return [
+        f"{rng.choice(_TITLES)}\n" + "\n".join(rng.sample(lines, min(len(lines), rng.randint(3, 12))))
+        for _ in range(texts)
+    ]
+
+
+def load_stored_descriptions(texts: int) -> List[str]:
+    from backend.database.models import Job
+    from backend.database.setup_db import SessionLocal
+    from sqlalchemy import func
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(func.coalesce(Job.compact_description, Job.description))
+            .filter(Job.canonical_job_id.is_(None), Job.description.isnot(None))
+            .order_by(Job.job_id)
+            .limit(texts)
+            .all()
+        )
+    finally:
+        db.close()
+    return [text for (text,) in rows]
+
+
+def run_backend(backend: str, corpus: List[str], threads: int, batch_size: int):
+    started = time.perf_counter()
+    encoder = TextEncoder(backend=backend, threads=threads, batch_size=batch_size)
+    load_seconds = time.perf_counter() - started
+    encoder.encode(corpus[:batch_size])  # warm-up
+    started = time.perf_counter()
+    vectors = encoder.encode(corpus)
+    return vectors, load_seconds, len(corpus) / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=sorted(BACKENDS), choices=sorted(BACKENDS))
+    parser.add_argument("--texts", type=int, default=1000, help="Texts in the corpus.")
+    parser.add_argument("--queries", type=int, default=50, help="Corpus texts also used as queries for score drift.")
+    parser.add_argument("--threads", type=int, default=config.MODEL_THREADS or 0, help="Intra-op threads, 0 for the default.")
+    parser.add_argument("--batch-size", type=int, default=config.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--from-db", action="store_true", help="Use stored job descriptions as the corpus.")
+    args = parser.parse_args()
+
+    corpus = load_stored_descriptions(args.texts) if args.from_db else build_corpus(args.texts, args.seed)
+    logger.info(f"Corpus of {len(corpus)} texts, {args.threads or 'default'} threads, batch size {args.batch_size}.")
+
+    reference, load_seconds, rate = run_backend(TORCH, corpus, args.threads or None, args.batch_size)
+    logger.info(f"{TORCH:>10}: loaded in {load_seconds:.1f}s, {rate:,.1f} sentences/sec (reference)")
+    reference_scores = reference[:args.queries] @ reference.T
+    reference_top = np.argsort(-reference_scores, axis=1)[:, :10]
+
+    for backend in args.backends:
+        if backend == TORCH:
+            continue
+        vectors, load_seconds, backend_rate = run_backend(backend, corpus, args.threads or None, args.batch_size)
+        cosine = np.sum(vectors * reference, axis=1)
+        scores = vectors[:args.queries] @ vectors.T
+        top = np.argsort(-scores, axis=1)[:, :10]
+        overlap = np.mean([len(np.intersect1d(a, b)) / 10 for a, b in zip(top, reference_top)])
+        logger.info(
+            f"{backend:>10}: loaded in {load_seconds:.1f}s, {backend_rate:,.1f} sentences/sec "
+            f"({backend_rate / rate:.2f}x), cosine to reference mean {cosine.mean():.4f} min {cosine.min():.4f}, "
+            f"max score drift {np.abs(scores - reference_scores).max():.4f}, top-10 overlap {overlap:.3f}"
+        )
@@ -0,0 +1,102 @@
+"""
+Benchmark for the quantized embedding matrix used by the vector index.
+
+Builds clustered, normalized vectors shaped like job embeddings (or reads the stored ones
+with --from-db), stores them as float32, float16 and int8, and for each reports the memory
+footprint (also extrapolated to 1M jobs), the time to score every row against one query,
+and recall@k of the quantized scores against full-precision scores. Each matrix is also
+written to disk and scored again through a read-only memory map.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_quantized_matrix --rows 200000 --dim 768 --k 200
+    python -m backend.scripts.benchmark_quantized_matrix --from-db
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from backend.matching_engine.quantized_matrix import DTYPES, QuantizedMatrix
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def build_vectors(rows: int, dim: int, seed: int, clusters: int = 256) -> np.ndarray:
+    """Normalized vectors around a few hundred topics, so near neighbours are close like real postings."""
+    rng = np.random.RandomState(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.randint(clusters, size=rows)] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_stored_vectors() -> np.ndarray:
+    """Every stored job vector of the configured model."""
+    from backend.database.models import JobEmbedding
+    from backend.database.setup_db import SessionLocal
+    from backend.matching_engine.embeddings import from_blob, model_tag
+
+    db = SessionLocal()
+    try:
+        rows = db.query(JobEmbedding.vector).filter(JobEmbedding.model == model_tag()).all()
+    finally:
+        db.close()
+    if not rows:
+        raise SystemExit(f"No stored embeddings for {model_tag()}.")
+    return np.vstack([from_blob(blob) for (blob,) in rows])
+
+
+def time_scoring(matrix: QuantizedMatrix, queries: np.ndarray) -> float:
+    """Mean milliseconds to score every row against one query."""
+    started = time.perf_counter()
+    for query in queries:
+        matrix.dot(query)
+    return (time.perf_counter() - started) * 1000 / len(queries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="Synthetic job vectors.")
+    parser.add_argument("--dim", type=int, default=768, help="Synthetic vector dimension.")
+    parser.add_argument("--queries", type=int, default=20, help="Queries for timing and recall.")
+    parser.add_argument("--k", type=int, default=200, help="Top-k for the recall check.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--from-db", action="store_true", help="Use the stored job embeddings instead.")
+    parser.add_argument("--min-recall", type=float, default=0.95, help="Exit non-zero below this recall.")
+    args = parser.parse_args()
+
+    vectors = load_stored_vectors() if args.from_db else build_vectors(args.rows, args.dim, args.seed)
+    rng = np.random.RandomState(args.seed + 1)
+    # Queries near real rows, like a resume that resembles some of the postings.
+    queries = vectors[rng.choice(len(vectors), args.queries, replace=False)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    logger.info(f"{len(vectors)} vectors of dim {vectors.shape[1]}, {len(queries)} queries, k={args.k}.")
+
+    worst_recall = 1.0
+    with tempfile.TemporaryDirectory() as directory:
+        for dtype in DTYPES:
+            matrix = QuantizedMatrix.quantize(vectors, dtype)
+            recall = matrix.recall_at_k(vectors, queries, args.k)
+            path = os.path.join(directory, f"{dtype}.vectors")
+            matrix.save(path)
+            mapped = QuantizedMatrix.load(path)
+            per_million = matrix.nbytes / len(matrix) * 1_000_000 / 2 ** 20
+            logger.info(
+                f"{dtype:>8}: {matrix.nbytes / 2 ** 20:,.1f} MiB ({per_million:,.0f} MiB per 1M jobs), "
+                f"{time_scoring(matrix, queries):.1f} ms/query in memory, "
+                f"{time_scoring(mapped, queries):.1f} ms/query mapped, recall@{args.k} {recall:.4f}"
+            )
+            worst_recall = min(worst_recall, recall)
+            del mapped
+
+    if worst_recall < args.min_recall:
+        logger.error(f"Recall {worst_recall:.4f} is below {args.min_recall}.")
+        raise SystemExit(1)
@@ -0,0 +1,112 @@
+"""
+Benchmark for the DataFrame -> JobPosting transform.
+
+Builds a scrape-shaped DataFrame (strings, missing values, date objects), runs the original
+row-by-row transform and the columnar one, checks that both produce identical postings
+and reports rows/sec and the speedup.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_transformer --rows 10000
+"""
+import argparse
+import datetime
+import logging
+import random
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from backend.data_engine.helper.constants import JobFields
+from backend.data_engine.helper.util import generate_id, safe_str
+from backend.data_engine.pipeline.experience_extractor import SAMPLE_JOB_DESCRIPTION
+from backend.data_engine.pipeline.transformer import transform_jobs
+from backend.schemas.job import JobPosting
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def legacy_transform_jobs(df: pd.DataFrame, common_location: str) -> List[JobPosting]:
+    """Row-by-row implementation the columnar transform replaced, kept as the parity reference."""
+    job_postings = []
+    for _, row in df.iterrows():
+        try:
+            job_id = generate_id(safe_str(row.get(JobFields.JOB_URL)) + safe_str(row.get(JobFields.TITLE)))
+
+            job_posting = JobPosting(
+                id=safe_str(row.get(JobFields.ID)),
+                site=safe_str(row.get(JobFields.SITE)),
+                job_url=safe_str(row.get(JobFields.JOB_URL)),
+                job_url_direct=safe_str(row.get(JobFields.JOB_URL_DIRECT)),
+                title=safe_str(row.get(JobFields.TITLE)),
+                company=safe_str(row.get(JobFields.COMPANY)),
+                location=common_location,  # Overwrite with common location
+                date_posted=safe_str(row.get(JobFields.DATE_POSTED)),
+                job_level=safe_str(row.get("job_level")),
+                description=safe_str(row.get(JobFields.DESCRIPTION)),
+                company_industry=safe_str(row.get(JobFields.COMPANY_INDUSTRY)),
+                company_url=safe_str(row.get(JobFields.COMPANY_URL)),
+                min_exp_required=None # To be filled later
+            )
+            job_postings.append(job_posting)
+        except Exception as e:
+            logger.error(f"Error transforming a job listing: {e}", exc_info=True)
+    return job_postings
+
+
+def build_frame(rows: int, seed: int) -> pd.DataFrame:
+    """A DataFrame shaped like jobspy output, with the usual gaps."""
+    rng = random.Random(seed)
+    today = datetime.date(2025, 9, 14)
+
+    def maybe(value, missing=0.2):
+        return value if rng.random() > missing else rng.choice([None, np.nan])
+
+    return pd.DataFrame({
+        "id": [f"in-{rng.getrandbits(48):x}" for _ in range(rows)],
+        "site": ["indeed"] * rows,
+        "job_url": [f"https://www.indeed.com/viewjob?jk={i:x}" for i in range(rows)],
+        "job_url_direct": [maybe(f"https://careers.example.com/{i}", 0.4) for i in range(rows)],
+        "title": [rng.choice(["Software Engineer", "Backend Developer", "SDE II"]) for _ in range(rows)],
+        "company": [maybe(rng.choice(["Amazon", "Nomura", "Acme"]), 0.05) for _ in range(rows)],
+        "location": [rng.choice(["Hyderabad, TS, IN", "Mumbai, MH, IN"]) for _ in range(rows)],
+        "date_posted": [maybe(today - datetime.timedelta(days=rng.randint(0, 3))) for _ in range(rows)],
+        "job_level": [maybe("mid-senior level", 0.7) for _ in range(rows)],
+        "description": [maybe(SAMPLE_JOB_DESCRIPTION, 0.02) for _ in range(rows)],
+        "company_industry": [maybe("Technology", 0.5) for _ in range(rows)],
+        "company_url": [maybe("https://www.indeed.com/cmp/acme", 0.3) for _ in range(rows)],
+        "min_amount": [maybe(float(rng.randint(5, 40)) * 1e5, 0.6) for _ in range(rows)],
+    })
+
+
+def timed(name: str, transform, df: pd.DataFrame) -> (List[JobPosting], float):
+    started = time.perf_counter()
+    postings = transform(df, "Hyderabad")
+    elapsed = time.perf_counter() - started
+    logger.info(f"{name:>8}: {len(df) / elapsed:,.0f} rows/sec ({elapsed:.3f}s)")
+    return postings, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows in the synthetic DataFrame.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the DataFrame.")
+    args = parser.parse_args()
+
+    logging.getLogger("backend.data_engine.pipeline.transformer").setLevel(logging.WARNING)
+    df = build_frame(args.rows, args.seed)
+
+    legacy, legacy_time = timed("legacy", legacy_transform_jobs, df)
+    columnar, columnar_time = timed("columnar", transform_jobs, df)
+
+    mismatches = sum(a.model_dump() != b.model_dump() for a, b in zip(legacy, columnar))
+    mismatches += abs(len(legacy) - len(columnar))
+    logger.info(f"Speedup: {legacy_time / columnar_time:.1f}x, mismatches: {mismatches}/{len(df)}")
+    if mismatches:
+        raise SystemExit(1)
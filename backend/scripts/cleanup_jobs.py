@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from backend.database.models import Job, UserJobMatch
 from backend.database.setup_db import SessionLocal
+from backend.matching_engine.vector_index import JobVectorIndex
 
 # Configure logging
 logging.basicConfig(
@@ -52,6 +53,12 @@ def cleanup_old_jobs(db: Session, days_old: int):
 
     # 5. Commit the transaction
     db.commit()
+
+    # 6. Drop the deleted jobs from the persisted vector index
+    vector_index = JobVectorIndex.load()
+    if vector_index is not None and vector_index.remove(old_job_ids):
+        vector_index.save()
+        logger.info(f"Removed deleted jobs from the vector index; {len(vector_index)} jobs remain indexed.")
     logger.info("--- Destructive cleanup process finished successfully. ---")
 
 
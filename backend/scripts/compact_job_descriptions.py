@@ -0,0 +1,104 @@
+"""
+Computes compact descriptions (boilerplate stripped) for stored jobs.
+
+With --relearn, paragraph frequencies are first rebuilt from every canonical job, which
+is needed once for jobs loaded before compaction existed. Each canonical job's
+compact_description is then recomputed; jobs whose compact text changed lose their stored
+embeddings, so the embedding backfill (or the next match run) re-encodes them.
+
+Usage (from the repository root):
+    python -m backend.scripts.compact_job_descriptions --relearn --batch-size 1000
+"""
+import argparse
+import logging
+import time
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.data_engine.pipeline.compactor import CompactionReport, DescriptionCompactor
+from backend.database.models import Job, JobEmbedding, ParagraphFrequency
+from backend.database.setup_db import SessionLocal
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+logger = logging.getLogger(__name__)
+
+
+def _canonical_batches(db: Session, batch_size: int):
+    """Yields (job_id, description, compact_description) rows of canonical jobs in primary-key order."""
+    last_job_id = ""
+    while True:
+        rows = (
+            db.query(Job.job_id, Job.description, Job.compact_description)
+            .filter(Job.job_id > last_job_id, Job.canonical_job_id.is_(None))
+            .order_by(Job.job_id)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return
+        last_job_id = rows[-1][0]
+        yield rows
+
+
+def compact_job_descriptions(db: Session, batch_size: int = 1000, relearn: bool = False) -> CompactionReport:
+    """Recomputes compact_description for every canonical job and returns the word-count report."""
+    started = time.monotonic()
+    compactor = DescriptionCompactor(db)
+
+    if relearn:
+        db.query(ParagraphFrequency).delete(synchronize_session=False)
+        learned = 0
+        for rows in _canonical_batches(db, batch_size):
+            compactor.learn(description for _, description, _ in rows)
+            learned += len(rows)
+        db.commit()
+        logger.info(f"Rebuilt paragraph frequencies from {learned} canonical jobs.")
+
+    report = CompactionReport()
+    changed = 0
+    for rows in _canonical_batches(db, batch_size):
+        descriptions = [description for _, description, _ in rows]
+        compacted, _ = compactor.compact_batch(descriptions, learn=False, report=report)
+        updates = [
+            {"job_id": job_id, "compact_description": text}
+            for (job_id, _, current), text in zip(rows, compacted) if text != current
+        ]
+        if updates:
+            db.execute(update(Job), updates)
+            db.query(JobEmbedding).filter(
+                JobEmbedding.job_id.in_([u["job_id"] for u in updates])
+            ).delete(synchronize_session=False)
+            changed += len(updates)
+        db.commit()
+        logger.info(f"Processed {report.documents} jobs so far, {changed} changed.")
+
+    logger.info(
+        f"Compaction finished in {time.monotonic() - started:.1f}s: {report.summary()}; "
+        f"{changed} jobs need re-embedding (run backfill_job_embeddings)."
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strip boilerplate from stored job descriptions.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Jobs read and updated per round trip.")
+    parser.add_argument("--relearn", action="store_true", help="Rebuild paragraph frequencies from all jobs first.")
+    args = parser.parse_args()
+
+    db_session = None
+    try:
+        db_session = SessionLocal()
+        compact_job_descriptions(db_session, batch_size=args.batch_size, relearn=args.relearn)
+    except Exception as e:
+        logger.error(f"An error occurred during compaction: {e}", exc_info=True)
+        if db_session:
+            db_session.rollback()
+    finally:
+        if db_session:
+            db_session.close()
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from backend.matching_engine import config
+from backend.matching_engine.resume_sections import pool_section_scores, resume_sections
+from backend.matching_engine.semanticMatcher import LLMMatcher
+from backend.workflows.batch_matching import _load_users
+
+HEADER = {"full_name": "A", "location": "Pune", "phone": "", "email": "", "linkedin": "", "github": "", "portfolio": ""}
+EMPTY_SKILLS = {"programming_languages": [], "frameworks_tools": [], "other": []}
+
+
+class _Encoder:
+    """Stands in for TextEncoder: one fixed unit vector per text, and counts calls."""
+
+    tag = "test@1"
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, batch_size=None):
+        self.calls += 1
+        vectors = np.ones((len(texts), 4), dtype=np.float32)
+        return vectors / 2.0
+
+
+def _matcher() -> LLMMatcher:
+    matcher = LLMMatcher.__new__(LLMMatcher)
+    matcher.encoder = _Encoder()
+    matcher.model = None
+    matcher.resume_cache = None
+    return matcher
+
+
+def _resume(skills=EMPTY_SKILLS, summary=None) -> dict:
+    return {"header": HEADER, "summary": summary, "education": [], "experience": [], "projects": [],
+            "skills": skills, "certifications": []}
+
+
+@pytest.fixture
+def section_mode(monkeypatch):
+    monkeypatch.setattr(config, "RESUME_EMBEDDING_MODE", "sections")
+
+
+def test_empty_skills_block_is_not_a_section():
+    resume = SimpleNamespace(summary=None, experience=[], projects=[], skills=SimpleNamespace(**EMPTY_SKILLS))
+    assert resume_sections(resume) == []
+
+
+@pytest.mark.parametrize("pooling", ["max", "mean", "max-mean"])
+def test_pooling_rejects_a_resume_without_sections(pooling):
+    scores = np.zeros((3, 2), dtype=np.float32)
+    with pytest.raises(ValueError):
+        pool_section_scores(scores, np.array([0, 2, 2]), pooling)
+
+
+def test_pooling_per_resume():
+    scores = np.array([[0.1, 0.5, 0.3]], dtype=np.float32)
+    offsets = np.array([0, 2])
+    np.testing.assert_allclose(pool_section_scores(scores, offsets, "max"), [[0.5, 0.3]])
+    np.testing.assert_allclose(pool_section_scores(scores, offsets, "mean"), [[0.3, 0.3]])
+    np.testing.assert_allclose(pool_section_scores(scores, offsets, "max-mean", 0.5), [[0.4, 0.3]])
+
+
+def test_resume_without_sections_is_not_scored(section_mode):
+    matcher = _matcher()
+    user = SimpleNamespace(user_id="u1", resume=SimpleNamespace(
+        summary=None, experience=[], projects=[], skills=SimpleNamespace(**EMPTY_SKILLS)))
+    job = SimpleNamespace(description="Python developer", compact_description=None)
+
+    assert matcher.embed_resume_matrix(user) is None
+    assert matcher.match(job, user, job_embedding=np.full(4, 0.5, dtype=np.float32))["fit"] == "No"
+    results = matcher.match_batch([job], user, job_embeddings=[np.full(4, 0.5, dtype=np.float32)])
+    assert results == [{"fit": "No", "reasons": ["Insufficient data for matching."], "score": 0.0}]
+    assert matcher.encoder.calls == 0
+
+
+def test_batch_skips_users_without_sections(section_mode):
+    preferences = {"max_experience": 3, "preferred_locations": ["Pune"]}
+    users = [
+        SimpleNamespace(user_id="with-summary", resume=_resume(summary="Backend engineer"), preferences=preferences,
+                        linkedin=None, user_automation_settings=None),
+        SimpleNamespace(user_id="empty", resume=_resume(), preferences=preferences,
+                        linkedin=None, user_automation_settings=None),
+    ]
+    watermarks = SimpleNamespace(since=lambda user_id, profile_hash: None)
+
+    batch = _load_users(users, _matcher(), watermarks, "test@1")
+
+    assert batch.user_ids == ["with-summary"]
+    assert batch.vectors.shape == (1, 4)
+    assert batch.offsets.tolist() == [0]
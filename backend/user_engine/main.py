@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 
 from backend.database.models import User
 from backend.database.setup_db import SessionLocal
+from backend.matching_engine.embeddings import invalidate_resume_embeddings
 from backend.schemas.user import *
 from backend.user_engine.interfaces import UserEngine
 
@@ -20,6 +21,8 @@ class UserEngineImpl(UserEngine):
             user_automation_settings=user_profile.user_automation_settings.model_dump_json() if user_profile.user_automation_settings else None,
         )
         self.db_session.add(user_data)
+        # A new or changed resume must not be matched with a previously cached embedding
+        invalidate_resume_embeddings(self.db_session, user_profile.user_id)
         self.db_session.commit()
         self.db_session.refresh(user_data)
         return user_data
@@ -0,0 +1,331 @@
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.database import models
+from backend.database.match_writer import match_row, write_matches
+from backend.matching_engine import config as matching_config
+from backend.matching_engine.embeddings import JobEmbeddingStore, ResumeEmbeddingCache
+from backend.matching_engine.match_watermarks import MatchWatermarks, matching_profile_hash
+from backend.matching_engine.prefilter import PreferencePrefilter
+from backend.matching_engine.semanticMatcher import LLMMatcher
+from backend.workflows.matching import build_user_profile
+
+logger = logging.getLogger(__name__)
+
+class _UserBatch:
+    """Resume vectors and match predicates of the users being matched, column-aligned."""
+
+    def __init__(self, user_ids: List[str], vectors: np.ndarray, max_experience: np.ndarray,
+                 locations: List[List[str]], since: np.ndarray, profile_hashes: List[str],
+                 preferences: List[Dict], offsets: np.ndarray):
+        self.user_ids = user_ids
+        self.vectors = vectors                # resume matrix rows of all users x dim (one row each unless sectioned)
+        self.offsets = offsets                # first row in `vectors` of each user
+        self.max_experience = max_experience  # float32, per user
+        self.locations = locations            # lower-cased preferred locations, per user
+        self.since = since                    # datetime64, per user; NaT for a full rescore
+        self.profile_hashes = profile_hashes
+        self.preferences = preferences
+
+    def subset(self, columns: Sequence[int]) -> "_UserBatch":
+        """The users at `columns`, in that order."""
+        ends = np.append(self.offsets[1:], len(self.vectors))
+        rows = np.concatenate([np.arange(self.offsets[c], ends[c]) for c in columns])
+        counts = [ends[c] - self.offsets[c] for c in columns]
+        return _UserBatch([self.user_ids[c] for c in columns], self.vectors[rows], self.max_experience[columns],
+                          [self.locations[c] for c in columns], self.since[columns],
+                          [self.profile_hashes[c] for c in columns], [self.preferences[c] for c in columns],
+                          np.cumsum([0] + counts[:-1]))
+
+
+class _JobBatch:
+    """Vectors and match attributes of the jobs being matched, row-aligned."""
+
+    def __init__(self, job_ids: List[str], vectors: np.ndarray, min_exp: np.ndarray, location_codes: np.ndarray,
+                 location_values: List[str], created_at: np.ndarray,
+                 allowed: Optional[np.ndarray] = None, boosts: Optional[np.ndarray] = None):
+        self.job_ids = job_ids
+        self.vectors = vectors                # jobs x dim
+        self.min_exp = min_exp                # float32; NaN when unknown: never passes an experience filter
+        self.location_codes = location_codes  # index into location_values
+        self.location_values = location_values
+        self.created_at = created_at          # datetime64
+        self.allowed = allowed                # jobs x users, from the preference prefilter; None: all allowed
+        self.boosts = boosts                  # jobs x users score boosts; None: no boosts
+
+
+def _load_users(users: Sequence[models.User], matcher: LLMMatcher,
+                watermarks: MatchWatermarks, tag: str) -> Optional[_UserBatch]:
+    """Resume vectors, predicates and watermarks of every user that can be matched; others are skipped."""
+    user_ids, vectors, max_experience, locations, since, profile_hashes, user_preferences = [], [], [], [], [], [], []
+    for user in users:
+        preferences = user.preferences or {}
+        if preferences.get("max_experience") is None or not preferences.get("preferred_locations"):
+            logger.warning(f"User {user.user_id} is missing 'max_experience' or 'preferred_locations'. Skipping.")
+            continue
+        user_profile = build_user_profile(user)
+        if user_profile is None:
+            continue
+        resume_text = matcher._get_relevant_resume_text(user_profile.resume)
+        if not resume_text.strip():
+            logger.warning(f"User {user.user_id} has no resume text to match with. Skipping.")
+            continue
+        resume_matrix = matcher._resume_matrix(user_profile, resume_text)
+        if resume_matrix is None:
+            logger.warning(f"User {user.user_id} has no resume section to match with. Skipping.")
+            continue
+        profile_hash = matching_profile_hash(resume_text, preferences, tag)
+        user_ids.append(user.user_id)
+        vectors.append(resume_matrix)
+        max_experience.append(preferences["max_experience"])
+        locations.append([loc.lower() for loc in preferences["preferred_locations"]])
+        since.append(watermarks.since(user.user_id, profile_hash))
+        profile_hashes.append(profile_hash)
+        user_preferences.append(preferences)
+    if not user_ids:
+        return None
+    offsets = np.cumsum([0] + [len(matrix) for matrix in vectors[:-1]])
+    return _UserBatch(user_ids, np.vstack(vectors).astype(np.float32),
+                      np.array(max_experience, dtype=np.float32), locations,
+                      np.array([np.datetime64(s) if s else np.datetime64("NaT") for s in since], dtype="datetime64[us]"),
+                      profile_hashes, user_preferences, offsets)
+
+
+def _iter_jobs(db: Session, store: JobEmbeddingStore, since: Optional[datetime],
+               prefilter: Optional[PreferencePrefilter] = None,
+               block_rows: Optional[int] = None) -> Iterator[_JobBatch]:
+    """
+    Canonical jobs created after `since` (all when None) with an embedding, which missing ones
+    get now, read in blocks of `block_rows` (BATCH_MATCH_JOB_BLOCK) jobs so only one block is
+    in memory at a time. With a `prefilter`, jobs rejected for every user are dropped before
+    any encoding.
+    """
+    block_rows = block_rows or matching_config.BATCH_MATCH_JOB_BLOCK
+    columns = [models.Job.job_id, models.Job.min_exp_required, models.Job.location, models.Job.created_at]
+    if prefilter is not None:
+        columns += [models.Job.title, models.Job.company, models.Job.description]
+    query = db.query(*columns).filter(models.Job.canonical_job_id.is_(None))
+    if since is not None:
+        query = query.filter(models.Job.created_at > since)
+    last_job_id = None
+    while True:
+        # Keyset pagination: each block starts after the last job id of the previous one.
+        block = query if last_job_id is None else query.filter(models.Job.job_id > last_job_id)
+        rows = block.order_by(models.Job.job_id).limit(block_rows).all()
+        if not rows:
+            return
+        last_job_id = rows[-1].job_id
+        jobs = _job_batch(db, store, rows, prefilter)
+        if jobs is not None:
+            yield jobs
+        if len(rows) < block_rows:
+            return
+
+
+def _job_batch(db: Session, store: JobEmbeddingStore, rows: List,
+               prefilter: Optional[PreferencePrefilter] = None) -> Optional[_JobBatch]:
+    """The rows kept by the prefilter that have (or now get) an embedding, as a _JobBatch; None when none do."""
+    allowed = boosts = None
+    if prefilter is not None:
+        evaluated = [prefilter.evaluate(row) for row in rows]
+        keep = [i for i, (passes, _) in enumerate(evaluated) if passes.any()]
+        rows = [rows[i] for i in keep]
+        allowed = np.array([evaluated[i][0] for i in keep], dtype=bool).reshape(len(keep), len(prefilter.users))
+        boosts = np.array([evaluated[i][1] for i in keep], dtype=np.float32).reshape(len(keep), len(prefilter.users))
+
+    vectors = store.get(row.job_id for row in rows)
+    missing = [row.job_id for row in rows if row.job_id not in vectors]
+    if missing:
+        texts = (
+            db.query(models.Job.job_id, func.coalesce(models.Job.compact_description, models.Job.description))
+            .filter(models.Job.job_id.in_(missing))
+            .all()
+        )
+        vectors.update(store.get_or_embed(texts))
+    present = [i for i, row in enumerate(rows) if row.job_id in vectors]
+    if not present:
+        return None
+    rows = [rows[i] for i in present]
+
+    job_ids = [row.job_id for row in rows]
+    location_values: List[str] = []
+    location_code: Dict[str, int] = {}
+    codes = np.empty(len(rows), dtype=np.int32)
+    for i, row in enumerate(rows):
+        value = (row.location or "").lower()
+        if value not in location_code:
+            location_code[value] = len(location_values)
+            location_values.append(value)
+        codes[i] = location_code[value]
+    return _JobBatch(
+        job_ids,
+        np.vstack([vectors[job_id] for job_id in job_ids]).astype(np.float32),
+        np.array([np.nan if row.min_exp_required is None else row.min_exp_required for row in rows], dtype=np.float32),
+        codes,
+        location_values,
+        np.array([np.datetime64(row.created_at) if row.created_at else np.datetime64("NaT") for row in rows],
+                 dtype="datetime64[us]"),
+        allowed[present] if allowed is not None else None,
+        boosts[present] if boosts is not None else None,
+    )
+
+
+class _RunningTopK:
+    """
+    Top-k jobs per user among the jobs added so far that pass that user's experience, location
+    and preference predicates and were created after the user's watermark. Ranking includes
+    the preference boosts.
+
+    Each added _JobBatch is scored against every user in blocks of `block_rows` jobs, one
+    matrix multiply per block (against every resume section with RESUME_EMBEDDING_MODE
+    'sections', pooled per user by LLMMatcher.pool_scores); the predicates are applied as
+    boolean masks over the same jobs x users block, and the running top-k per user is merged
+    with each block, so job batches can be streamed through and dropped.
+    """
+
+    def __init__(self, users: _UserBatch, top_k: int, block_rows: Optional[int] = None):
+        self.users = users
+        self.top_k = top_k
+        self.block_rows = block_rows or matching_config.BATCH_MATCH_JOB_BLOCK
+        n_users = len(users.user_ids)
+        self._full_rescore = np.isnat(users.since)
+        self._job_ids = np.full((0, n_users), None, dtype=object)
+        self._scores = np.full((0, n_users), -np.inf, dtype=np.float32)
+        self._boosts = np.zeros((0, n_users), dtype=np.float32)
+
+    def add(self, jobs: _JobBatch):
+        users = self.users
+        # Same semantics as the SQL filters: ILIKE '%loc%' on the location, unknown experience never passes.
+        location_ok = np.array(
+            [[any(loc in value for loc in wanted) for wanted in users.locations] for value in jobs.location_values],
+            dtype=bool,
+        ).reshape(len(jobs.location_values), len(users.user_ids))
+        job_ids = np.array(jobs.job_ids, dtype=object)
+        for start in range(0, len(jobs.job_ids), self.block_rows):
+            block = slice(start, start + self.block_rows)
+            scores = LLMMatcher.pool_scores(jobs.vectors[block] @ users.vectors.T, users.offsets)
+            with np.errstate(invalid="ignore"):
+                mask = jobs.min_exp[block, None] <= users.max_experience[None, :]
+            mask &= location_ok[jobs.location_codes[block]]
+            mask &= (jobs.created_at[block, None] > users.since[None, :]) | self._full_rescore[None, :]
+            if jobs.allowed is not None:
+                mask &= jobs.allowed[block]
+            boosts = jobs.boosts[block] if jobs.boosts is not None else np.zeros_like(scores)
+            scores += boosts
+            scores[~mask] = -np.inf
+            self._merge(scores, np.broadcast_to(job_ids[block, None], scores.shape), boosts)
+
+    def _merge(self, scores: np.ndarray, job_ids: np.ndarray, boosts: np.ndarray):
+        self._scores = np.concatenate([self._scores, scores])
+        self._job_ids = np.concatenate([self._job_ids, job_ids])
+        self._boosts = np.concatenate([self._boosts, boosts])
+        if len(self._scores) > self.top_k:
+            keep = np.argpartition(-self._scores, self.top_k - 1, axis=0)[:self.top_k]
+            self._scores = np.take_along_axis(self._scores, keep, axis=0)
+            self._job_ids = np.take_along_axis(self._job_ids, keep, axis=0)
+            self._boosts = np.take_along_axis(self._boosts, keep, axis=0)
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (job ids, scores, boosts), each k x users and best first; scores include the boosts.
+        Job ids are None where a user has fewer than k passing jobs.
+        """
+        order = np.argsort(-self._scores, axis=0, kind="stable")
+        scores = np.take_along_axis(self._scores, order, axis=0)
+        job_ids = np.take_along_axis(self._job_ids, order, axis=0)
+        job_ids[np.isneginf(scores)] = None
+        return job_ids, scores, np.take_along_axis(self._boosts, order, axis=0)
+
+
+def run_batch_matching(db: Session, users: Optional[Sequence[models.User]] = None) -> Dict[str, int]:
+    """
+    Matches every user against the jobs new to them.
+
+    Users with a watermark (see MatchWatermarks) are matched in one pass over the canonical
+    jobs created after the oldest of their watermarks; users needing a full rescore get a
+    second pass over every job, so they never widen the first one. Each pass streams the jobs
+    in blocks with their stored embeddings, scores every block against all of its users'
+    resume vectors in one matrix multiply, and filters per user by max_experience,
+    preferred_locations, the preference prefilter (see PreferencePrefilter) and the user's own
+    watermark as masks. Each user's BATCH_MATCH_TOP_K best jobs and the advanced watermarks
+    are written in bulk. Scores and fit decisions are the same as those of `run_job_matching`.
+
+    Returns:
+        Counts of "users" matched, "jobs" scored and "matches" written.
+    """
+    started = time.perf_counter()
+    users = list(users) if users is not None else (
+        db.query(models.User).filter(models.User.preferences.isnot(None)).all()
+    )
+    stats = {"users": 0, "jobs": 0, "matches": 0}
+    logger.info(f"--- Starting Batch Matching for {len(users)} users ---")
+
+    matcher = LLMMatcher(resume_cache=ResumeEmbeddingCache(db))
+    store = JobEmbeddingStore(db, encoder=matcher.encoder)
+    watermarks = MatchWatermarks.load(db, [user.user_id for user in users])
+    user_batch = _load_users(users, matcher, watermarks, store.tag)
+    if user_batch is None:
+        logger.info("No users to match.")
+        return stats
+    stats["users"] = len(user_batch.user_ids)
+
+    full_rescore = np.isnat(user_batch.since)
+    passes = []
+    if not full_rescore.all():
+        incremental = user_batch.subset(np.flatnonzero(~full_rescore))
+        passes.append((incremental, incremental.since.min().astype(datetime)))
+    if full_rescore.any():
+        passes.append((user_batch.subset(np.flatnonzero(full_rescore)), None))
+    for pass_users, since in passes:
+        logger.info(f"Matching {len(pass_users.user_ids)} users against jobs created "
+                    f"{f'after {since:%Y-%m-%d %H:%M}' if since else 'at any time'}.")
+        matched_until = _match_and_write(db, matcher, store, pass_users, since, stats)
+        for user_id, profile_hash in zip(pass_users.user_ids, pass_users.profile_hashes):
+            watermarks.advance(user_id, profile_hash, matched_until)
+    watermarks.save()
+    db.commit()
+
+    logger.info(
+        f"--- Batch Matching Finished: {stats['users']} users x {stats['jobs']} jobs, {stats['matches']} matches "
+        f"in {time.perf_counter() - started:.1f}s ---"
+    )
+    return stats
+
+
+def _match_and_write(db: Session, matcher: LLMMatcher, store: JobEmbeddingStore, user_batch: _UserBatch,
+                     since: Optional[datetime], stats: Dict) -> Optional[datetime]:
+    """Matches the users against the jobs created after `since` and writes their top matches; returns the newest job's created_at."""
+    started = time.perf_counter()
+    prefilter = PreferencePrefilter(user_batch.preferences) if matching_config.USE_PREFILTER else None
+    if prefilter is not None and not prefilter.active:
+        prefilter = None
+    top = _RunningTopK(user_batch, matching_config.BATCH_MATCH_TOP_K)
+    matched_until = None
+    for jobs in _iter_jobs(db, store, since, prefilter):
+        stats["jobs"] += len(jobs.job_ids)
+        top.add(jobs)
+        created = jobs.created_at[~np.isnat(jobs.created_at)]
+        if len(created):
+            newest = created.max().astype(datetime)
+            matched_until = newest if matched_until is None else max(matched_until, newest)
+    if prefilter is not None:
+        logger.info(f"Preference prefilter: {prefilter.report.summary()}.")
+
+    job_ids, scores, boosts = top.result()
+    matches = []
+    for column, user_id in enumerate(user_batch.user_ids):
+        for job_id, score, boost in zip(job_ids[:, column], scores[:, column], boosts[:, column]):
+            if job_id is None:
+                break
+            result = matcher._build_result(float(score) - float(boost), verbose=False, boost=float(boost))
+            matches.append(match_row(user_id, job_id, result))
+    scored_at = time.perf_counter()
+    stats["matches"] += write_matches(db, matches)
+    logger.info(f"Scored in {scored_at - started:.1f}s, wrote matches in {time.perf_counter() - scored_at:.1f}s.")
+    return matched_until
@@ -1,10 +1,15 @@
 
 import logging
+from typing import List, Optional
 
 from backend.database import models
 from backend.database.setup_db import SessionLocal
 from backend.data_engine import config as data_engine_config
+from backend.matching_engine import config as matching_config
+from backend.matching_engine.model_registry import get_model_registry
+from backend.matching_engine.vector_index import JobVectorIndex
 from backend.workflows.scraping import run_job_scraping
+from backend.workflows.batch_matching import run_batch_matching
 from backend.workflows.matching import run_job_matching
 from backend.workflows.emailing import run_email_sending
 
@@ -17,11 +22,11 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def process_user_pipeline(user_id: str):
+def process_user_pipeline(user_id: str, index: Optional[JobVectorIndex] = None):
     """
     Runs the full pipeline for a single user:
     1. Scrapes new jobs based on user preferences.
-    2. Matches the jobs against the user's profile.
+    2. Matches the jobs against the user's profile, through `index` when given (see run_job_matching).
     3. Emails the best matches to the user.
     """
     logger.info(f"===== Starting full pipeline for user: {user_id} =====")
@@ -54,7 +59,7 @@ def process_user_pipeline(user_id: str):
             )
 
         # 2. Match jobs to user
-        run_job_matching(db=db, user=user)
+        run_job_matching(db=db, user=user, index=index)
 
         # 3. Send email with matched jobs
         run_email_sending(db=db, user=user)
@@ -66,6 +71,60 @@ def process_user_pipeline(user_id: str):
         logger.info(f"===== Finished full pipeline for user: {user_id} =====")
 
 
+def process_users_batch(user_ids: List[str]):
+    """
+    Runs the pipeline for many users at once:
+    1. Scrapes once for the union of all users' preferred roles and locations.
+    2. Matches the recent jobs against every user in one batch (see run_batch_matching).
+    3. Emails each user their best matches.
+    """
+    logger.info(f"===== Starting batch pipeline for {len(user_ids)} users =====")
+    db = SessionLocal()
+    try:
+        users = []
+        for user in db.query(models.User).filter(models.User.user_id.in_(user_ids)).all():
+            if not user.preferences or not user.resume:
+                logger.error(f"User {user.user_id} is missing preferences or resume. Skipping.")
+                continue
+            users.append(user)
+        missing = set(user_ids) - {user.user_id for user in users}
+        if missing:
+            logger.error(f"Users not found or incomplete: {sorted(missing)}.")
+
+        # 1. Scrape jobs for every user's preferences in one run
+        search_terms, locations = [], []
+        for user in users:
+            search_terms.extend(user.preferences.get("preferred_roles") or [])
+            locations.extend(user.preferences.get("preferred_locations") or [])
+        search_terms, locations = list(dict.fromkeys(search_terms)), list(dict.fromkeys(locations))
+        if search_terms and locations:
+            run_job_scraping(
+                db=db,
+                search_terms=search_terms,
+                locations_to_search=locations,
+                jobs_to_scrape=data_engine_config.DEFAULT_JOBS_TO_SCRAPE,
+                hours_old=data_engine_config.DEFAULT_HOURS_OLD,
+            )
+        else:
+            logger.warning("No preferred roles or locations to scrape for.")
+
+        # 2. Match the new jobs to every user at once
+        run_batch_matching(db=db, users=users)
+
+        # 3. Send each user an email with their matched jobs
+        for user in users:
+            try:
+                run_email_sending(db=db, user=user)
+            except Exception as e:
+                logger.error(f"Failed to send matches to user {user.user_id}: {e}", exc_info=True)
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during the batch pipeline: {e}", exc_info=True)
+    finally:
+        db.close()
+        logger.info(f"===== Finished batch pipeline for {len(user_ids)} users =====")
+
+
 if __name__ == "__main__":
     # --- List of User IDs to process ---
     user_ids_to_process = [
@@ -74,5 +133,21 @@ if __name__ == "__main__":
     ]
     # -----------------------------------
 
-    for user_id in user_ids_to_process:
-        process_user_pipeline(user_id)
+    # Load the embedding model once for every user processed below
+    get_model_registry().warm_up()
+
+    if matching_config.BATCH_MATCHING:
+        process_users_batch(user_ids_to_process)
+    else:
+        # Open the vector index once; each user's run only syncs the jobs added since
+        index = None
+        if matching_config.USE_ANN_INDEX:
+            db = SessionLocal()
+            try:
+                index = JobVectorIndex.open(db, tag=get_model_registry().get().tag)
+            finally:
+                db.close()
+        for user_id in user_ids_to_process:
+            process_user_pipeline(user_id, index=index)
+        if index is not None and index.dirty:
+            index.save()
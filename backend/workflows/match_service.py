@@ -0,0 +1,213 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from backend.database import models
+from backend.matching_engine import config as matching_config
+from backend.matching_engine.embeddings import JobEmbeddingStore, ResumeEmbeddingCache
+from backend.matching_engine.model_registry import get_model_registry
+from backend.matching_engine.prefilter import PreferencePrefilter
+from backend.matching_engine.semanticMatcher import LLMMatcher
+from backend.matching_engine.vector_index import JobVectorIndex
+from backend.schemas.match import JobMatch, UserMatches
+from backend.workflows.matching import build_user_profile, search_job_index
+
+logger = logging.getLogger(__name__)
+
+
+class _SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key wait for and share its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class OnDemandMatcher:
+    """
+    Top-k matches for one user at request time, for GET /users/{user_id}/matches.
+
+    Nothing is encoded on the request path unless the resume changed: the model comes from the
+    process-wide registry, the resume vector(s) from ResumeEmbeddingCache and the job vectors
+    from a JobVectorIndex kept in memory and synced with the database at most every
+    MATCH_API_INDEX_REFRESH_SECONDS. A refresh syncs a copy of the index and swaps it in, so
+    requests keep searching the current one meanwhile. Candidates come from the index (or, with a freshness
+    window, from every job created inside it), ranked by the index's quantized vectors. They are
+    then re-checked against the user's preference prefilter and scored from their stored
+    float32 vectors, like `run_job_matching` scores them. Concurrent requests with the same
+    parameters are coalesced into one computation.
+    """
+
+    def __init__(self, model_key: Optional[str] = None):
+        self.model_key = model_key
+        self._index: Optional[JobVectorIndex] = None
+        self._index_synced = 0.0
+        self._index_lock = threading.Lock()    # guards _index and _index_synced, held only to read or swap them
+        self._refresh_lock = threading.Lock()  # one refresh at a time
+        self._flights = _SingleFlight()
+
+    def warm_up(self, db: Session):
+        """Loads the model and the vector index now, so the first request does not pay for them."""
+        encoder = get_model_registry().get(self.model_key)
+        self._fresh_index(db, encoder.tag)
+
+    def _fresh_index(self, db: Session, tag: str) -> JobVectorIndex:
+        """
+        The in-memory index for `tag`, refreshed when older than MATCH_API_INDEX_REFRESH_SECONDS.
+        A published index is never changed again, so callers search it without holding a lock.
+        """
+        with self._index_lock:
+            index, synced = self._index, self._index_synced
+        missing = index is None or index.tag != tag
+        if not missing and time.monotonic() - synced <= matching_config.MATCH_API_INDEX_REFRESH_SECONDS:
+            return index
+        # One request refreshes; meanwhile the others keep using the current index, unless there is none.
+        if not self._refresh_lock.acquire(blocking=missing):
+            return index
+        try:
+            with self._index_lock:
+                index, synced = self._index, self._index_synced
+            if index is None or index.tag != tag:
+                index = JobVectorIndex.open(db, tag=tag)
+            elif time.monotonic() - synced > matching_config.MATCH_API_INDEX_REFRESH_SECONDS:
+                index = index.copy()
+                index.sync(db)
+            else:
+                return index  # refreshed by the request this one waited for
+            with self._index_lock:
+                self._index, self._index_synced = index, time.monotonic()
+            return index
+        finally:
+            self._refresh_lock.release()
+
+    def top_matches(self, db: Session, user: models.User, top_k: Optional[int] = None,
+                    max_experience: Optional[float] = None, locations: Optional[List[str]] = None,
+                    max_age_days: Optional[float] = None) -> UserMatches:
+        """
+        The user's `top_k` (default MATCH_API_TOP_K) best jobs, best first. Experience and
+        location filters default to the user's max_experience and preferred_locations;
+        `max_age_days` keeps only jobs created in that many days.
+        """
+        preferences = user.preferences or {}
+        top_k = top_k or matching_config.MATCH_API_TOP_K
+        if max_experience is None:
+            max_experience = preferences.get("max_experience")
+        locations = locations or preferences.get("preferred_locations") or []
+        key = (user.user_id, top_k, max_experience, tuple(locations), max_age_days)
+        return self._flights.do(
+            key, lambda: self._top_matches(db, user, top_k, max_experience, locations, max_age_days)
+        )
+
+    def _top_matches(self, db: Session, user: models.User, top_k: int, max_experience: Optional[float],
+                     locations: List[str], max_age_days: Optional[float]) -> UserMatches:
+        started = time.perf_counter()
+        matcher = LLMMatcher(resume_cache=ResumeEmbeddingCache(db), model_key=self.model_key)
+        result = UserMatches(user_id=user.user_id, model=matcher.encoder.tag, matches=[], took_ms=0.0)
+        user_profile = build_user_profile(user)
+        resume_matrix = matcher.embed_resume_matrix(user_profile) if user_profile is not None else None
+        if resume_matrix is None:
+            logger.warning(f"User {user.user_id} has no resume text to match with.")
+            return result
+
+        candidates = top_k * matching_config.MATCH_API_CANDIDATE_FACTOR
+        recent_ids = None
+        if max_age_days is not None:
+            recent_ids = self._recent_job_ids(db, max_experience, locations, max_age_days)
+        index = self._fresh_index(db, matcher.encoder.tag)
+        if recent_ids is None:
+            positions = [index.position[job_id] for job_id in
+                         search_job_index(index, matcher, resume_matrix, candidates, max_experience, locations)]
+        else:
+            # A freshness window leaves few enough jobs to rank them all instead of probing lists.
+            positions = [index.position[job_id] for job_id in recent_ids
+                         if job_id in index.position and index.alive[index.position[job_id]]]
+            if len(positions) > candidates:
+                scores = matcher.pool_scores(index.vectors.dot(resume_matrix.T, np.array(positions)))[:, 0]
+                positions = [positions[i] for i in np.argsort(-scores, kind="stable")[:candidates]]
+        job_ids = [index.ids[position] for position in positions]
+        if not job_ids:
+            result.took_ms = (time.perf_counter() - started) * 1000
+            return result
+
+        # The index only ranks; scores come from the stored vectors, without quantization error.
+        vectors = JobEmbeddingStore(db, tag=matcher.encoder.tag).get(job_ids)
+        jobs_by_id = {job.job_id: job for job in db.query(models.Job).filter(models.Job.job_id.in_(job_ids))}
+        jobs = [jobs_by_id[job_id] for job_id in job_ids if job_id in jobs_by_id and job_id in vectors]
+        if not jobs:
+            result.took_ms = (time.perf_counter() - started) * 1000
+            return result
+        job_matrix = np.vstack([vectors[job.job_id] for job in jobs])
+        scores = matcher.pool_scores(job_matrix @ resume_matrix.T)[:, 0].astype(np.float32)
+        boosts = np.zeros(len(jobs), dtype=np.float32)
+        prefilter = PreferencePrefilter([user.preferences]) if matching_config.USE_PREFILTER else None
+        if prefilter is not None and prefilter.active:
+            evaluated = [prefilter.evaluate(job) for job in jobs]
+            keep = [i for i, (passes, _) in enumerate(evaluated) if passes[0]]
+            boosts = np.array([evaluated[i][1][0] for i in keep], dtype=np.float32)
+            jobs, scores = [jobs[i] for i in keep], scores[keep]
+
+        for i in np.argsort(-(scores + boosts), kind="stable")[:top_k]:
+            job, boost = jobs[i], float(boosts[i])
+            match = matcher._build_result(float(scores[i]), verbose=False, boost=boost)
+            result.matches.append(JobMatch(
+                job_id=job.job_id, title=job.title, company=job.company, location=job.location,
+                job_url=job.job_url, min_exp_required=job.min_exp_required, created_at=job.created_at,
+                fit=match["fit"], score=match["score"], reasons=match["reasons"],
+            ))
+        result.took_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Matched user {user.user_id} on demand: {len(result.matches)} of {len(job_ids)} candidates "
+                    f"in {result.took_ms:.0f} ms.")
+        return result
+
+    @staticmethod
+    def _recent_job_ids(db: Session, max_experience: Optional[float], locations: List[str],
+                        max_age_days: float) -> List[str]:
+        """The canonical jobs created in the last `max_age_days` that pass the experience and location filters."""
+        query = db.query(models.Job.job_id).filter(
+            models.Job.canonical_job_id.is_(None),
+            models.Job.created_at >= datetime.utcnow() - timedelta(days=max_age_days),
+        )
+        if max_experience is not None:
+            query = query.filter(models.Job.min_exp_required <= max_experience)
+        if locations:
+            query = query.filter(or_(*[models.Job.location.ilike(f"%{loc}%") for loc in locations]))
+        return [job_id for (job_id,) in query]
+
+
+_service: Optional[OnDemandMatcher] = None
+_service_lock = threading.Lock()
+
+
+def get_match_service() -> OnDemandMatcher:
+    """The process-wide on-demand matcher for the default model."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = OnDemandMatcher()
+        return _service
@@ -1,23 +1,106 @@
 
 import logging
-from datetime import datetime
+from typing import List, Optional
 
-from sqlalchemy import or_
+import numpy as np
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 
 from backend.database import models
+from backend.database.match_writer import match_row, write_matches
+from backend.matching_engine import config as matching_config
+from backend.matching_engine.embeddings import JobEmbeddingStore, ResumeEmbeddingCache, job_embedding_text
+from backend.matching_engine.match_watermarks import MatchWatermarks, matching_profile_hash
+from backend.matching_engine.prefilter import PreferencePrefilter
 from backend.matching_engine.semanticMatcher import LLMMatcher
+from backend.matching_engine.vector_index import JobVectorIndex
 from backend.schemas.user import UserProfile, Resume
 
 logger = logging.getLogger(__name__)
 
 
-def run_job_matching(db: Session, user: models.User):
-    """Fetches jobs and a user profile, runs the matching engine, and saves the results."""
-    logger.info(f"--- Starting Job Matching for user: {user.user_id} ---")
-
+def search_job_index(index: JobVectorIndex, matcher: LLMMatcher, resume_matrix: np.ndarray, k: int,
+                     max_exp: Optional[float] = None, locations: Optional[List[str]] = None) -> List[str]:
+    """The ids of the k indexed jobs best matching the resume matrix (see LLMMatcher.embed_resume_matrix), best first."""
+    # With section vectors every section queries the index, plus their mean, whose dot
+    # product is the mean-pooled score; the union is cut to k by the pooled score.
+    queries = resume_matrix if len(resume_matrix) == 1 else np.vstack([resume_matrix, resume_matrix.mean(axis=0)])
+    hit_ids = list(dict.fromkeys(
+        job_id for query_vector in queries
+        for job_id, _ in index.search(query_vector, k, max_experience=max_exp, locations=locations)
+    ))
+    if len(hit_ids) > k:
+        pooled = matcher.pool_scores(np.vstack([index.vector(job_id) for job_id in hit_ids]) @ resume_matrix.T)[:, 0]
+        hit_ids = [hit_ids[i] for i in np.argsort(-pooled, kind="stable")[:k]]
+    return hit_ids
+
+
+def retrieve_top_jobs(db: Session, query, matcher: LLMMatcher, store: JobEmbeddingStore,
+                      user_profile: UserProfile, max_exp: int, locations: List[str],
+                      prefilter: Optional[PreferencePrefilter] = None, index: Optional[JobVectorIndex] = None):
+    """
+    Returns the ANN_TOP_K jobs of `query` closest to the user's resume that pass the prefilter,
+    best first, with their score boosts and vectors.
+
+    Candidates come from `index`, synced first, or else from the persisted JobVectorIndex
+    opened for this call, with the experience and location filters
+    applied inside the index; the SQL filters of `query` and the prefilter are applied to the
+    hits. When too few hits pass them, the index is searched again for twice as many until
+    ANN_TOP_K pass or the index has no more candidates, so rejected hits never cost the user
+    matches further down. The index only ranks: the vectors returned are the stored float32
+    ones, so scores do not carry the index's quantization error and agree with the incremental
+    and batch paths.
+    """
+    # Jobs that pass the filters but were never embedded are embedded first, so the index sees them.
+    unembedded = query.outerjoin(models.JobEmbedding, and_(models.JobEmbedding.job_id == models.Job.job_id,
+                                                           models.JobEmbedding.model == store.tag))
+    unembedded = unembedded.filter(models.JobEmbedding.job_id.is_(None))
+    if prefilter is not None:
+        # Jobs this user's preferences reject are not worth encoding.
+        jobs, _ = prefilter.filter_jobs(unembedded.all())
+        unembedded = [(job.job_id, job_embedding_text(job)) for job in jobs]
+    else:
+        unembedded = unembedded.with_entities(
+            models.Job.job_id, func.coalesce(models.Job.compact_description, models.Job.description)
+        ).all()
+    if unembedded:
+        store.get_or_embed(unembedded)
+
+    resume_matrix = matcher.embed_resume_matrix(user_profile)
+    if resume_matrix is None:
+        logger.warning(f"User {user_profile.user_id} has no resume text to match with.")
+        return [], [], {}
+
+    if index is None or index.tag != store.tag:
+        index = JobVectorIndex.open(db, tag=store.tag)
+    else:
+        # An index shared across users only reads the jobs embedded since its last sync.
+        index.sync(db)
+    top_k = matching_config.ANN_TOP_K
+    # job_id -> (job, boost) for hits passing every filter, None for rejected ones; each hit is checked once.
+    checked = {}
+    k = top_k
+    while True:
+        hit_ids = search_job_index(index, matcher, resume_matrix, k, max_exp, locations)
+        new_ids = [job_id for job_id in hit_ids if job_id not in checked]
+        jobs, boosts = apply_prefilter(prefilter, list(query.filter(models.Job.job_id.in_(new_ids))))
+        checked.update(dict.fromkeys(new_ids))
+        checked.update((job.job_id, (job, boost)) for job, boost in zip(jobs, boosts))
+        passing = [checked[job_id] for job_id in hit_ids if checked[job_id] is not None]
+        if len(passing) >= top_k or len(hit_ids) < k or k >= len(index):
+            break
+        k *= 2
+    passing = passing[:top_k]
+    logger.info(f"Vector index returned {len(hit_ids)} candidates out of {len(index)} indexed jobs, "
+                f"{len(passing)} kept after filtering.")
+    jobs = [job for job, _ in passing]
+    return jobs, [boost for _, boost in passing], store.get(job.job_id for job in jobs)
+
+
+def build_user_profile(user: models.User) -> Optional[UserProfile]:
+    """The user's stored profile as a UserProfile, or None (logged) when it does not parse."""
     try:
-        user_profile = UserProfile(
+        return UserProfile(
             user_id=user.user_id,
             resume=Resume(**user.resume),
             preferences=user.preferences,
@@ -26,6 +109,34 @@ def run_job_matching(db: Session, user: models.User):
         )
     except Exception as e:
         logger.error(f"Failed to parse user profile for {user.user_id}: {e}")
+        return None
+
+
+def apply_prefilter(prefilter: Optional[PreferencePrefilter], jobs: List[models.Job]):
+    """The jobs passing the user's preference rules, with their score boosts."""
+    if prefilter is None:
+        return jobs, [0.0] * len(jobs)
+    return prefilter.filter_jobs(jobs)
+
+
+def run_job_matching(db: Session, user: models.User, index: Optional[JobVectorIndex] = None):
+    """
+    Fetches jobs and a user profile, runs the matching engine, and saves the results.
+
+    Matching is incremental: once a user has been matched, later runs only score jobs
+    created after the user's watermark (see MatchWatermarks). All jobs are rescored when the
+    resume, the match preferences or the model version changed.
+
+    With USE_PREFILTER, the user's company and keyword preferences (see PreferencePrefilter)
+    reject jobs before they are embedded or scored, and boost jobs at preferred companies.
+
+    When matching many users, pass one JobVectorIndex (see JobVectorIndex.open) as `index`
+    so it is loaded once rather than once per user; it is synced, not saved, here.
+    """
+    logger.info(f"--- Starting Job Matching for user: {user.user_id} ---")
+
+    user_profile = build_user_profile(user)
+    if user_profile is None:
         return
 
     max_exp = user.preferences.get("max_experience")
@@ -39,55 +150,68 @@ def run_job_matching(db: Session, user: models.User):
         return
 
     query = db.query(models.Job).filter(models.Job.min_exp_required <= max_exp)
+    # Near-duplicates are matched through their canonical job only
+    query = query.filter(models.Job.canonical_job_id.is_(None))
 
     # Add location filter using ILIKE for partial matching
     location_filters = [models.Job.location.ilike(f"%{loc}%") for loc in preferred_locations]
     query = query.filter(or_(*location_filters))
 
-    jobs_to_match = query.all()
+    matcher = LLMMatcher(resume_cache=ResumeEmbeddingCache(db))
+    store = JobEmbeddingStore(db, encoder=matcher.encoder)
+
+    watermarks = MatchWatermarks.load(db, [user.user_id])
+    profile_hash = matching_profile_hash(
+        matcher._get_relevant_resume_text(user_profile.resume), user.preferences, store.tag
+    )
+    since = watermarks.since(user.user_id, profile_hash)
+    matched_until = query.with_entities(func.max(models.Job.created_at)).scalar()
+    prefilter = PreferencePrefilter([user.preferences]) if matching_config.USE_PREFILTER else None
+    if prefilter is not None and not prefilter.active:
+        prefilter = None
+
+    if since is not None:
+        # Only jobs created since the last run; few enough to score without the index.
+        jobs_to_match, boosts = apply_prefilter(prefilter, query.filter(models.Job.created_at > since).all())
+        job_vectors = store.get_or_embed([(job.job_id, job_embedding_text(job)) for job in jobs_to_match])
+        logger.info(f"Incremental matching for user {user.user_id}: jobs created after {since:%Y-%m-%d %H:%M}.")
+    elif matching_config.USE_ANN_INDEX:
+        jobs_to_match, boosts, job_vectors = retrieve_top_jobs(
+            db, query, matcher, store, user_profile, max_exp, preferred_locations, prefilter, index
+        )
+    else:
+        jobs_to_match, boosts = apply_prefilter(prefilter, query.all())
+        # Jobs are normally embedded at ingest; any that are not yet are encoded once here and stored.
+        job_vectors = store.get_or_embed([(job.job_id, job_embedding_text(job)) for job in jobs_to_match])
+
+    if prefilter is not None:
+        logger.info(f"Preference prefilter for user {user.user_id}: {prefilter.report.summary()}.")
 
     if not jobs_to_match:
         logger.info(f"No jobs found matching experience <= {max_exp} and locations: {preferred_locations}.")
+        watermarks.advance(user.user_id, profile_hash, matched_until)
+        watermarks.save()
+        db.commit()
         return
 
     logger.info(f"Found {len(jobs_to_match)} jobs to match against for user {user.user_id}.")
 
-    matcher = LLMMatcher()
-    match_count = 0
-
-    for job_record in jobs_to_match:
-        try:
-            match_result = matcher.match(job=job_record, user=user_profile)
-            existing_match = (
-                db.query(models.UserJobMatch)
-                .filter(
-                    models.UserJobMatch.user_id == user.user_id,
-                    models.UserJobMatch.job_id == job_record.job_id,
-                )
-                .first()
-            )
-            if existing_match:
-                existing_match.fit = match_result["fit"]
-                existing_match.reasons = " ".join(match_result["reasons"])
-                existing_match.score = match_result["score"]
-                existing_match.created_at = datetime.utcnow()
-            else:
-                new_match = models.UserJobMatch(
-                    user_id=user.user_id,
-                    job_id=job_record.job_id,
-                    fit=match_result["fit"],
-                    reasons=" ".join(match_result["reasons"]),
-                    score=match_result["score"],
-                    status="READY_FOR_EMAIL",
-                )
-                db.add(new_match)
-            match_count += 1
-        except Exception as e:
-            logger.error(f"Failed to match job {job_record.job_id} for user {user.user_id}: {e}")
-            continue
-
+    # One batched encode of the resume and one matrix multiply for every job.
+    match_results = matcher.match_batch(
+        jobs_to_match, user_profile, job_embeddings=[job_vectors.get(job.job_id) for job in jobs_to_match],
+        boosts=boosts,
+    )
+    # One upsert per few thousand pairs instead of a lookup per job.
+    match_count = write_matches(db, [
+        match_row(user.user_id, job_record.job_id, match_result)
+        for job_record, match_result in zip(jobs_to_match, match_results)
+    ])
+
+    # The watermark commits together with the matches it covers.
+    watermarks.advance(user.user_id, profile_hash, matched_until)
+    watermarks.save()
+    db.commit()
     if match_count > 0:
-        db.commit()
         logger.info(f"Processed {match_count} matches for user {user.user_id}.")
     else:
         logger.info(f"No new matches processed for user {user.user_id}.")
@@ -6,10 +6,15 @@ from typing import Dict, List
 from sqlalchemy.orm import Session
 
 from backend.data_engine import config as data_engine_config
-from backend.data_engine.pipeline.fetcher import fetch_jobs
-from backend.data_engine.pipeline.loader import add_seen_jobs, get_seen_job_ids, load_jobs_to_db
+from backend.data_engine.pipeline.enricher import enrich_jobs
+from backend.data_engine.pipeline.executor import build_scrape_tasks, run_scrape_tasks
+from backend.data_engine.pipeline.loader import add_seen_jobs, load_jobs_to_db
+from backend.data_engine.pipeline.seen_index import SeenJobIndex
+from backend.data_engine.pipeline.streaming import run_streaming_pipeline
 from backend.data_engine.pipeline.transformer import transform_jobs
+from backend.data_engine.pipeline.watermarks import ScrapeWatermarks, watermarks_enabled
 from backend.data_engine.scrapers.indeed_scraper import IndeedScraper
+from backend.database.setup_db import SessionLocal
 
 logger = logging.getLogger(__name__)
 
@@ -33,8 +38,12 @@ def run_job_scraping(
     locations_to_search: List[str],
     jobs_to_scrape: int,
     hours_old: int,
+    streaming: bool = data_engine_config.STREAMING_PIPELINE,
 ):
-    """Orchestrates the job scraping pipeline based on user preferences."""
+    """
+    Orchestrates the job scraping pipeline based on user preferences.
+    With `streaming`, fetch, transform, enrich and load run concurrently as a stream.
+    """
     logger.info("--- Starting Job Scraping ---")
 
     all_locations = load_locations(data_engine_config.LOCATIONS_CONFIG_PATH)
@@ -53,31 +62,43 @@ def run_job_scraping(
         return
 
     scrapers = [IndeedScraper()]
-    seen_job_ids = get_seen_job_ids(db)
-
-    for search_term in search_terms:
-        logger.info(f"=== Processing search term: '{search_term}' ===")
-        for common_name, location_map in locations_to_process.items():
-            logger.info(f"--- Processing location: {common_name} ---")
-
-            raw_jobs_df = fetch_jobs(
-                scrapers=scrapers,
-                search_term=search_term,
-                location_map=location_map,
-                jobs=jobs_to_scrape,
-                hours_old=hours_old,
-                seen_job_ids=seen_job_ids,
-            )
-            if raw_jobs_df.empty:
-                logger.warning(f"No new jobs found for '{search_term}' in '{common_name}'.")
-                continue
-
-            add_seen_jobs(db, raw_jobs_df)
-            job_postings = transform_jobs(raw_jobs_df, common_name)
-
-            if not job_postings:
-                logger.info("No job postings were found after transformation.")
-                continue
-
-            load_jobs_to_db(job_postings, db)
+    seen_index = SeenJobIndex.open(db)
+
+    tasks = build_scrape_tasks(scrapers, search_terms, locations_to_process, jobs_to_scrape, hours_old)
+    watermarks = None
+    if watermarks_enabled():
+        watermarks = ScrapeWatermarks.load(db, tasks)
+        tasks = watermarks.plan(tasks)
+    logger.info(f"Running {len(tasks)} scrape tasks for {len(search_terms)} search terms "
+                f"across {len(locations_to_process)} locations.")
+
+    if streaming:
+        run_streaming_pipeline(db, tasks, seen_index, SessionLocal, watermarks=watermarks)
+        logger.info("--- Job Scraping Finished ---")
+        return
+
+    scraped = run_scrape_tasks(tasks, seen_job_ids=seen_index,
+                               on_result=watermarks.record if watermarks else None)
+
+    job_postings, fetched = [], []
+    for (search_term, common_name), raw_jobs_df in scraped.items():
+        logger.info(f"--- Processing '{search_term}' in {common_name} ---")
+        if raw_jobs_df.empty:
+            logger.warning(f"No new jobs found for '{search_term}' in '{common_name}'.")
+            continue
+
+        fetched.append(raw_jobs_df)
+        job_postings.extend(transform_jobs(raw_jobs_df, common_name))
+
+    # Enrich the whole run at once so large runs are spread across every core.
+    job_postings = enrich_jobs(job_postings)
+    if not job_postings:
+        logger.info("No job postings left after transformation and enrichment.")
+    else:
+        load_jobs_to_db(job_postings, db)
+    # Jobs are only marked seen, and marks only move, once the run's jobs are stored.
+    for raw_jobs_df in fetched:
+        add_seen_jobs(db, raw_jobs_df, seen_index)
+    if watermarks is not None:
+        watermarks.save()
     logger.info("--- Job Scraping Finished ---")